@@ -0,0 +1,26 @@
+"""
+Micro-benchmarks of the dispatch pipeline, run with `python -m benchmarks`, see `benchmarks/README.md`.
+Settings are configured here, before the framework is imported.
+"""
+import django
+from django.conf import settings
+
+if not settings.configured:
+    settings.configure(
+        DEBUG=False,
+        SECRET_KEY='django-url-framework-benchmarks',
+        ALLOWED_HOSTS=['*'],
+        INSTALLED_APPS=['django_url_framework'],
+        ROOT_URLCONF='benchmarks.controllers',
+        TEMPLATES=[
+            {
+                'BACKEND': 'django.template.backends.django.DjangoTemplates',
+                'OPTIONS': {
+                    'loaders': [('django.template.loaders.locmem.Loader', {
+                        'bench/index.html': "<h1>{{ title }}</h1>{% for item in items %}<p>{{ item }}</p>{% endfor %}",
+                    })],
+                },
+            },
+        ],
+    )
+    django.setup()
@@ -0,0 +1,46 @@
+import argparse
+import sys
+
+from . import runner
+from .suite import BENCHMARKS
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Time the django-url-framework dispatch pipeline.")
+    parser.add_argument("-k", "--filter", dest="pattern", help="only run benchmarks whose name matches this regex")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="repetitions of each benchmark, default 5")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+    parser.add_argument("--save", metavar="PATH", help="save the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare the results to a saved baseline")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="percentage a benchmark may be slower than the baseline, default 10")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="exit with status 1 if a benchmark is slower than the baseline")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for benchmark in BENCHMARKS:
+            print(benchmark.name)
+        return 0
+
+    baseline = runner.load(args.compare) if args.compare else None
+    results = runner.run(BENCHMARKS, repeat=args.repeat, pattern=args.pattern,
+                         progress=lambda result: print("%s ..." % result.name, file=sys.stderr))
+    if not results:
+        print("No benchmarks match %r" % args.pattern, file=sys.stderr)
+        return 1
+    print(runner.format_results(results))
+
+    if args.save:
+        runner.save(results, args.save)
+        print("\nSaved to %s" % args.save)
+
+    if baseline is not None:
+        report, regressions = runner.compare(baseline, results, threshold=args.threshold / 100)
+        print("\nCompared to %s\n%s" % (args.compare, report))
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""The controllers the benchmarks dispatch to, and the urlconf they are mounted in."""
+from functools import lru_cache
+
+from django.http import HttpResponse
+from django.urls import include, path
+
+from django_url_framework import ActionController
+from django_url_framework.site import Site
+
+ACTION_COUNTS = (1, 10, 100, 500)
+
+class BenchController(ActionController):
+    controller_name = "bench"
+
+    def index(self, request):
+        return {"title": "Bench", "items": range(10)}
+
+    def show(self, request, id:int):
+        return self._print("show %d" % id)
+
+def _make_action(index):
+    def action(self, request):
+        return self._print("ok")
+    action.__name__ = action.__qualname__ = "action_%d" % index
+    return action
+
+@lru_cache(maxsize=None)
+def make_controller(action_count:int) -> type:
+    """A controller class with `action_count` actions, named `action_0` and up."""
+    attributes = {"action_%d" % index: _make_action(index) for index in range(action_count)}
+    attributes["controller_name"] = "actions_%d" % action_count
+    attributes["__module__"] = __name__
+    return type("Actions%dController" % action_count, (ActionController,), attributes)
+
+@lru_cache(maxsize=None)
+def make_site(controller_count:int, router:bool) -> Site:
+    """A site with `controller_count` controllers of 10 actions each, named `controller_0` and up."""
+    routed_site = Site(router=router)
+    for index in range(controller_count):
+        routed_site.controllers["controller_%d" % index] = type("Routed%dController" % index, (make_controller(10),),
+                                                                 {"controller_name": "controller_%d" % index,
+                                                                  "__module__": __name__})
+    return routed_site
+
+def function_view(request):
+    """The baseline, a bare django function view."""
+    return HttpResponse("ok", content_type="text/plain")
+
+site = Site()
+site.controllers["bench"] = BenchController
+for _action_count in ACTION_COUNTS:
+    site.controllers["actions_%d" % _action_count] = make_controller(_action_count)
+
+urlpatterns = [
+    path("function/", function_view, name="function_view"),
+    path("", include(site.urls[0])),
+]
@@ -0,0 +1,104 @@
+"""Timing of benchmarks, saved baselines and the comparison report."""
+import datetime
+import json
+import platform
+import re
+import statistics
+import timeit
+from typing import Iterable, List, NamedTuple, Optional
+
+import django
+
+import django_url_framework
+
+BASELINE_BENCHMARK = "baseline.function_view_call"
+
+class Result(NamedTuple):
+    name: str
+    best: float
+    median: float
+    number: int
+    repeat: int
+
+def run_benchmark(benchmark, repeat:int = 5) -> Result:
+    """Time a benchmark, the number of calls per repetition is chosen so a repetition takes at least 0.2 seconds."""
+    timer = timeit.Timer(benchmark.setup())
+    number, _ = timer.autorange()
+    times = [total / number for total in timer.repeat(repeat=repeat, number=number)]
+    return Result(benchmark.name, min(times), statistics.median(times), number, repeat)
+
+def run(benchmarks:Iterable, repeat:int = 5, pattern:Optional[str] = None, progress=None) -> List[Result]:
+    results = []
+    for benchmark in benchmarks:
+        if pattern is not None and not re.search(pattern, benchmark.name):
+            continue
+        result = run_benchmark(benchmark, repeat=repeat)
+        if progress is not None:
+            progress(result)
+        results.append(result)
+    return results
+
+def get_environment() -> dict:
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'django': django.get_version(),
+        'django_url_framework': django_url_framework.__version__,
+        'machine': platform.machine(),
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+
+def save(results:Iterable[Result], path:str):
+    data = {
+        'environment': get_environment(),
+        'results': {result.name: result._asdict() for result in results},
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+def load(path:str) -> dict:
+    """The results of a saved baseline, by benchmark name."""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    return {name: Result(**result) for name, result in data['results'].items()}
+
+def _format_time(seconds:float) -> str:
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return "%.2f %s" % (seconds / scale, unit)
+    return "%.0f ns" % (seconds / 1e-9)
+
+def format_results(results:List[Result]) -> str:
+    """A table of the results, with each benchmark's time relative to the bare function view, if it was run."""
+    baseline = next((result.best for result in results if result.name == BASELINE_BENCHMARK), None)
+    width = max([len(result.name) for result in results] + [9])
+    lines = ["%-*s %12s %12s %10s" % (width, "benchmark", "best", "median", "x view")]
+    for result in results:
+        relative = "%.1fx" % (result.best / baseline) if baseline else "-"
+        lines.append("%-*s %12s %12s %10s" % (width, result.name, _format_time(result.best),
+                                              _format_time(result.median), relative))
+    return "\n".join(lines)
+
+def compare(baseline:dict, results:List[Result], threshold:float = 0.1):
+    """
+    Compare results to a saved baseline by their best times.
+    Returns the report, and the names of the benchmarks that are more than `threshold` slower.
+    """
+    width = max([len(result.name) for result in results] + [9])
+    lines = ["%-*s %12s %12s %9s" % (width, "benchmark", "baseline", "current", "change")]
+    regressions = []
+    for result in results:
+        previous = baseline.get(result.name)
+        if previous is None:
+            lines.append("%-*s %12s %12s %9s" % (width, result.name, "-", _format_time(result.best), "new"))
+            continue
+        change = result.best / previous.best - 1
+        marker = ""
+        if change > threshold:
+            marker = "  SLOWER"
+            regressions.append(result.name)
+        elif change < -threshold:
+            marker = "  faster"
+        lines.append("%-*s %12s %12s %+8.1f%%%s" % (width, result.name, _format_time(previous.best),
+                                                     _format_time(result.best), change * 100, marker))
+    return "\n".join(lines), regressions
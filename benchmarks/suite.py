@@ -0,0 +1,160 @@
+"""
+The benchmarks. Each one is a setup function, registered with `@benchmark`, that prepares its state and
+returns the callable to time. Benchmarks with `action_counts` are run once per controller size.
+"""
+from typing import Callable, Iterable, NamedTuple, Optional
+
+from django.http import HttpResponse
+from django.template import Context, Engine
+from django.test import RequestFactory
+from django.urls import URLResolver, reverse
+from django.urls.resolvers import RoutePattern
+
+from django_url_framework.controller import ActionRegistry, autoview_function, get_actions
+from django_url_framework.flash import FlashManager
+from django_url_framework.renderers import JSONRenderer, TemplateRenderer, TextRenderer, YAMLRenderer
+
+from .controllers import ACTION_COUNTS, BenchController, function_view, make_controller, make_site, site
+
+class Benchmark(NamedTuple):
+    name: str
+    setup: Callable[[], Callable[[], object]]
+    group: str
+
+BENCHMARKS = []
+
+def benchmark(group:str, action_counts:Optional[Iterable[int]] = None, label:str = "actions"):
+    """
+    Register a setup function as a benchmark, it is called with `action_count` if `action_counts` are given,
+    `label` names the count in the benchmark's name.
+    """
+    def decorator(setup):
+        name = "%s.%s" % (group, setup.__name__)
+        if action_counts is None:
+            BENCHMARKS.append(Benchmark(name, setup, group))
+        else:
+            for action_count in action_counts:
+                BENCHMARKS.append(Benchmark("%s[%s=%d]" % (name, label, action_count),
+                                            lambda setup=setup, action_count=action_count: setup(action_count),
+                                            group))
+        return setup
+    return decorator
+
+def _request(path="/", **extra):
+    request = RequestFactory().get(path, **extra)
+    request.session = {}
+    return request
+
+def _controller(request=None):
+    return BenchController(site=site, request=request or _request(), helper_class=None, url_params={})
+
+@benchmark("baseline")
+def function_view_call():
+    request = _request()
+    return lambda: function_view(request)
+
+@benchmark("baseline")
+def django_reverse():
+    return lambda: reverse("bench_show", args=[1])
+
+@benchmark("dispatch", action_counts=ACTION_COUNTS)
+def autoview(action_count):
+    controller_class = make_controller(action_count)
+    controller_name = "actions_%d" % action_count
+    action_name = "action_%d" % (action_count - 1)
+    request = _request()
+    return lambda: autoview_function(site, request, controller_name, controller_class, action_name)
+
+@benchmark("dispatch", action_counts=ACTION_COUNTS)
+def get_actions_cached(action_count):
+    controller_class = make_controller(action_count)
+    return lambda: get_actions(controller_class)
+
+@benchmark("dispatch", action_counts=ACTION_COUNTS)
+def action_registry_build(action_count):
+    controller_class = make_controller(action_count)
+    return lambda: ActionRegistry(controller_class)
+
+@benchmark("dispatch")
+def controller_instantiation():
+    request = _request()
+    return lambda: BenchController(site=site, request=request, helper_class=None, url_params={})
+
+@benchmark("dispatch")
+def view_wrapper():
+    request = _request()
+    return lambda: _controller(request)._view_wrapper(BenchController.show, id=1)
+
+@benchmark("render")
+def text_renderer():
+    controller = _controller()
+    return lambda: TextRenderer("hello").render(controller)
+
+@benchmark("render")
+def json_renderer():
+    controller = _controller()
+    data = {"items": [{"id": index, "name": "item %d" % index, "tags": ["a", "b"]} for index in range(50)]}
+    return lambda: JSONRenderer(data).render(controller)
+
+@benchmark("render")
+def yaml_renderer():
+    controller = _controller()
+    data = {"items": [{"id": index, "name": "item %d" % index} for index in range(10)]}
+    return lambda: YAMLRenderer(data).render(controller)
+
+@benchmark("render")
+def template_renderer():
+    controller = _controller()
+    return lambda: TemplateRenderer({"title": "Bench", "items": range(10)}, template_name="bench/index.html").render(controller)
+
+@benchmark("flash")
+def flash_append_and_flush():
+    def run():
+        flash = FlashManager(_request())
+        flash.append("hello")
+        flash.append("world")
+        flash.flush(HttpResponse())
+    return run
+
+@benchmark("flash")
+def flash_unused():
+    return lambda: FlashManager(_request()).flush(HttpResponse())
+
+@benchmark("urls")
+def url_for():
+    helper = _controller()._helper
+    return lambda: helper.url_for(action="show", url_args=[1])
+
+@benchmark("urls")
+def url_for_many_100():
+    helper = _controller()._helper
+    args_list = list(range(100))
+    return lambda: helper.url_for_many(args_list, action="show")
+
+def _resolve_last_controller(controller_count, router):
+    resolver = URLResolver(RoutePattern(""), make_site(controller_count, router).urls[0])
+    url = "controller_%d/action_9/" % (controller_count - 1)
+    resolver.resolve(url)
+    return lambda: resolver.resolve(url)
+
+@benchmark("urls", action_counts=(10, 200), label="controllers")
+def resolve_regex(controller_count):
+    return _resolve_last_controller(controller_count, router=False)
+
+@benchmark("urls", action_counts=(10, 200), label="controllers")
+def resolve_router(controller_count):
+    return _resolve_last_controller(controller_count, router=True)
+
+def _template_tags(source):
+    engine = Engine(libraries={"url_framework": "django_url_framework.templatetags.url_framework"})
+    template = engine.from_string("{% load url_framework %}" + source)
+    context = Context({"controller_helper": _controller()._helper, "items": range(100)})
+    return lambda: template.render(context)
+
+@benchmark("templatetags")
+def go_action_literal_100():
+    return _template_tags("{% for item in items %}{% go_action show 1 %}{% endfor %}")
+
+@benchmark("templatetags")
+def go_action_variable_100():
+    return _template_tags("{% for item in items %}{% go_action show item %}{% endfor %}")
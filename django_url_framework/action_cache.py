@@ -0,0 +1,225 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional, Tuple, Union
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from .lib import run_in_thread_pool
+
+CACHE_KEY_PREFIX = "django_url_framework.action"
+# how long a request may take to revalidate a stale response before another request takes over
+REVALIDATE_TIMEOUT = 30
+CACHEABLE_METHODS = ('GET', 'HEAD')
+
+class CacheOptions(NamedTuple):
+    """The arguments of the `cache_action` decorator."""
+    timeout: int
+    key: Optional[Union[str, Callable]]
+    vary_on: Tuple[str, ...]
+    vary_on_user: bool
+    stale_timeout: int
+    cache_alias: Optional[str]
+
+class CacheEntry(NamedTuple):
+    fresh_until: float
+    stale_until: float
+    status_code: int
+    headers: Tuple[Tuple[str, str], ...]
+    content: bytes
+
+    def to_response(self) -> HttpResponse:
+        response = HttpResponse(self.content, status=self.status_code)
+        for header, value in self.headers:
+            response[header] = value
+        return response
+
+class LocalCache(object):
+    """A thread safe, in-process LRU, the first tier of the action cache, also used for compiled templates."""
+    def __init__(self, max_size:int):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._revalidating = {}
+        self._lock = threading.Lock()
+
+    def get(self, key:str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key:str, entry:CacheEntry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key:str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._revalidating.clear()
+
+    def claim(self, key:str, timeout:int) -> bool:
+        """Returns True for the first caller, until `release` is called or `timeout` seconds pass."""
+        now = time.time()
+        with self._lock:
+            if self._revalidating.get(key, 0) > now:
+                return False
+            self._revalidating[key] = now + timeout
+            return True
+
+    def release(self, key:str):
+        with self._lock:
+            self._revalidating.pop(key, None)
+
+_local_cache = None
+_local_cache_lock = threading.Lock()
+
+def get_local_cache() -> LocalCache:
+    """The process wide LocalCache, its size is set with `settings.URL_FRAMEWORK_ACTION_CACHE_SIZE`."""
+    global _local_cache
+    if _local_cache is None:
+        with _local_cache_lock:
+            if _local_cache is None:
+                _local_cache = LocalCache(max_size=getattr(settings, 'URL_FRAMEWORK_ACTION_CACHE_SIZE', 1000))
+    return _local_cache
+
+def is_cacheable_response(response) -> bool:
+    return (not response.streaming
+            and response.status_code == 200
+            and not response.cookies
+            and 'no-store' not in response.get('Cache-Control', '')
+            and 'private' not in response.get('Cache-Control', ''))
+
+class ActionCache(object):
+    """
+    Caches the rendered responses of one action, see the `cache_action` decorator.
+
+    Responses are kept in the process wide `LocalCache` and, unless `cache_alias` is None, in a Django cache
+    shared between processes. Once a response is older than `timeout`, and for up to `stale_timeout` seconds more,
+    one request re-runs the action while the others keep being served the stale response.
+    """
+    def __init__(self, options:CacheOptions, controller_name:str, action_name:str, negotiated:bool):
+        """
+        :param negotiated: the renderer is chosen from the Accept header of the request, each selected media type is cached separately
+        """
+        self.options = options
+        self.controller_name = controller_name
+        self.action_name = action_name
+        self.negotiated = negotiated
+
+    def __repr__(self):
+        return "<ActionCache %s.%s>" % (self.controller_name, self.action_name)
+
+    @property
+    def shared_cache(self):
+        if self.options.cache_alias is None:
+            return None
+        from django.core.cache import caches
+        return caches[self.options.cache_alias]
+
+    def get_key(self, controller, args:tuple, kwargs:dict) -> str:
+        request = controller._request
+        parts = [args, sorted(kwargs.items()), controller._is_ajax]
+        if self.options.vary_on:
+            parts.append([request.GET.getlist(param) for param in self.options.vary_on])
+        if self.negotiated:
+            # not the Accept header itself, which browsers and clients vary endlessly
+            parts.append(controller._get_media_type_for_request())
+        if self.options.vary_on_user:
+            user = getattr(request, 'user', None)
+            parts.append(user.pk if user is not None and user.is_authenticated else None)
+        key = self.options.key
+        if key is not None:
+            parts.append(key(controller) if callable(key) else key)
+        digest = hashlib.md5(repr(parts).encode('utf8')).hexdigest()
+        return "%s.%s.%s.%s" % (CACHE_KEY_PREFIX, self.controller_name, self.action_name, digest)
+
+    def _get_entry(self, key:str) -> Optional[CacheEntry]:
+        local_cache = get_local_cache()
+        entry = local_cache.get(key)
+        if (entry is None or entry.fresh_until <= time.time()) and self.options.cache_alias is not None:
+            # another process may have revalidated it already
+            shared_entry = self.shared_cache.get(key)
+            if shared_entry is not None:
+                entry = shared_entry
+                local_cache.set(key, entry)
+        return entry
+
+    def _claim(self, key:str) -> bool:
+        if self.options.cache_alias is not None:
+            return self.shared_cache.add(key + ".revalidate", True, REVALIDATE_TIMEOUT)
+        return get_local_cache().claim(key, REVALIDATE_TIMEOUT)
+
+    def _release(self, key:str):
+        if self.options.cache_alias is not None:
+            self.shared_cache.delete(key + ".revalidate")
+        else:
+            get_local_cache().release(key)
+
+    def lookup(self, controller, args:tuple, kwargs:dict) -> Tuple[Optional[str], Optional[HttpResponse]]:
+        """
+        Returns the cache key and the cached response. The key is None if the request can not be cached,
+        the response is None if the action must be run, and its response passed to `store`.
+        """
+        if controller._request.method not in CACHEABLE_METHODS:
+            return None, None
+        key = self.get_key(controller, args, kwargs)
+        entry = self._get_entry(key)
+        if entry is None:
+            return key, None
+        now = time.time()
+        if now < entry.fresh_until:
+            return key, entry.to_response()
+        if now < entry.stale_until and not self._claim(key):
+            return key, entry.to_response()
+        return key, None
+
+    def release(self, key:str):
+        """Release the claim to revalidate a stale response, if one was taken, when the response is not stored."""
+        if self.options.stale_timeout:
+            self._release(key)
+
+    def store(self, key:str, response, cacheable:bool = True):
+        """Cache the response of the action, `cacheable` False only releases the claim to revalidate it."""
+        if self.negotiated:
+            # the key depends on the Accept header, so does what HTTP caches may serve
+            patch_vary_headers(response, ('Accept',))
+        try:
+            if cacheable and is_cacheable_response(response):
+                now = time.time()
+                entry = CacheEntry(fresh_until=now + self.options.timeout,
+                                   stale_until=now + self.options.timeout + self.options.stale_timeout,
+                                   status_code=response.status_code,
+                                   headers=tuple((header, value) for header, value in response.items()
+                                                 if header.lower() != 'set-cookie'),
+                                   content=response.content)
+                get_local_cache().set(key, entry)
+                if self.options.cache_alias is not None:
+                    self.shared_cache.set(key, entry, self.options.timeout + self.options.stale_timeout)
+        finally:
+            self.release(key)
+
+    async def lookup_async(self, controller, args:tuple, kwargs:dict):
+        if self.options.cache_alias is None:
+            return self.lookup(controller, args, kwargs)
+        return await run_in_thread_pool(self.lookup, controller, args, kwargs)
+
+    async def store_async(self, key:str, response, cacheable:bool = True):
+        if self.options.cache_alias is None:
+            return self.store(key, response, cacheable)
+        return await run_in_thread_pool(self.store, key, response, cacheable)
+
+    async def release_async(self, key:str):
+        if self.options.cache_alias is None:
+            return self.release(key)
+        return await run_in_thread_pool(self.release, key)
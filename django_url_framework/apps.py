@@ -5,3 +5,9 @@ from django.utils.translation import gettext_lazy
 class URLFrameworkAppConfig(AppConfig):
     name = "django_url_framework"
     verbose_name = gettext_lazy("Django URL Framework")
+
+    def ready(self):
+        from django.apps import apps
+        if apps.is_installed("django.contrib.auth"):
+            from .auth_cache import connect_signals
+            connect_signals()
@@ -0,0 +1,173 @@
+from typing import Callable, FrozenSet, Iterable
+
+from django.conf import settings
+
+# set on the request, the user, its groups and permissions, and the results of tests, the user object may outlive it
+REQUEST_CACHE_ATTRIBUTE = "_url_framework_auth"
+# set on a group or permission between the `pre_clear` and `post_clear` of its users
+CLEARED_USERS_ATTRIBUTE = "_url_framework_cleared_user_pks"
+CACHE_KEY_PREFIX = "django_url_framework.auth"
+# the user field of each through model whose changes are watched, by the through model
+_watched_fields = {}
+
+def get_cache_timeout():
+    """Seconds group names and permissions are cached between requests, `settings.URL_FRAMEWORK_AUTH_CACHE_TIMEOUT`."""
+    return getattr(settings, 'URL_FRAMEWORK_AUTH_CACHE_TIMEOUT', None)
+
+def _get_cache():
+    from django.core.cache import caches
+    return caches[getattr(settings, 'URL_FRAMEWORK_AUTH_CACHE', 'default')]
+
+def _get_cache_key(kind:str, user_pk) -> str:
+    return "%s.%s.%s" % (CACHE_KEY_PREFIX, kind, user_pk)
+
+def _get_request_cache(request, user) -> dict:
+    """What is loaded for the user during the request, by kind or test function."""
+    user_cache = getattr(request, REQUEST_CACHE_ATTRIBUTE, None)
+    if user_cache is None or user_cache[0] is not user:
+        # nothing was loaded yet, or the user logged in or out since
+        user_cache = (user, {})
+        setattr(request, REQUEST_CACHE_ATTRIBUTE, user_cache)
+    return user_cache[1]
+
+def _get_cached(user, kind:str, load:Callable, request=None) -> FrozenSet[str]:
+    """Load a set once per request, if it is given, and once per `get_cache_timeout` if it is set."""
+    request_cache = _get_request_cache(request, user) if request is not None else {}
+    value = request_cache.get(kind)
+    if value is None:
+        if not user.is_authenticated:
+            value = frozenset()
+        else:
+            timeout = get_cache_timeout()
+            if timeout:
+                cache = _get_cache()
+                cache_key = _get_cache_key(kind, user.pk)
+                value = cache.get(cache_key)
+                if value is None:
+                    value = frozenset(load())
+                    cache.set(cache_key, value, timeout)
+            else:
+                value = frozenset(load())
+        request_cache[kind] = value
+    return value
+
+def get_group_names(user, request=None) -> FrozenSet[str]:
+    """The names of the groups of the user, queried once per request."""
+    return _get_cached(user, "groups", lambda: user.groups.values_list('name', flat=True), request)
+
+def get_permissions(user, request=None) -> FrozenSet[str]:
+    """The permissions of the user, from `user.get_all_permissions`, loaded once per request."""
+    return _get_cached(user, "permissions", user.get_all_permissions, request)
+
+def is_member_of_group(user, group_names:Iterable[str], request=None) -> bool:
+    """Superusers are members of all groups."""
+    return user.is_superuser or not get_group_names(user, request).isdisjoint(group_names)
+
+def has_perms(user, perms:Iterable[str], request=None) -> bool:
+    """
+    Like `user.has_perms`, for permissions that are not tied to an object.
+    If `URL_FRAMEWORK_AUTH_CACHE_TIMEOUT` is set, the permissions are cached between requests,
+    as returned by `user.get_all_permissions`.
+    """
+    if not get_cache_timeout():
+        return user.has_perms(perms)
+    if user.is_active and user.is_superuser:
+        return True
+    return user.is_active and get_permissions(user, request).issuperset(perms)
+
+def request_test(test_func:Callable) -> Callable:
+    """Mark a test of `passes_test` that takes the user and the request, so what it loads is kept on the request."""
+    test_func.takes_request = True
+    return test_func
+
+def passes_test(request, test_func:Callable) -> bool:
+    """Run `test_func` on the user of the request, once per request and user, no matter how many decorators use it."""
+    user = request.user
+    results = _get_request_cache(request, user)
+    if test_func not in results:
+        if getattr(test_func, 'takes_request', False):
+            results[test_func] = bool(test_func(user, request))
+        else:
+            results[test_func] = bool(test_func(user))
+    return results[test_func]
+
+def invalidate_auth_cache(user=None, user_pk=None):
+    """
+    Forget the groups and permissions of a user cached between requests, call this after changing them.
+    Changes to the groups and permissions of a user, and to the permissions of its groups, are picked up
+    automatically if `django_url_framework` is installed as an app.
+    """
+    if user is not None:
+        user_pk = user.pk
+    if user_pk is not None and get_cache_timeout():
+        _get_cache().delete_many([_get_cache_key("groups", user_pk), _get_cache_key("permissions", user_pk)])
+
+def _get_user_pks(sender, instance, model) -> set:
+    """The users of a group or permission, before they are cleared."""
+    field_name = _watched_fields.get(sender)
+    if field_name is None:
+        return set()
+    return set(model._default_manager.filter(**{field_name: instance}).values_list('pk', flat=True))
+
+def _on_user_groups_changed(sender, instance, action, reverse, pk_set, model=None, **kwargs):
+    if reverse and action == "pre_clear":
+        # `post_clear` has no `pk_set`, the users have to be found before they are removed
+        setattr(instance, CLEARED_USERS_ATTRIBUTE, _get_user_pks(sender, instance, model))
+        return
+    if not action.startswith("post_"):
+        return
+    if reverse:
+        # the users of a group were changed
+        if action == "post_clear":
+            user_pks = instance.__dict__.pop(CLEARED_USERS_ATTRIBUTE, ())
+        else:
+            user_pks = pk_set or ()
+        for user_pk in user_pks:
+            invalidate_auth_cache(user_pk=user_pk)
+    else:
+        invalidate_auth_cache(user=instance)
+
+def _get_group_user_pks(**filters) -> set:
+    from django.contrib.auth import get_user_model
+    return set(get_user_model()._default_manager.filter(**filters).values_list('pk', flat=True))
+
+def _on_group_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == "pre_clear":
+        # the groups of a permission are cleared, find their users before they are removed
+        setattr(instance, CLEARED_USERS_ATTRIBUTE, _get_group_user_pks(groups__permissions=instance))
+        return
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        # the permissions of a group were changed
+        user_pks = _get_group_user_pks(groups=instance)
+    elif action == "post_clear":
+        user_pks = instance.__dict__.pop(CLEARED_USERS_ATTRIBUTE, ())
+    elif pk_set:
+        # the groups of a permission were changed
+        user_pks = _get_group_user_pks(groups__pk__in=pk_set)
+    else:
+        user_pks = ()
+    for user_pk in user_pks:
+        invalidate_auth_cache(user_pk=user_pk)
+
+def connect_signals():
+    """Invalidate the cache when the groups or permissions of a user change, called when the app is ready."""
+    from django.contrib.auth import get_user_model
+    from django.db.models.signals import m2m_changed
+    user_model = get_user_model()
+    for field_name in ('groups', 'user_permissions'):
+        try:
+            through = getattr(user_model, field_name).through
+        except AttributeError:
+            continue
+        _watched_fields[through] = field_name
+        m2m_changed.connect(_on_user_groups_changed, sender=through,
+                            dispatch_uid="django_url_framework.auth_cache.%s" % field_name)
+    try:
+        group_model = user_model.groups.field.related_model
+    except AttributeError:
+        return
+    # the users of a group have its permissions
+    m2m_changed.connect(_on_group_permissions_changed, sender=group_model.permissions.through,
+                        dispatch_uid="django_url_framework.auth_cache.group_permissions")
@@ -0,0 +1,286 @@
+"""
+Many actions dispatched in one HTTP request, mounted by `Site.urls` at `Site.batch_url`.
+
+The batch endpoint takes a POST with a JSON list of sub-requests, or an object with a `requests` list::
+
+    [{"id": "user", "controller": "user", "action": "show", "args": [1]},
+     {"controller": "inbox", "action": "index", "params": {"page": 2}, "independent": true},
+     {"controller": "cart", "action": "add", "method": "POST", "data": {"item": 5}}]
+
+Each sub-request runs its action through `autoview_function` in the same process, with a request that shares
+the user, session and cookies of the batch request, so filters, permission decorators and `allowed_methods`
+apply to each one as they would on its own. `params` are its query string, `data` its form data and `json`
+its JSON body. `args` and `kwargs` are passed to the action as they are given, they are not checked
+by the converters of its URL patterns. Consecutive sub-requests marked `independent` run concurrently in a thread pool of
+`settings.URL_FRAMEWORK_BATCH_THREAD_POOL_SIZE` threads, 0 runs everything in order. Sessions are not thread-safe,
+so each of those gets a copy of the session, what it writes to it is not saved, and the user is loaded beforehand.
+Sub-requests that write to the session should not be marked `independent`.
+
+The batch request is not run in a transaction by `ATOMIC_REQUESTS`, each sub-request is, in its own transaction
+on each database that has `ATOMIC_REQUESTS` set, as if it were requested on its own. A sub-request that fails is
+rolled back, the others are not.
+
+The response is a JSON object with a `responses` list, in the order of the sub-requests, each with the `id`
+of the sub-request, or its index, its `status`, `headers` and `body`, JSON responses are embedded as JSON, other responses, and JSON responses
+that do not parse, as a string.
+Cookies set by sub-requests are set on the batch response. The sub-requests share the flash messages
+of the batch request, which are saved once more on the batch response.
+"""
+import copy
+import json
+import logging
+import threading
+from contextlib import ExitStack, nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from urllib.parse import urlencode
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.sessions.backends.base import SessionBase
+from django.core.exceptions import PermissionDenied
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, connections, transaction
+from django.http import Http404, HttpRequest, HttpResponse, HttpResponseBadRequest, HttpResponseNotAllowed, QueryDict
+from django.urls import get_script_prefix, get_urlconf, set_script_prefix, set_urlconf
+from django.utils import translation
+
+from .controller import autoview_function
+from .flash import FLASH_ATTRIBUTE
+
+logger = logging.getLogger("django_url_framework")
+
+# copied from the batch request to each sub-request, set by middleware
+SHARED_ATTRIBUTES = ('user', 'auser', 'session', 'urlconf', 'LANGUAGE_CODE', 'csrf_processing_done')
+# not passed on to the sub-requests, they describe the body of the batch request
+BODY_META_KEYS = ('CONTENT_TYPE', 'CONTENT_LENGTH', 'QUERY_STRING')
+HIDDEN_HEADERS = ('set-cookie', 'content-length')
+# the types of the fields of a sub-request, `json` may be any JSON value
+FIELD_TYPES = {
+    'id': (str, int),
+    'controller': str,
+    'action': str,
+    'method': str,
+    'params': dict,
+    'data': dict,
+    'args': list,
+    'kwargs': dict,
+    'independent': bool,
+}
+TYPE_NAMES = {str: 'a string', int: 'a number', dict: 'an object', list: 'a list', bool: 'a boolean'}
+
+class BatchError(ValueError):
+    """The batch request is malformed, answered with 400 Bad Request."""
+
+_thread_pool = None
+_thread_pool_lock = threading.Lock()
+
+def get_batch_thread_pool() -> Optional[ThreadPoolExecutor]:
+    """
+    The thread pool independent sub-requests run in, None if `settings.URL_FRAMEWORK_BATCH_THREAD_POOL_SIZE` is 0.
+    It is not the pool of `django_url_framework.lib.get_thread_pool`, which the sub-requests may use themselves.
+    """
+    global _thread_pool
+    size = getattr(settings, 'URL_FRAMEWORK_BATCH_THREAD_POOL_SIZE', 4)
+    if not size:
+        return None
+    if _thread_pool is None:
+        with _thread_pool_lock:
+            if _thread_pool is None:
+                _thread_pool = ThreadPoolExecutor(max_workers=size, thread_name_prefix="django_url_framework_batch")
+    return _thread_pool
+
+def _get_query_dict(values) -> QueryDict:
+    if not values:
+        return QueryDict()
+    return QueryDict(urlencode(values, doseq=True))
+
+def _check_spec(index:int, spec) -> None:
+    if not isinstance(spec, dict) or 'controller' not in spec:
+        raise BatchError("Request %d must be an object with a `controller`" % index)
+    for field, value in spec.items():
+        types = FIELD_TYPES.get(field)
+        if types is None:
+            continue
+        if not isinstance(types, tuple):
+            types = (types,)
+        # a boolean is an int, but is never a valid `id`
+        if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+            raise BatchError("Request %d: `%s` must be %s" % (index, field, " or ".join(TYPE_NAMES[t] for t in types)))
+    for field in ('params', 'data'):
+        for value in spec.get(field, {}).values():
+            values = value if isinstance(value, list) else [value]
+            if not all(isinstance(item, (str, int, float, bool)) for item in values):
+                raise BatchError("Request %d: the values of `%s` must be strings, numbers or lists of them" % (index, field))
+
+def parse_batch(body:bytes) -> List[dict]:
+    """The sub-requests of a batch request body, raises `BatchError` if it is malformed."""
+    try:
+        data = json.loads(body or b'null')
+    except ValueError:
+        raise BatchError("The body must be JSON")
+    if isinstance(data, dict):
+        data = data.get('requests')
+    if not isinstance(data, list):
+        raise BatchError("Expected a list of requests")
+    max_requests = getattr(settings, 'URL_FRAMEWORK_BATCH_MAX_REQUESTS', 50)
+    if len(data) > max_requests:
+        raise BatchError("At most %d requests are allowed in a batch" % max_requests)
+    for index, spec in enumerate(data):
+        _check_spec(index, spec)
+    return data
+
+def copy_session(session):
+    """A copy of a session, for a sub-request that runs concurrently with others, that the session middleware does not save."""
+    session_copy = copy.copy(session)
+    if isinstance(session, SessionBase):
+        # a shallow copy shares the loaded session data
+        session_copy._session_cache = dict(session.items())
+    return session_copy
+
+def _atomic_requests() -> ExitStack:
+    """A transaction on each database that has `ATOMIC_REQUESTS` set, as Django runs a view in."""
+    stack = ExitStack()
+    for alias, database in connections.settings.items():
+        if database.get('ATOMIC_REQUESTS'):
+            stack.enter_context(transaction.atomic(using=alias))
+    return stack
+
+def build_subrequest(request:HttpRequest, spec:dict, concurrent:bool=False) -> HttpRequest:
+    """
+    A request for one sub-request, sharing the user, session and cookies of the batch request.
+
+    :param concurrent: the sub-request runs concurrently with others, it gets a copy of the session
+    """
+    method = spec.get('method', 'GET').upper()
+    subrequest = HttpRequest()
+    subrequest.method = method
+    subrequest.path = request.path
+    subrequest.path_info = request.path_info
+    subrequest.META = {key: value for key, value in request.META.items() if key not in BODY_META_KEYS}
+    subrequest.META['REQUEST_METHOD'] = method
+    subrequest.GET = _get_query_dict(spec.get('params'))
+    subrequest.META['QUERY_STRING'] = subrequest.GET.urlencode()
+    subrequest.POST = _get_query_dict(spec.get('data'))
+    subrequest.COOKIES = request.COOKIES
+    if 'json' in spec:
+        subrequest._body = json.dumps(spec['json']).encode('utf-8')
+        subrequest.META['CONTENT_TYPE'] = 'application/json'
+    else:
+        subrequest._body = b''
+    for attribute in SHARED_ATTRIBUTES:
+        if hasattr(request, attribute):
+            setattr(subrequest, attribute, getattr(request, attribute))
+    if concurrent and hasattr(request, 'session'):
+        subrequest.session = copy_session(request.session)
+    subrequest.batch_request = request
+    return subrequest
+
+def dispatch_subrequest(site, request:HttpRequest, spec:dict, concurrent:bool=False) -> HttpResponse:
+    """Run the action of one sub-request, errors are turned into responses so they do not fail the whole batch."""
+    controller_name = spec['controller']
+    controller_class = site.get_controller(controller_name)
+    try:
+        if controller_class is None:
+            raise Http404("Controller '%s' not found" % controller_name)
+        subrequest = build_subrequest(request, spec, concurrent=concurrent)
+        with _atomic_requests():
+            return autoview_function(site, subrequest, controller_name, controller_class,
+                                     spec.get('action') or 'index', *spec.get('args', []), **spec.get('kwargs', {}))
+    except Http404:
+        return HttpResponse(status=404)
+    except PermissionDenied:
+        return HttpResponse(status=403)
+    except Exception:
+        logger.exception("Batch request to %s.%s failed" % (controller_name, spec.get('action') or 'index'))
+        return HttpResponse(status=500)
+
+def _dispatch_in_thread(site, request, spec, urlconf, script_prefix, language):
+    set_urlconf(urlconf)
+    set_script_prefix(script_prefix)
+    try:
+        # a thread with no active language uses the default one
+        with translation.override(language) if language != settings.LANGUAGE_CODE else nullcontext():
+            return dispatch_subrequest(site, request, spec, concurrent=True)
+    finally:
+        set_urlconf(None)
+        # the thread outlives the request, its database connections are not closed by the request handler
+        close_old_connections()
+
+def _load_shared_state(request:HttpRequest) -> None:
+    """Load the lazy user and session of the batch request, before concurrent sub-requests share or copy them."""
+    if hasattr(request, 'user'):
+        getattr(request.user, 'pk', None)
+    if isinstance(getattr(request, 'session', None), SessionBase):
+        request.session.items()
+
+def dispatch_batch(site, request:HttpRequest, specs:List[dict]) -> List[HttpResponse]:
+    """The responses of the sub-requests, in order, running each group of consecutive independent ones concurrently."""
+    thread_pool = get_batch_thread_pool()
+    context = (get_urlconf(), get_script_prefix(), translation.get_language())
+    responses = []
+    index = 0
+    while index < len(specs):
+        group_end = index + 1
+        if thread_pool is not None and specs[index].get('independent'):
+            while group_end < len(specs) and specs[group_end].get('independent'):
+                group_end += 1
+        if group_end - index > 1:
+            _load_shared_state(request)
+            futures = [thread_pool.submit(_dispatch_in_thread, site, request, spec, *context)
+                       for spec in specs[index:group_end]]
+            responses += [future.result() for future in futures]
+        else:
+            responses.append(dispatch_subrequest(site, request, specs[index]))
+        index = group_end
+    return responses
+
+def _get_content(response) -> bytes:
+    if not response.streaming:
+        return response.content
+    if getattr(response, 'is_async', False):
+        async def consume():
+            return b''.join([chunk async for chunk in response.streaming_content])
+        return async_to_sync(consume)()
+    return b''.join(response.streaming_content)
+
+def _encode_response(identifier, response) -> str:
+    envelope = json.dumps({
+        'id': identifier,
+        'status': response.status_code,
+        'headers': {header: value for header, value in response.items() if header.lower() not in HIDDEN_HEADERS},
+    }, cls=DjangoJSONEncoder)
+    body = _get_content(response).decode(response.charset, errors='replace')
+    if response.get('Content-Type', '').split(';')[0].strip() == 'application/json' and _is_json(body):
+        # spliced in as it is, without encoding it again
+        return '%s, "body": %s}' % (envelope[:-1], body)
+    return '%s, "body": %s}' % (envelope[:-1], json.dumps(body))
+
+def _is_json(text) -> bool:
+    try:
+        json.loads(text)
+    except ValueError:
+        return False
+    return True
+
+@transaction.non_atomic_requests
+def batch_view(request, site):
+    """The batch endpoint, mounted by `Site.urls` at `Site.batch_url`, see the module documentation."""
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    try:
+        specs = parse_batch(request.body)
+    except BatchError as e:
+        return HttpResponseBadRequest(json.dumps({'error': str(e)}), content_type='application/json')
+
+    responses = dispatch_batch(site, request, specs)
+    batch_response = HttpResponse('{"responses": [%s]}' % ', '.join(
+        _encode_response(spec.get('id', index), response) for index, (spec, response) in enumerate(zip(specs, responses))
+    ), content_type='application/json')
+    for response in responses:
+        for key, morsel in response.cookies.items():
+            batch_response.cookies[key] = morsel
+    flash = getattr(request, FLASH_ATTRIBUTE, None)
+    if flash is not None:
+        flash.flush(batch_response)
+    return batch_response
@@ -0,0 +1,93 @@
+import calendar
+import datetime
+from typing import Callable, NamedTuple, Optional
+
+from asgiref.sync import iscoroutinefunction
+from django.utils.cache import get_conditional_response, set_response_etag
+from django.utils.http import http_date, parse_http_date_safe
+from django.utils.http import quote_etag
+
+from .lib import run_in_thread_pool
+
+# as Django's `ConditionalGetMiddleware`, other methods run the action for its side effects
+CONDITIONAL_METHODS = ('GET', 'HEAD')
+
+class Validators(NamedTuple):
+    etag: Optional[str] = None
+    last_modified: Optional[int] = None
+
+class ConditionalGet(object):
+    """
+    Answers conditional GET and HEAD requests for one action, see the `conditional_get` decorator.
+
+    The `etag` and `last_modified` callables take the controller, the request and the url parameters, like an action.
+    They are evaluated after the `_before_filter`, if the request's `If-None-Match` or `If-Modified-Since` header
+    matches, a 304 response is returned without running the action or the renderer.
+    Without either callable, a strong ETag is computed from the rendered response.
+    """
+    def __init__(self, etag:Optional[Callable] = None, last_modified:Optional[Callable] = None):
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def __repr__(self):
+        return "<ConditionalGet etag=%r last_modified=%r>" % (self.etag, self.last_modified)
+
+    @property
+    def auto_etag(self) -> bool:
+        return self.etag is None and self.last_modified is None
+
+    @staticmethod
+    def _make_validators(etag, last_modified) -> Validators:
+        if etag is not None:
+            etag = quote_etag(etag)
+        if isinstance(last_modified, datetime.datetime):
+            last_modified = calendar.timegm(last_modified.utctimetuple())
+        return Validators(etag=etag, last_modified=last_modified)
+
+    def get_validators(self, controller, args:tuple, kwargs:dict) -> Validators:
+        request = controller._request
+        return self._make_validators(
+            etag=self.etag(controller, request, *args, **kwargs) if self.etag is not None else None,
+            last_modified=self.last_modified(controller, request, *args, **kwargs) if self.last_modified is not None else None,
+        )
+
+    async def get_validators_async(self, controller, args:tuple, kwargs:dict) -> Validators:
+        values = []
+        for func in (self.etag, self.last_modified):
+            if func is None:
+                values.append(None)
+            elif iscoroutinefunction(func):
+                values.append(await func(controller, controller._request, *args, **kwargs))
+            else:
+                values.append(await run_in_thread_pool(func, controller, controller._request, *args, **kwargs))
+        return self._make_validators(*values)
+
+    @staticmethod
+    def get_not_modified_response(request, validators:Validators):
+        """A 304 or 412 response if the request's preconditions already decide the outcome, otherwise None."""
+        if request.method not in CONDITIONAL_METHODS:
+            return None
+        if validators.etag is None and validators.last_modified is None:
+            return None
+        return get_conditional_response(request, etag=validators.etag, last_modified=validators.last_modified)
+
+    def set_validators(self, response, validators:Optional[Validators]):
+        if response.streaming or not (200 <= response.status_code < 300):
+            return
+        if validators is not None:
+            if validators.etag is not None and not response.has_header('ETag'):
+                response['ETag'] = validators.etag
+            if validators.last_modified is not None and not response.has_header('Last-Modified'):
+                response['Last-Modified'] = http_date(validators.last_modified)
+        if self.auto_etag and not response.has_header('ETag'):
+            set_response_etag(response)
+
+    @staticmethod
+    def get_response(request, response):
+        """Replace `response` with a 304, or 412, if it matches the request's conditional headers."""
+        if request.method not in CONDITIONAL_METHODS or response.streaming:
+            return response
+        return get_conditional_response(request,
+                                        etag=response.get('ETag'),
+                                        last_modified=parse_http_date_safe(response.get('Last-Modified')),
+                                        response=response)
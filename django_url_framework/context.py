@@ -0,0 +1,149 @@
+"""
+Context providers, named values shared by the actions of a controller, see the `provides` and `uses_context` decorators.
+
+Providers are methods of the controller, or, for a single action, callables given to `uses_context`, called with
+the controller and the request. Only the providers an action uses are called, each at most once per request, after
+`_before_filter` and before the action, and their values are added to the template context. Independent providers
+are called concurrently, in the thread pool when the action is dispatched synchronously, or on the event loop,
+then the others in order. Any provider can read the value of another with `controller._get_context(name)`.
+
+The thread pool of synchronously dispatched actions is their own, `settings.URL_FRAMEWORK_CONTEXT_THREAD_POOL_SIZE`
+threads, 0 calls them in order. Sharing the pool of `get_thread_pool` could deadlock, when the action is itself
+dispatched from one of its threads and waits for providers queued behind it.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.db import close_old_connections
+
+from .exceptions import ConfigurationError
+from .lib import run_in_thread_pool
+
+THREAD_NAME_PREFIX = "django_url_framework_context"
+_thread_pool = None
+_thread_pool_lock = threading.Lock()
+
+def get_context_thread_pool() -> Optional[ThreadPoolExecutor]:
+    """
+    The thread pool independent providers of synchronously dispatched actions run in,
+    None if `settings.URL_FRAMEWORK_CONTEXT_THREAD_POOL_SIZE` is 0.
+    """
+    global _thread_pool
+    size = getattr(settings, 'URL_FRAMEWORK_CONTEXT_THREAD_POOL_SIZE', 4)
+    if not size:
+        return None
+    if _thread_pool is None:
+        with _thread_pool_lock:
+            if _thread_pool is None:
+                _thread_pool = ThreadPoolExecutor(max_workers=size, thread_name_prefix=THREAD_NAME_PREFIX)
+    return _thread_pool
+
+class ContextProvider(NamedTuple):
+    name: str
+    func: Callable
+    independent: bool
+    is_async: bool
+
+    @classmethod
+    def from_func(cls, name:str, func:Callable) -> 'ContextProvider':
+        return cls(name=name, func=func, independent=bool(getattr(func, 'independent_context', False)),
+                   is_async=iscoroutinefunction(func))
+
+def find_context_providers(controller_class:type) -> Dict[str, ContextProvider]:
+    """The providers defined on a controller class and its bases, by name."""
+    attribute_names = set()
+    for klass in controller_class.__mro__:
+        if klass is not object:
+            attribute_names.update(klass.__dict__)
+    providers = {}
+    for attribute_name in sorted(attribute_names):
+        func = getattr(controller_class, attribute_name)
+        name = getattr(func, 'provides_context', None)
+        if name is not None:
+            providers[name] = ContextProvider.from_func(name, func)
+    return providers
+
+def compile_context_providers(controller_class:type, controller_providers:Dict[str, ContextProvider],
+                              action_func) -> Tuple[ContextProvider, ...]:
+    """The providers an action uses, from the `shared_context` of its controller and its `uses_context`, in that order."""
+    action_providers = getattr(action_func, 'context_providers', {})
+    names = list(getattr(controller_class, 'shared_context', None) or ()) + list(getattr(action_func, 'uses_context', ()))
+    providers = []
+    for name in dict.fromkeys(names):
+        if name in action_providers:
+            providers.append(ContextProvider.from_func(name, action_providers[name]))
+        elif name in controller_providers:
+            providers.append(controller_providers[name])
+        else:
+            raise ConfigurationError("%s.%s uses the context %r, which no provider provides"
+                                     % (controller_class.__name__, action_func.__name__, name))
+    return tuple(providers)
+
+def get_provider(controller, name:str) -> ContextProvider:
+    """The provider of `name` for the action the controller is dispatching, or any provider of the controller."""
+    plan = controller._dispatch_plan
+    if plan is not None:
+        for provider in plan.context_providers:
+            if provider.name == name:
+                return provider
+    from .controller import get_action_registry
+    provider = get_action_registry(controller).context_providers.get(name)
+    if provider is None:
+        raise KeyError(name)
+    return provider
+
+def call_provider(controller, provider:ContextProvider):
+    if provider.is_async:
+        return async_to_sync(provider.func)(controller, controller._request)
+    return provider.func(controller, controller._request)
+
+def _call_provider_in_thread(controller, provider:ContextProvider):
+    # the thread outlives the request, its database connections are not closed by the request handler
+    close_old_connections()
+    try:
+        return call_provider(controller, provider)
+    finally:
+        close_old_connections()
+
+async def call_provider_async(controller, provider:ContextProvider):
+    if provider.is_async:
+        return await provider.func(controller, controller._request)
+    return await run_in_thread_pool(_call_provider_in_thread, controller, provider)
+
+def _get_independent(controller, providers:Iterable[ContextProvider]) -> list:
+    return [provider for provider in providers
+            if provider.independent and provider.name not in controller._context_values]
+
+def resolve_context(controller, providers:Tuple[ContextProvider, ...]) -> dict:
+    """The values of the providers, the independent ones are called concurrently in the thread pool."""
+    values = controller._context_values
+    independent = _get_independent(controller, providers)
+    thread_pool = get_context_thread_pool()
+    # a provider on a thread of the pool that waits for others queued behind it could wait forever
+    if (len(independent) > 1 and thread_pool is not None
+            and not threading.current_thread().name.startswith(THREAD_NAME_PREFIX)):
+        futures = [(provider, thread_pool.submit(_call_provider_in_thread, controller, provider))
+                   for provider in independent]
+        for provider, future in futures:
+            values[provider.name] = future.result()
+    for provider in providers:
+        if provider.name not in values:
+            values[provider.name] = call_provider(controller, provider)
+    return {provider.name: values[provider.name] for provider in providers}
+
+async def resolve_context_async(controller, providers:Tuple[ContextProvider, ...]) -> dict:
+    """The values of the providers, the independent ones are awaited concurrently."""
+    values = controller._context_values
+    independent = _get_independent(controller, providers)
+    if len(independent) > 1:
+        results = await asyncio.gather(*[call_provider_async(controller, provider) for provider in independent])
+        for provider, result in zip(independent, results):
+            values[provider.name] = result
+    for provider in providers:
+        if provider.name not in values:
+            values[provider.name] = await call_provider_async(controller, provider)
+    return {provider.name: values[provider.name] for provider in providers}
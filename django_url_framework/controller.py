@@ -8,8 +8,10 @@ from django.urls import path
 import django_url_framework #for type hinting
 import inspect
 from functools import wraps
+from itertools import groupby
 from json.encoder import JSONEncoder
-from typing import Union, Tuple, Iterable, Optional
+from types import MappingProxyType
+from typing import Union, Tuple, Iterable, Optional, Mapping, FrozenSet, NamedTuple, Dict
 
 from django.http import *
 import re
@@ -17,15 +19,40 @@ import sys
 
 import warnings
 
+from asgiref.sync import async_to_sync, iscoroutinefunction
+
 from .lib import is_ajax
-from .renderers import JSONRenderer, YAMLRenderer, TextRenderer, TemplateRenderer, Renderer, RedirectRenderer
+from .lib import run_in_thread_pool
+from .json_backends import get_encoder_with_default
+from .action_cache import ActionCache
+from .negotiation import RendererRegistry, default_renderers
+from .conditional import CONDITIONAL_METHODS, ConditionalGet
+from .context import ContextProvider, find_context_providers, compile_context_providers, get_provider
+from .context import call_provider, call_provider_async, resolve_context, resolve_context_async
+from .instrumentation import start_phase_timer
+from .renderers import JSONRenderer, YAMLRenderer, TextRenderer, TemplateRenderer, Renderer, RedirectRenderer, StreamingJSONRenderer
+from .renderers import NDJSONRenderer, CSVRenderer
 from .helper import ApplicationHelper
 from django.urls import re_path, include
 
 from .exceptions import ConfigurationError
-from .exceptions import MethodNotAllowed
 from .exceptions import InvalidActionError
 
+def controller_name_from_class_name(class_name:str, use_inflection_lib:bool = False) -> str:
+    """Convert a controller class name such as `FooBarController` into a controller name, `foo_bar`."""
+    if use_inflection_lib:
+        import inflection
+        return re.sub(r"_controller$", "", inflection.underscore(class_name))
+    name_ = [class_name[0]]
+    prev = ''
+    for l in re.sub(r"Controller$",'',class_name[1:]):
+        if l.isupper() and prev.islower():
+            name_.append('_'+l)
+        else:
+            name_.append(l)
+        prev = l
+    return ''.join(name_).lower()
+
 def get_controller_name(controller_class:'ActionController.__class__', with_prefix:bool = True) -> str:
     if isinstance(controller_class, ActionController):
         controller_class = controller_class.__class__
@@ -33,50 +60,138 @@ def get_controller_name(controller_class:'ActionController.__class__', with_pref
     controller_name = getattr(controller_class, 'controller_name', None)
     use_inflection_lib = getattr(controller_class,"use_inflection_library",False) #todo defaults to True in 2021
     if controller_name is None:
-        if use_inflection_lib:
-            import inflection
-            controller_name = re.sub(r"_controller$", "", inflection.underscore(controller_class.__name__))
-        else:
-            name_ = [controller_class.__name__[0]]
-            prev = ''
-            for l in re.sub(r"Controller$",'',controller_class.__name__[1:]):
-                if l.isupper() and prev.islower():
-                    name_.append('_'+l)
-                else:
-                    name_.append(l)
-                prev = l
-            controller_name = ''.join(name_).lower()
+        controller_name = controller_name_from_class_name(controller_class.__name__, use_inflection_lib)
 
     controller_prefix = getattr(controller_class, 'controller_prefix', None)
     if with_prefix and controller_prefix not in (None, ''):
         controller_name = controller_class.controller_prefix + controller_name
     return controller_name
 
+class DispatchPlan(NamedTuple):
+    """
+    Everything about a (controller, action) pair that does not change between requests.
+    It is compiled once, when the urlconf is generated, so that dispatching a request
+    does not have to probe the controller and action function again.
+    """
+    controller_class: type
+    controller_name: str
+    action_name: str
+    action_name_sans_prefix: str
+    func_name: str
+    allowed_methods: Optional[Tuple[str, ...]]
+    renderer_args: Mapping
+    disable_filters: bool
+    no_ajax_prefix: bool
+    pass_request: bool
+    consumed_kwargs: FrozenSet[str]
+    async_action: bool
+    async_before_filter: bool
+    async_after_filter: bool
+    action_cache: Optional[ActionCache] = None
+    conditional_get: Optional[ConditionalGet] = None
+    context_providers: Tuple[ContextProvider, ...] = ()
+    async_context: bool = False
+
+    @property
+    def is_async(self) -> bool:
+        """The action, a filter or a context provider is a coroutine function and must be dispatched asynchronously."""
+        return self.async_action or self.async_before_filter or self.async_after_filter or self.async_context
+
+def compile_dispatch_plan(controller_class:'ActionController.__class__', action_name:str, action_func) -> DispatchPlan:
+    allowed_methods = getattr(action_func, "allowed_methods",
+                              getattr(controller_class._before_filter, "allowed_methods", None))
+    if allowed_methods:
+        if type(allowed_methods) not in (list, tuple):
+            allowed_methods = (allowed_methods.upper(),)
+        else:
+            allowed_methods = tuple(i.upper() for i in allowed_methods)
+    else:
+        allowed_methods = None
+
+    renderer_args = {}
+    if hasattr(action_func,'mimetype'):
+        renderer_args['mimetype'] = action_func.mimetype
+    if hasattr(action_func,'charset'):
+        renderer_args['charset'] = action_func.charset
+
+    if hasattr(action_func, 'ignore_ajax'):
+        warnings.warn("action.ignore_ajax is deprecated, remove 2017-01-01", DeprecationWarning)
+        no_ajax_prefix = bool(action_func.ignore_ajax)
+    else:
+        no_ajax_prefix = bool(getattr(action_func, 'no_ajax_prefix', False))
+
+    consumed_kwargs = getattr(controller_class, 'consume_urlconf_keyword_arguments', None)
+    if type(consumed_kwargs) not in (list, tuple):
+        consumed_kwargs = ()
+
+    action_cache = None
+    cache_options = getattr(action_func, 'cache_options', None)
+    if cache_options is not None:
+        # the renderer is only known in advance if the action is decorated with a fixed one, such as `@json_action`
+        action_renderer = getattr(action_func, 'action_renderer', None)
+        action_cache = ActionCache(options=cache_options,
+                                   controller_name=get_controller_name(controller_class),
+                                   action_name=action_name,
+                                   negotiated=action_renderer in (None, '_as_auto_response'))
+
+    conditional_get = getattr(action_func, 'conditional_get', None)
+    if not isinstance(conditional_get, ConditionalGet):
+        etag, last_modified = controller_class._get_etag, controller_class._get_last_modified
+        if controller_class.conditional_get or etag is not None or last_modified is not None:
+            conditional_get = ConditionalGet(etag=etag, last_modified=last_modified)
+        else:
+            conditional_get = None
+
+    context_providers = compile_context_providers(controller_class, get_action_registry(controller_class).context_providers,
+                                                  action_func)
+
+    return DispatchPlan(
+        controller_class=controller_class,
+        controller_name=get_controller_name(controller_class),
+        action_name=action_name,
+        action_name_sans_prefix=get_action_name(action_func),
+        func_name=action_func.__name__,
+        allowed_methods=allowed_methods,
+        renderer_args=MappingProxyType(renderer_args),
+        disable_filters=bool(getattr(action_func, 'disable_filters', False)),
+        no_ajax_prefix=no_ajax_prefix,
+        pass_request=not hasattr(controller_class, 'do_not_pass_request'),
+        consumed_kwargs=frozenset(consumed_kwargs),
+        async_action=iscoroutinefunction(action_func),
+        async_before_filter=iscoroutinefunction(controller_class._before_filter),
+        async_after_filter=iscoroutinefunction(controller_class._after_filter),
+        action_cache=action_cache,
+        conditional_get=conditional_get,
+        context_providers=context_providers,
+        async_context=any(provider.is_async for provider in context_providers),
+    )
+
+def get_dispatch_plan(controller_class:'ActionController.__class__', action_name:str) -> DispatchPlan:
+    return get_action_registry(controller_class).get_plan(action_name)
+
+def _instantiate_controller(site, request, plan:DispatchPlan, kwargs:dict) -> 'ActionController':
+    url_params = kwargs
+    if plan.consumed_kwargs:
+        url_params = kwargs.copy()
+        for kwarg in plan.consumed_kwargs:
+            kwargs.pop(kwarg, None)
+    return plan.controller_class(site=site, request=request, helper_class=ApplicationHelper, url_params=url_params)
+
+def dispatch_plan(site:'django_url_framework.site.Site', request, plan:DispatchPlan, *args, **kwargs) -> HttpResponse:
+    """Instantiate the controller for this request and run the action described by `plan`."""
+    return _instantiate_controller(site, request, plan, kwargs)._dispatch(plan, *args, **kwargs)
+
+async def dispatch_plan_async(site:'django_url_framework.site.Site', request, plan:DispatchPlan, *args, **kwargs) -> HttpResponse:
+    """The asynchronous version of `dispatch_plan`, used as the view of async actions and controllers."""
+    return await _instantiate_controller(site, request, plan, kwargs)._dispatch_async(plan, *args, **kwargs)
+
 def autoview_function(site:'django_url_framework.site.Site', request, controller_name:str, controller_class:'ActionController.__class__', action_name:str = 'index', *args, **kwargs) -> HttpResponse:
-    error_msg = None
     try:
-        # if controller_name in self.controllers:
-        # controller_class = self.controllers[controller_name]
-        if action_name in get_actions(controller_class):
-            helper = ApplicationHelper#self.helpers.get(controller_name, ApplicationHelper)
-            kwargs_all = kwargs.copy()
-            if hasattr(controller_class, 'consume_urlconf_keyword_arguments'):
-                if type(controller_class.consume_urlconf_keyword_arguments) not in (list, tuple):
-                    controller_class.consume_urlconf_keyword_arguments = []
-                for kwarg in controller_class.consume_urlconf_keyword_arguments:
-                    if kwarg in kwargs:
-                        del(kwargs[kwarg])
-            return controller_class(site=site, request=request, helper_class=helper, url_params=kwargs_all)._call_action(action_name, *args, **kwargs)
-        else:
-            raise InvalidActionError(action_name)
-        # else:
-            # raise InvalidControllerError()
-    # except InvalidControllerError, e:
-        # error_msg = _("No such controller: %(controller_name)s") % {'controller_name' : controller_name}
+        plan = get_dispatch_plan(controller_class, action_name)
     except InvalidActionError as e:
         error_msg = "Action '%(action_name)s' not found in controller '%(controller_name)s'" % {'action_name' : e, 'controller_name' : controller_name}
-
-    raise Http404(error_msg)
+        raise Http404(error_msg)
+    return dispatch_plan(site, request, plan, *args, **kwargs)
 
 def _is_action_func(action_func):
     """
@@ -88,18 +203,15 @@ def _is_action_func(action_func):
     # if the passed function was wrapped with a decorator, let's make sure to get the actual function
     while hasattr(action_func,"__wrapped__"):
         action_func = action_func.__wrapped__
-    if not callable(action_func) or not isinstance(action_func, FunctionType):
+    if not isinstance(action_func, FunctionType) or hasattr(action_func, 'provides_context'):
         return False
 
     func_name = action_func.__name__
     if re.match(r'^[_\-A-Z0-9]',func_name[0]):
         return False
 
-    arg_spec = inspect.getfullargspec(action_func)
-    arguments = arg_spec.args
-    if len(arguments)>1 and arguments[1]=="request":
-        return True
-    return False
+    code = action_func.__code__
+    return code.co_argcount>1 and code.co_varnames[1]=="request"
 
 def _get_urlconf_param_type(datatype:type):
     if datatype is None or datatype not in (int,str):
@@ -133,35 +245,36 @@ def _get_arg_name_and_default(action_func)->Tuple[Optional[str],bool,Optional[ty
         return arg_name, has_default, datatype
     return None, True, None
 
-def get_controller_urlconf(controller_class:'ActionController.__class__', site=None):
-    controller_name = get_controller_name(controller_class)
+class ActionRoute(NamedTuple):
+    """
+    A single URL pattern generated for an action, relative to the controller's own URL.
+    Routes are plain data so they can be inspected, or stored and turned into URL patterns later.
+    """
+    action_name: str
+    route: str
+    name: str
+    is_regex: bool = False
+    urlconf_prefix: Optional[str] = None
+
+def get_controller_routes(controller_class:'ActionController.__class__') -> list:
+    """Return the list of `ActionRoute`s for all actions in the controller, in the order they should be matched."""
     actions = get_actions(controller_class)
-    urlpatterns = []
-    urlpatterns_with_args = []
-    def wrap_call(_controller_name, _action_name, _action_func):
-        """Wrapper for the function called by the url."""
-        def wrapper(*args, **kwargs):
-            request, args = args[0], args[1:]
-            return autoview_function(site=site,
-                                     request=request,
-                                     controller_name=_controller_name,
-                                     controller_class=controller_class,
-                                     action_name=_action_name, *args, **kwargs)
-        return wraps(_action_func)(wrapper)
+    routes = []
+    routes_with_args = []
+    controller_name_sans_prefix = get_controller_name(controller_class, with_prefix=False)
+    urlconf_prefix = getattr(controller_class, 'urlconf_prefix', None)
 
     for action_name, action_func in list(actions.items()):
-        named_url = '%s_%s' % (get_controller_name(controller_class, with_prefix=False), get_action_name(action_func) )
+        named_url = '%s_%s' % (controller_name_sans_prefix, get_action_name(action_func) )
         named_url = getattr(action_func, 'named_url', named_url)
         replace_dict = {'action':action_name.replace("__","/")}
-        wrapped_call = wrap_call(controller_name, action_name, action_func)
-        urlconf_prefix = getattr(controller_class, 'urlconf_prefix', None)
-        action_urlpatterns = []
-        index_action_with_args_urlconf = []
+        action_routes = []
+        index_action_with_args_routes = []
 
         if hasattr(action_func, 'urlconf'):
             """Define custom urlconf patterns for this action."""
             for new_urlconf in action_func.urlconf:
-                action_urlpatterns.append(re_path(new_urlconf, view=wrapped_call, name=named_url))
+                action_routes.append((new_urlconf, True))
 
         if not getattr(action_func, 'urlconf_erase', False):
             """Do not generate default URL patterns if we define 'urlconf_erase' for this action."""
@@ -173,42 +286,69 @@ def get_controller_urlconf(controller_class:'ActionController.__class__', site=N
                 if object_id_arg_name is not None:
                     replace_dict['object_id_arg_name'] = object_id_arg_name
                     replace_dict['type'] = _get_urlconf_param_type(datatype)
-                    index_action_with_args_urlconf.append(path("<%(type)s:%(object_id_arg_name)s>/" % replace_dict, view=wrapped_call, name=named_url))
+                    index_action_with_args_routes.append(("<%(type)s:%(object_id_arg_name)s>/" % replace_dict, False))
                 if has_default:
-                    action_urlpatterns.append(path("", view=wrapped_call, name=named_url))
+                    action_routes.append(("", False))
 
             else:
                 if hasattr(action_func, 'url_parameters'):
                     arguments = action_func.url_parameters
                     replace_dict['url_parameters'] = arguments
-                    action_urlpatterns.append(path("%(action)s/%(url_parameters)s" % replace_dict, view=wrapped_call, name=named_url))
+                    action_routes.append(("%(action)s/%(url_parameters)s" % replace_dict, False))
 
                 else:
                     object_id_arg_name, has_default, datatype = _get_arg_name_and_default(action_func)
                     if object_id_arg_name is not None:
                         replace_dict['object_id_arg_name'] = object_id_arg_name
                         replace_dict['type'] = _get_urlconf_param_type(datatype)
-                        action_urlpatterns.append(path('%(action)s/<%(type)s:%(object_id_arg_name)s>/' % replace_dict, view=wrapped_call, name=named_url))
+                        action_routes.append(('%(action)s/<%(type)s:%(object_id_arg_name)s>/' % replace_dict, False))
                     if has_default:
-                        action_urlpatterns.append(path('%(action)s/' % replace_dict, view=wrapped_call, name=named_url))
+                        action_routes.append(('%(action)s/' % replace_dict, False))
 
-        if urlconf_prefix:
-            action_urlpatterns_with_prefix = []
-            for _urlconf in urlconf_prefix:
-                action_urlpatterns_with_prefix.append(re_path(_urlconf, include(action_urlpatterns)))
-            urlpatterns += action_urlpatterns_with_prefix
+        for _urlconf in (urlconf_prefix or (None,)):
+            routes += [ActionRoute(action_name, route, named_url, is_regex, _urlconf) for route, is_regex in action_routes]
+            routes_with_args += [ActionRoute(action_name, route, named_url, is_regex, _urlconf) for route, is_regex in index_action_with_args_routes]
+
+    return routes + routes_with_args
 
-            action_urlpatterns_with_args_with_prefix = []
-            for _urlconf in urlconf_prefix:
-                action_urlpatterns_with_args_with_prefix.append(re_path(_urlconf, include(action_urlpatterns_with_args_with_prefix)))
+def build_urlpatterns(routes:Iterable[ActionRoute], get_view) -> list:
+    """
+    Turn `ActionRoute`s into django URL patterns.
+    Consecutive routes of the same action that share an `urlconf_prefix` are included under that prefix.
 
-            urlpatterns_with_args += action_urlpatterns_with_args_with_prefix
+    :param routes: the routes, usually from `get_controller_routes`
+    :param get_view: a callable returning the view function for an action name
+    """
+    urlpatterns = []
+    for (action_name, urlconf_prefix), action_routes in groupby(routes, key=lambda r:(r.action_name, r.urlconf_prefix)):
+        view = get_view(action_name)
+        action_urlpatterns = [(re_path if r.is_regex else path)(r.route, view=view, name=r.name) for r in action_routes]
+        if urlconf_prefix:
+            urlpatterns.append(re_path(urlconf_prefix, include(action_urlpatterns)))
         else:
             urlpatterns += action_urlpatterns
-            urlpatterns_with_args += index_action_with_args_urlconf
+    return urlpatterns
 
-    return urlpatterns + urlpatterns_with_args
-CACHED_ACTIONS = {}
+def get_controller_urlconf(controller_class:'ActionController.__class__', site=None, routes:Optional[Iterable[ActionRoute]] = None):
+    """:param routes: the routes of the controller, if they were already generated with `get_controller_routes`"""
+    actions = get_actions(controller_class)
+    def wrap_call(action_name):
+        """Wrapper for the function called by the url."""
+        plan = get_dispatch_plan(controller_class, action_name)
+        if plan.is_async:
+            async def wrapper(request, *args, **kwargs):
+                return await dispatch_plan_async(site, request, plan, *args, **kwargs)
+        else:
+            def wrapper(request, *args, **kwargs):
+                return dispatch_plan(site, request, plan, *args, **kwargs)
+        wrapper = wraps(actions[action_name])(wrapper)
+        # for `django_url_framework.inspection`, to tell which action a URL pattern dispatches to
+        wrapper.get_dispatch_plan = lambda: plan
+        return wrapper
+
+    if routes is None:
+        routes = get_controller_routes(controller_class)
+    return build_urlpatterns(routes, wrap_call)
 
 def get_action_name(func, with_prefix = False):
     if callable(func):
@@ -221,42 +361,130 @@ def get_action_name(func, with_prefix = False):
             return func_name
     raise InvalidActionError(func.__name__)
 
-def get_actions(controller, with_prefix = True):
+class ControllerMetadata(object):
+    """
+    The state of a controller that only depends on its class, computed once by its `ActionRegistry`
+    and copied onto each instance, instead of being worked out again on every request.
+    """
+    __slots__ = ('controller_name', 'controller_name_sans_prefix', 'no_ajax_prefix', 'template_extension',
+                 'template_prefix', 'template_string', 'ajax_template_string')
+
+    def __init__(self, controller_class:'ActionController.__class__'):
+        if not issubclass(ActionController.default_renderer, Renderer):
+            raise ConfigurationError("Invalid `default_renderer`, must be subclass of `Renderer`.")
+
+        self.controller_name = get_controller_name(controller_class)
+        self.controller_name_sans_prefix = get_controller_name(controller_class, with_prefix=False)
+
+        if hasattr(controller_class, 'ignore_ajax'):
+            warnings.warn("ActionController.ignore_ajax is deprecated, remove 2017-01-01", DeprecationWarning)
+            self.no_ajax_prefix = getattr(controller_class, 'ignore_ajax', False)
+        else:
+            self.no_ajax_prefix = getattr(controller_class, 'no_ajax_prefix', False)
+
+        self.template_extension = getattr(controller_class, 'template_extension', 'html')
+
+        if getattr(controller_class, 'template_prefix', None) is not None:
+            self.template_prefix = controller_class.template_prefix
+        else:
+            self.template_prefix = self.controller_name_sans_prefix
+
+        if getattr(controller_class, 'no_subdirectories', False):
+            self.template_string = "%(controller)s_%(action)s.%(ext)s"
+            self.ajax_template_string = "_%(controller)s_%(action)s.%(ext)s"
+        else:
+            self.template_string = "%(controller)s/%(action)s.%(ext)s"
+            self.ajax_template_string = "%(controller)s/_%(action)s.%(ext)s"
+
+class ActionRegistry(object):
+    """
+    The actions of a single controller class, introspected once and stored on the class itself,
+    so it can not collide with another controller of the same name and goes away with the class.
+    """
+    __slots__ = ('controller_class', 'actions', 'actions_by_name', 'plans', 'named_urls', '_metadata',
+                 '_context_providers')
+
+    def __init__(self, controller_class:'ActionController.__class__'):
+        self.controller_class = controller_class
+        self.actions = {}
+        self.actions_by_name = {}
+        self.plans = {}
+        self.named_urls = {}
+        self._metadata = None
+        self._context_providers = None
+
+        attribute_names = set()
+        for klass in controller_class.__mro__:
+            if klass is not object:
+                attribute_names.update(klass.__dict__)
+
+        for attribute_name in sorted(attribute_names):
+            func = getattr(controller_class, attribute_name)
+            if _is_action_func(action_func=func):
+                func_name = getattr(func, 'action_name', func.__name__)
+                self.actions_by_name[func_name] = func
+                self.actions[getattr(func, 'action_prefix', '') + func_name] = func
+
+    def get_plan(self, action_name:str) -> DispatchPlan:
+        plan = self.plans.get(action_name)
+        if plan is None:
+            if action_name not in self.actions:
+                raise InvalidActionError(action_name)
+            plan = self.plans[action_name] = compile_dispatch_plan(self.controller_class, action_name, self.actions[action_name])
+        return plan
+
+    @property
+    def metadata(self) -> ControllerMetadata:
+        """The `ControllerMetadata` of the class, computed on first use, as the site sets up the class before that."""
+        if self._metadata is None:
+            self._metadata = ControllerMetadata(self.controller_class)
+        return self._metadata
+
+    @property
+    def context_providers(self) -> Dict[str, ContextProvider]:
+        """The context providers of the class by name, see `django_url_framework.decorators.provides`."""
+        if self._context_providers is None:
+            self._context_providers = find_context_providers(self.controller_class)
+        return self._context_providers
+
+    def get_named_url(self, action_name:str) -> str:
+        """The URL name of an action, by its name without prefix, as `get_controller_routes` names it."""
+        named_url = self.named_urls.get(action_name)
+        if named_url is None:
+            if action_name not in self.actions_by_name:
+                raise InvalidActionError(action_name)
+            named_url = getattr(self.actions_by_name[action_name], 'named_url', None)
+            if named_url is None:
+                named_url = '%s_%s' % (get_controller_name(self.controller_class, with_prefix=False), action_name)
+            self.named_urls[action_name] = named_url
+        return named_url
+
+def get_action_registry(controller) -> ActionRegistry:
+    """Return the `ActionRegistry` of a controller class or instance, building it on first use."""
     if isinstance(controller, ActionController):
-        controller_cache_key = controller.__class__.__name__ + str(with_prefix)
         controller = controller.__class__
-    else:
-        controller_cache_key = controller.__name__ + str(with_prefix)
-        
-    if controller_cache_key not in CACHED_ACTIONS:
-        actions = {}
-        for func_name in dir(controller):
-            func = getattr(controller,func_name)
-            if _is_action_func(action_func=func):
-                if hasattr(func, 'action_name'):
-                    func_name = func.action_name
-                if with_prefix and hasattr(func, 'action_prefix'):
-                    func_name = func.action_prefix + func_name
-                actions[func_name] = func
-        CACHED_ACTIONS[controller_cache_key] = actions
-    return CACHED_ACTIONS[controller_cache_key]
+    registry = controller.__dict__.get('_action_registry')
+    if registry is None:
+        registry = ActionRegistry(controller)
+        controller._action_registry = registry
+    return registry
+
+def get_actions(controller, with_prefix = True):
+    registry = get_action_registry(controller)
+    if with_prefix:
+        return registry.actions
+    return registry.actions_by_name
 
 def get_action_wrapper(site, controller_class, action_name):
     """Possible future helper method..."""
-    controller_name = get_controller_name(controller_class)
-    actions = get_actions(controller_class)
-    def wrap_call(controller_name, action_name, action_func):
-        """Wrapper for the function called by the url."""
-        def wrapper(*args, **kwargs):
-            request, args = args[0], args[1:]
-            return autoview_function(site, request, controller_name, controller_class, action_name, *args, **kwargs)
-        return wraps(action_func)(wrapper)
-    
-    if action_name in actions:
-        wrapped_call = wrap_call(controller_name, action_name, actions[action_name])
-        return wrapped_call
+    plan = get_dispatch_plan(controller_class, action_name)
+    if plan.is_async:
+        async def wrapper(request, *args, **kwargs):
+            return await dispatch_plan_async(site, request, plan, *args, **kwargs)
     else:
-        raise InvalidActionError(action_name)
+        def wrapper(request, *args, **kwargs):
+            return dispatch_plan(site, request, plan, *args, **kwargs)
+    return wraps(get_actions(controller_class)[action_name])(wrapper)
 
 default_charset = 'utf8'
 
@@ -310,6 +538,25 @@ class ActionController(object):
         json_default_encoder
                 Allows you to specify a custom JSON encoder class for all json encoding. Default is `DjangoJSONEncoder`
 
+        renderers
+                A dict of media types and `Renderer` classes, added to the ones `@auto` chooses from,
+                see `django_url_framework.negotiation.RendererRegistry`.
+
+        json_backend
+                The JSON serialization backend, `json`, `orjson`, `ujson`, `fast` or a dotted path to a `JSONBackend`.
+                Default: the `json_backend` of the site, or the `URL_FRAMEWORK_JSON_BACKEND` setting, or `json`
+
+        conditional_get
+                Answer conditional GET requests to all actions with 304 Not Modified, using strong ETags
+                computed from the rendered responses, see the `conditional_get` decorator.
+
+                Default: False
+
+        _get_etag, _get_last_modified
+                Methods taking the same arguments as the actions, returning the ETag or last modification
+                `datetime` of the response, or None. Defining either one enables `conditional_get`,
+                a matching request is answered with 304 Not Modified without running the action.
+
         use_inflection_library
                 Use this to convert controller class names using a new method, with the `inflection` library.
                 This will become the default after 2021. You can also set it as a global default in Site.autodiscover
@@ -329,51 +576,69 @@ class ActionController(object):
     consume_urlconf_keyword_arguments:Iterable[str] = None
     urlconf_prefix:list = None
     json_default_encoder:JSONEncoder = DjangoJSONEncoder
+    json_backend:Optional[str] = None
+    renderers:Optional[Mapping[str, type]] = None
+    conditional_get:bool = False
+    shared_context:Iterable[str] = ()
+    _get_etag = None
+    _get_last_modified = None
     yaml_default_flow_style:bool = True
     use_inflection_library:Optional[bool] = None
     default_renderer = TemplateRenderer
 
     def __init__(self, site, request, helper_class, url_params):
+        registry = self.__class__.__dict__.get('_action_registry')
+        if registry is None:
+            registry = get_action_registry(self.__class__)
+        metadata = registry.metadata
+
         self._site = site
-        if helper_class is None: helper_class = ApplicationHelper
-        self._helper = helper_class(self)
         self._request = request
-        self._response = HttpResponse()
+        self._url_params = url_params
+        self._is_ajax = is_ajax(request)
+        self._helper_class = helper_class
+        self._helper_instance = None
+        self._response_instance = None
+        self._status_code = None
         self._action_name = None
         self._action_name_sans_prefix = None
         self._action_func = None
-        self._controller_name = get_controller_name(self.__class__)
-        self._controller_name_sans_prefix = get_controller_name(self.__class__, with_prefix=False)
         self._flash_cache = None
         self._template_context = {}
-
-        if not issubclass(ActionController.default_renderer, Renderer):
-            raise ConfigurationError("Invalid `default_renderer`, must be subclass of `Renderer`.")
-
-        if hasattr(self, 'ignore_ajax'):
-            warnings.warn("ActionController.ignore_ajax is deprecated, remove 2017-01-01", DeprecationWarning)
-            self._no_ajax_prefix = getattr(self, 'ignore_ajax', False)
-        else:
-            self._no_ajax_prefix = getattr(self, 'no_ajax_prefix', False)
-
-        self._is_ajax = is_ajax(request)
-        self._url_params = url_params
-
-        self._template_extension = getattr(self, 'template_extension', 'html')
-
-        if getattr(self, 'template_prefix') is not None:
-            self._template_prefix = getattr(self, 'template_prefix')
-        else:
-            self._template_prefix = self._controller_name_sans_prefix
-            
-        if getattr(self, 'no_subdirectories', False):
-            self._template_string = "%(controller)s_%(action)s.%(ext)s"
-            self._ajax_template_string = "_%(controller)s_%(action)s.%(ext)s"
-        else:
-            self._template_string = "%(controller)s/%(action)s.%(ext)s"
-            self._ajax_template_string = "%(controller)s/_%(action)s.%(ext)s"
-        self._actions = get_actions(self, with_prefix = True)
-        self._actions_by_name = get_actions(self, with_prefix = False)
+        self._context_values = {}
+        self._dispatch_plan = None
+        self._phase_timer = None
+        # the action cache key of a response that is being revalidated, until it is stored
+        self._action_cache_key = None
+
+        self._controller_name = metadata.controller_name
+        self._controller_name_sans_prefix = metadata.controller_name_sans_prefix
+        self._no_ajax_prefix = metadata.no_ajax_prefix
+        self._template_extension = metadata.template_extension
+        self._template_prefix = metadata.template_prefix
+        self._template_string = metadata.template_string
+        self._ajax_template_string = metadata.ajax_template_string
+        self._actions = registry.actions
+        self._actions_by_name = registry.actions_by_name
+
+    def _get_helper(self) -> ApplicationHelper:
+        if self._helper_instance is None:
+            self._helper_instance = (self._helper_class or ApplicationHelper)(self)
+        return self._helper_instance
+
+    def _set_helper(self, helper:ApplicationHelper):
+        self._helper_instance = helper
+    _helper = property(_get_helper, _set_helper)
+
+    def _get_response(self) -> HttpResponse:
+        """The response that rendered content is written to, created when first used, which many requests never do."""
+        if self._response_instance is None:
+            self._response_instance = HttpResponse()
+        return self._response_instance
+
+    def _set_response(self, response:HttpResponse):
+        self._response_instance = response
+    _response = property(_get_response, _set_response)
 
     def _get_params(self, all_params=False):
         if self._request.method == "POST":
@@ -389,15 +654,10 @@ class ActionController(object):
         :param kwargs: the kwargs parsed from the URL
         :return:
         """
-        if action_name in self._actions:
-            action_func = self._actions[action_name]
-            action_func = getattr(self, action_func.__name__)
-            return self._view_wrapper(action_func,*args, **kwargs)
-        else:
-            raise InvalidActionError(action_name)
+        return self._dispatch(get_dispatch_plan(self.__class__, action_name), *args, **kwargs)
 
     def _has_action(self, action_name, with_prefix = False):
-        return (action_name in get_actions(action_name, with_prefix = with_prefix))
+        return (action_name in get_actions(self, with_prefix = with_prefix))
         
     def _get_action_name(self, action_func, with_prefix = True):
         if not re.match(r'^[_\-A-Z0-9]',action_func.__name__[0]) and callable(action_func):
@@ -411,65 +671,57 @@ class ActionController(object):
         raise InvalidActionError(action_func.__name__)
 
     def _get_renderer_for_request(self, data, **kwargs):
-        accept_types = self._request.headers.get("Accept")
-        content_type = None
-        if accept_types:
-            if isinstance(accept_types, (list,tuple)):
-                if len(accept_types)>0:
-                    content_type = accept_types[0]
-            else:
-                split_types = list(map(lambda x:x.strip(), accept_types.split(",")))
-                if len(split_types)>0:
-                    content_type = split_types[0]
-
-        _renderers_for_contenttypes = {
-            'text/html': TemplateRenderer,
-            'text/plain': TextRenderer,
-            "application/json":JSONRenderer,
-            "application/yaml":YAMLRenderer
-        }
-
-        renderer_klass = _renderers_for_contenttypes.get(content_type)
-
-        if not renderer_klass:
-            renderer_klass = TextRenderer
+        renderer_klass = self._get_renderer_class_for_request()
+        if kwargs.pop('streaming', False) and renderer_klass is JSONRenderer:
+            renderer_klass = StreamingJSONRenderer
 
         return self._instantiate_renderer(
             renderer_klass=renderer_klass,
             data=data,
             **kwargs)
 
+    def _get_renderer_class_for_request(self) -> type:
+        """The renderer class for the Accept header of the request, see `_get_renderer_registry`."""
+        return self._get_renderer_registry().get_renderer_class(self._request.headers.get("Accept"))
+
+    def _get_media_type_for_request(self) -> Optional[str]:
+        """The media type selected for the Accept header of the request, None if the default renderer is used."""
+        return self._get_renderer_registry().get_media_type(self._request.headers.get("Accept"))
+
+    def _get_renderer_registry(self) -> RendererRegistry:
+        """
+        The renderers of the site, or the default ones, extended with the `renderers` of the controller.
+        The registry of the controller class is built once per site registry.
+        """
+        base_registry = getattr(self._site, 'renderers', None) or default_renderers
+        if not self.renderers:
+            return base_registry
+        controller_registry = self.__class__.__dict__.get('_renderer_registry')
+        if controller_registry is None or controller_registry.parent is not base_registry:
+            controller_registry = RendererRegistry(self.renderers, parent=base_registry)
+            self.__class__._renderer_registry = controller_registry
+        return controller_registry
+
     def _instantiate_renderer(self, renderer_klass, data, **kwargs):
+        """Parameters passed explicitly, such as the ones given to `@auto`, take precedence over the controller defaults."""
+        return renderer_klass.from_controller(self, data=data, **kwargs)
 
-        _default_params = {
-            YAMLRenderer: {'default_flow_style': self.yaml_default_flow_style},
-            JSONRenderer: {'json_default_encoder':self.json_default_encoder},
-        }
-        if renderer_klass in _default_params:
-            kwargs.update(_default_params[renderer_klass])
-        return renderer_klass(data=data, **kwargs)
+    def _get_json_backend_name(self) -> Optional[str]:
+        """The controller's `json_backend`, or the site's, None means the `URL_FRAMEWORK_JSON_BACKEND` setting."""
+        return self.json_backend or getattr(self._site, 'json_backend', None)
 
 
-    def _check_http_method_access(self, action_func):
+    def _view_wrapper(self, action_func, *args, **kwargs) -> HttpResponse:
         """
-        return a list of allowed http methods, if the request.method is not one of them.
-        If we're allowed, return None.[
-        :param action_func:
-        :return:
+        Run `action_func` through the full request cycle, see `_dispatch`.
+
+        :param action_func: The action function in question
+        :return: an HttpResponse object
         """
-        allowed_methods = getattr(action_func, "allowed_methods",
-                                  getattr(self._before_filter, "allowed_methods", None)
-                                  )
-        if allowed_methods:
-            if type(allowed_methods) not in (list, tuple):
-                allowed_methods = [allowed_methods.upper()]
-            else:
-                allowed_methods = [i.upper() for i in allowed_methods]
-            if self._request.method.upper() not in allowed_methods:
-                raise MethodNotAllowed(', '.join(allowed_methods))
-        return True
+        plan = get_dispatch_plan(self.__class__, self._get_action_name(action_func))
+        return self._dispatch(plan, *args, **kwargs)
 
-    def _view_wrapper(self, action_func, *args, **kwargs) -> HttpResponse:
+    def _dispatch(self, plan:DispatchPlan, *args, **kwargs) -> HttpResponse:
         """
         wrap the view function, here we call
         * _before_filter
@@ -484,93 +736,301 @@ class ActionController(object):
         that, using the paradigm above - meaning text calls `__wrapped_print` and dict calls `__wrapped_render`.
         The `_after_filter` is skipped if `_on_exception` is called.
 
-        :param action_func: The action function in question
+        Async actions and filters are run through `_dispatch_async`.
+
+        :param plan: The precompiled `DispatchPlan` of the action in question
         :return: an HttpResponse object
         """
-        self._action_name = self._get_action_name(action_func)
-        self._action_func = action_func
+        if plan.is_async:
+            return async_to_sync(self._dispatch_async)(plan, *args, **kwargs)
 
-        if hasattr(action_func, 'ignore_ajax'):
-            warnings.warn("action.ignore_ajax is deprecated, remove 2017-01-01", DeprecationWarning)
-            self._no_ajax_prefix = self._no_ajax_prefix or getattr(action_func, 'ignore_ajax', False)
-        else:
-            self._no_ajax_prefix = self._no_ajax_prefix or getattr(action_func, 'no_ajax_prefix', False)
+        response = None
+        timer = self._phase_timer = start_phase_timer(self, plan)
+        try:
+            response = self.__dispatch(plan, *args, **kwargs)
+            self.__merge_cookies(response)
+        finally:
+            if self._action_cache_key is not None:
+                # the action raised, or a response was returned without being stored, let another request revalidate
+                plan.action_cache.release(self._action_cache_key)
+                self._action_cache_key = None
+            # also when the action raised, then there is no response to save cookie based messages on
+            if self._flash_cache is not None and self._flash_cache.changed:
+                self._flash_cache.flush(response)
+                if timer is not None:
+                    timer.mark('flash')
+            if timer is not None:
+                timer.finish(response)
+        return response
+
+    def __dispatch(self, plan:DispatchPlan, *args, **kwargs) -> HttpResponse:
+        action_func = self.__begin_dispatch(plan)
+        timer = self._phase_timer
+        if plan.allowed_methods is not None and self._request.method not in plan.allowed_methods:
+            return HttpResponseNotAllowed(plan.allowed_methods)
+
+        conditional_get = self.__get_conditional_get(plan)
+        cache_key = None
+        validators = None
+        try:
+            # run before filter
+            before_filter_response = self.__run_before_filter(plan=plan)
+            if timer is not None and not plan.disable_filters:
+                timer.mark('before_filter')
+            if issubclass(before_filter_response.__class__, HttpResponseBase):
+                return before_filter_response
 
-        self._action_name_sans_prefix = self._get_action_name(action_func, with_prefix=False)
+            if conditional_get is not None:
+                validators = conditional_get.get_validators(self, args, kwargs)
+                if timer is not None:
+                    timer.mark('conditional')
+                not_modified_response = conditional_get.get_not_modified_response(self._request, validators)
+                if not_modified_response is not None:
+                    return not_modified_response
+
+            if plan.action_cache is not None:
+                cache_key, cached_response = plan.action_cache.lookup(self, args, kwargs)
+                if timer is not None:
+                    timer.mark('cache')
+                if cached_response is not None:
+                    return self.__finish_response(conditional_get, cached_response)
+                self._action_cache_key = cache_key
+
+            if plan.context_providers:
+                self._template_context.update(resolve_context(self, plan.context_providers))
+                if timer is not None:
+                    timer.mark('context')
 
-        try:
-            self._check_http_method_access(action_func)
-        except MethodNotAllowed as e:
-            return HttpResponseNotAllowed(str(e))
+            # run the actual action
+            renderer = self.__run_action(action_func, plan, *args, **kwargs)
+            if timer is not None:
+                timer.mark('action')
+            if issubclass(renderer.__class__, HttpResponseBase):
+                return renderer
+
+            self.__merge_template_context(renderer)
 
-        send_args = {}
-        if hasattr(action_func,'mimetype'):
-            send_args['mimetype'] = action_func.mimetype
-        if hasattr(action_func,'charset'):
-            send_args['charset'] = action_func.charset
+            after_filter_response = self.__run_after_filter(renderer=renderer, plan=plan)
+            if timer is not None and not plan.disable_filters:
+                timer.mark('after_filter')
+            if issubclass(after_filter_response.__class__, HttpResponseBase):
+                return after_filter_response
+
+            self._status_code = renderer.status_code
 
+        except Exception as exception:
+            renderer = self.__handle_exception(exception, plan)
+            if issubclass(renderer.__class__, HttpResponseBase):
+                return renderer
+
+        response = self.__build_response(renderer, renderer.render(self))
+        if timer is not None:
+            timer.renderer = renderer.__class__
+            timer.mark('render')
+        if conditional_get is not None:
+            conditional_get.set_validators(response, validators)
+        if cache_key is not None:
+            # a response that showed or queued flash messages is specific to this request
+            plan.action_cache.store(cache_key, response, cacheable=not self.__flash_changed())
+            self._action_cache_key = None
+            if timer is not None:
+                timer.mark('cache')
+        return self.__finish_response(conditional_get, response)
+
+    async def _dispatch_async(self, plan:DispatchPlan, *args, **kwargs) -> HttpResponse:
+        """
+        The asynchronous version of `_dispatch`. Coroutine actions and filters are awaited,
+        synchronous actions and filters of an async controller, and renderers that may touch the database,
+        are run in a bounded thread pool so they do not block the event loop.
+
+        :param plan: The precompiled `DispatchPlan` of the action in question
+        :return: an HttpResponse object
+        """
+        response = None
+        timer = self._phase_timer = start_phase_timer(self, plan)
         try:
-            # run before filter
-            before_filter_response = self.__run_before_filter(action_func=action_func)
-            if issubclass(before_filter_response.__class__, HttpResponse):
+            response = await self.__dispatch_async(plan, *args, **kwargs)
+            self.__merge_cookies(response)
+        finally:
+            if self._action_cache_key is not None:
+                await plan.action_cache.release_async(self._action_cache_key)
+                self._action_cache_key = None
+            if self._flash_cache is not None and self._flash_cache.changed:
+                await run_in_thread_pool(self._flash_cache.flush, response)
+                if timer is not None:
+                    timer.mark('flash')
+            if timer is not None:
+                timer.finish(response)
+        return response
+
+    async def __dispatch_async(self, plan:DispatchPlan, *args, **kwargs) -> HttpResponse:
+        action_func = self.__begin_dispatch(plan)
+        timer = self._phase_timer
+        if plan.allowed_methods is not None and self._request.method not in plan.allowed_methods:
+            return HttpResponseNotAllowed(plan.allowed_methods)
+
+        conditional_get = self.__get_conditional_get(plan)
+        cache_key = None
+        validators = None
+        try:
+            before_filter_response = await self.__run_before_filter_async(plan=plan)
+            if timer is not None and not plan.disable_filters:
+                timer.mark('before_filter')
+            if issubclass(before_filter_response.__class__, HttpResponseBase):
                 return before_filter_response
 
-            # run the actual action
-            renderer = self.__run_action(action_func=action_func, renderer_args=send_args, *args, **kwargs)
-            if issubclass(renderer.__class__, HttpResponse):
+            if conditional_get is not None:
+                validators = await conditional_get.get_validators_async(self, args, kwargs)
+                if timer is not None:
+                    timer.mark('conditional')
+                not_modified_response = conditional_get.get_not_modified_response(self._request, validators)
+                if not_modified_response is not None:
+                    return not_modified_response
+
+            if plan.action_cache is not None:
+                cache_key, cached_response = await plan.action_cache.lookup_async(self, args, kwargs)
+                if timer is not None:
+                    timer.mark('cache')
+                if cached_response is not None:
+                    return self.__finish_response(conditional_get, cached_response)
+                self._action_cache_key = cache_key
+
+            if plan.context_providers:
+                self._template_context.update(await resolve_context_async(self, plan.context_providers))
+                if timer is not None:
+                    timer.mark('context')
+
+            renderer = await self.__run_action_async(action_func, plan, *args, **kwargs)
+            if timer is not None:
+                timer.mark('action')
+            if issubclass(renderer.__class__, HttpResponseBase):
                 return renderer
 
-            try:
-                renderer_context = renderer.get_context()
-                if isinstance(renderer_context,dict) and isinstance(self._template_context,dict):
-                    self._template_context.update(renderer.get_context())
-                    renderer.update(self._template_context)
-            except Exception as e:
-                raise ValueError("Error applying before_filter data to action: %s." % e)
+            self.__merge_template_context(renderer)
 
-            after_filter_response = self.__run_after_filter(renderer=renderer, action_func=action_func)
-            if issubclass(after_filter_response.__class__,HttpResponse):
+            after_filter_response = await self.__run_after_filter_async(renderer=renderer, plan=plan)
+            if timer is not None and not plan.disable_filters:
+                timer.mark('after_filter')
+            if issubclass(after_filter_response.__class__, HttpResponseBase):
                 return after_filter_response
 
-            self._response.status_code = renderer.status_code
+            self._status_code = renderer.status_code
 
         except Exception as exception:
-            response = self._on_exception(request=self._request, exception=exception)
+            renderer = self.__handle_exception(exception, plan)
+            if issubclass(renderer.__class__, HttpResponseBase):
+                return renderer
+
+        if renderer.render_in_thread:
+            rendered_response = await run_in_thread_pool(renderer.render, self)
+        else:
+            rendered_response = renderer.render(self)
+        response = self.__build_response(renderer, rendered_response)
+        if timer is not None:
+            timer.renderer = renderer.__class__
+            timer.mark('render')
+        if conditional_get is not None:
+            conditional_get.set_validators(response, validators)
+        if cache_key is not None:
+            await plan.action_cache.store_async(cache_key, response, cacheable=not self.__flash_changed())
+            self._action_cache_key = None
+            if timer is not None:
+                timer.mark('cache')
+        return self.__finish_response(conditional_get, response)
+
+    def __flash_changed(self) -> bool:
+        return self._flash_cache is not None and self._flash_cache.changed
+
+    def __get_conditional_get(self, plan:DispatchPlan) -> Optional[ConditionalGet]:
+        """Only GET and HEAD are conditional, other methods have side effects that a 304 or 412 would hide."""
+        if plan.conditional_get is not None and self._request.method in CONDITIONAL_METHODS:
+            return plan.conditional_get
+        return None
 
-            if response is None:
-                raise exception.with_traceback(sys.exc_info()[-1])
+    def __finish_response(self, conditional_get:Optional[ConditionalGet], response:HttpResponse) -> HttpResponse:
+        if conditional_get is not None:
+            return conditional_get.get_response(self._request, response)
+        return response
+
+    def __begin_dispatch(self, plan:DispatchPlan):
+        action_func = getattr(self, plan.func_name)
+        self._dispatch_plan = plan
+        self._action_name = plan.action_name
+        self._action_name_sans_prefix = plan.action_name_sans_prefix
+        self._action_func = action_func
+        self._no_ajax_prefix = self._no_ajax_prefix or plan.no_ajax_prefix
+        return action_func
+
+    def __merge_template_context(self, renderer:Renderer):
+        """Add what `_before_filter` and the context providers returned below the data of the action, without copying either."""
+        try:
+            if self._template_context and isinstance(renderer.get_context(), Mapping):
+                renderer.add_defaults(self._template_context)
+        except Exception as e:
+            raise ValueError("Error applying before_filter data to action: %s." % e)
+
+    def __handle_exception(self, exception, plan:DispatchPlan) -> Union[Renderer, HttpResponse]:
+        """Must be called from within the `except` block, re-raises the exception if `_on_exception` does not handle it."""
+        response = self._on_exception(request=self._request, exception=exception)
+
+        if response is None:
+            raise exception.with_traceback(sys.exc_info()[-1])
+        else:
+            if isinstance(response, dict):
+                renderer = TemplateRenderer(data=response, template_name=self._get_error_template_path(), **plan.renderer_args)
+            elif isinstance(response, str):
+                renderer = TextRenderer(data=response, **plan.renderer_args)
             else:
-                if isinstance(response, dict):
-                    renderer = TemplateRenderer(data=response, template_name=self._get_error_template_path(), **send_args)
-                elif isinstance(response, str):
-                    renderer = TextRenderer(data=response, **send_args)
-                else:
-                    return response
+                return response
 
-                self._response.status_code = 500
+            self._status_code = 500
+            return renderer
 
-        rendered_response = renderer.render(self)
-        if issubclass(rendered_response.__class__,HttpResponse):
+    def __build_response(self, renderer:Renderer, rendered_response) -> HttpResponse:
+        if issubclass(rendered_response.__class__, HttpResponseBase):
+            self.__merge_cookies(rendered_response)
             return rendered_response
 
+        response = self._response
+        if self._status_code is not None:
+            response.status_code = self._status_code
         self._set_mimetype(mimetype=renderer.mimetype, charset=renderer.charset)
-        self._response.content = rendered_response
-        return self._response
+        response.content = rendered_response
+        return response
+
+    def __merge_cookies(self, response:HttpResponseBase):
+        """Cookies set with `_set_cookie` also go on a response that was returned, rather than rendered into `_response`."""
+        if self._response_instance is not None and response is not self._response_instance:
+            for key, morsel in self._response_instance.cookies.items():
+                if key not in response.cookies:
+                    response.cookies[key] = morsel
 
-    def __run_action(self, action_func, renderer_args, *args, **kwargs) -> Union[Tuple[Renderer,int], HttpResponse]:
+    def __run_action(self, action_func, plan:DispatchPlan, *args, **kwargs) -> Union[Renderer, HttpResponse]:
         """
 
         :param action_func:
+        :param plan:
         :param args:
         :param kwargs:
-        :return: a tuple with the action response and an http status code
+        :return: the renderer for the action response, or an HttpResponse returned by the action
         """
-        if hasattr(self, 'do_not_pass_request'):
+        if plan.pass_request:
+            action_response = action_func(self._request, *args, **kwargs)
+        else:
             action_response = action_func(*args, **kwargs)
+        return self.__get_action_renderer(action_response, plan)
+
+    async def __run_action_async(self, action_func, plan:DispatchPlan, *args, **kwargs) -> Union[Renderer, HttpResponse]:
+        if plan.pass_request:
+            args = (self._request,) + args
+        if plan.async_action:
+            action_response = await action_func(*args, **kwargs)
         else:
-            action_response = action_func(self._request, *args, **kwargs)
+            action_response = await run_in_thread_pool(action_func, *args, **kwargs)
+        return self.__get_action_renderer(action_response, plan)
 
-        if issubclass(action_response.__class__, HttpResponse):
+    def __get_action_renderer(self, action_response, plan:DispatchPlan) -> Union[Renderer, HttpResponse]:
+        if issubclass(action_response.__class__, HttpResponseBase):
             return action_response
         #######################################################
 
@@ -581,12 +1041,11 @@ class ActionController(object):
             if renderer.status_code is None:
                 renderer.status_code = status_code
         else:
-            renderer = ActionController.default_renderer(data=action_response, status_code=status_code, **renderer_args)
-            renderer.update(action_response)
+            renderer = ActionController.default_renderer(data=action_response, status_code=status_code, **plan.renderer_args)
 
         return renderer
 
-    def __run_before_filter(self, action_func) -> Optional[HttpRequest]:
+    def __run_before_filter(self, plan:DispatchPlan) -> Optional[HttpRequest]:
         """
         This calls `_before_filter` and updates the `template_context`.
         If the response from `_before_filter` is an `HttpResponse`, we return this
@@ -595,44 +1054,63 @@ class ActionController(object):
         
         If the request contains `Accept: application/json`, the data returned from the action will be rendered as json.
         
-        :param action_func:
-        :param args:
-        :param kwargs:
+        :param plan:
         :return:
         """
-        if getattr(self, '_before_filter_runonce', False) == False and getattr(action_func,'disable_filters', False) == False:
+        if getattr(self, '_before_filter_runonce', False) == False and not plan.disable_filters:
             self._before_filter_runonce = True
+            return self.__apply_before_filter_response(self._before_filter(self._request))
+        return None
 
-            filter_response = self._before_filter(self._request)
-
-            if issubclass(filter_response.__class__, Renderer):
-                renderer = filter_response
-                filter_response = renderer.render(self)
+    async def __run_before_filter_async(self, plan:DispatchPlan) -> Optional[HttpRequest]:
+        if getattr(self, '_before_filter_runonce', False) == False and not plan.disable_filters:
+            self._before_filter_runonce = True
+            if plan.async_before_filter:
+                filter_response = await self._before_filter(self._request)
+            else:
+                filter_response = await run_in_thread_pool(self._before_filter, self._request)
+            return self.__apply_before_filter_response(filter_response)
+        return None
 
-            if issubclass(filter_response.__class__, dict):
-                self._template_context.update(filter_response)
-            elif issubclass(filter_response.__class__,HttpResponse):
-                return filter_response
+    def __apply_before_filter_response(self, filter_response) -> Optional[HttpRequest]:
+        if issubclass(filter_response.__class__, Renderer):
+            renderer = filter_response
+            filter_response = renderer.render(self)
 
+        if issubclass(filter_response.__class__, dict):
+            self._template_context.update(filter_response)
+        elif issubclass(filter_response.__class__, HttpResponseBase):
+            return filter_response
         return None
 
-    def __run_after_filter(self, action_func, renderer:Renderer)-> Optional[HttpResponse]:
-        if not getattr(self, '_after_filter_runonce', False) and not getattr(action_func,'disable_filters', False):
+    def __run_after_filter(self, plan:DispatchPlan, renderer:Renderer)-> Optional[HttpResponse]:
+        if not getattr(self, '_after_filter_runonce', False) and not plan.disable_filters:
             self._after_filter_runonce = True
             self._template_context = renderer.get_context()
-            filter_response = self._after_filter(request=self._request)
+            return self.__apply_after_filter_response(renderer, self._after_filter(request=self._request))
+        return None
 
-            if issubclass(filter_response.__class__,HttpResponse):
-                return filter_response
-            elif filter_response is not None:
-                try:
-                    renderer.update(filter_response)
-                except Exception as e:
-                    raise ValueError("_after_filter tried to update existing data, but there was an error: %s." % e)
+    async def __run_after_filter_async(self, plan:DispatchPlan, renderer:Renderer)-> Optional[HttpResponse]:
+        if not getattr(self, '_after_filter_runonce', False) and not plan.disable_filters:
+            self._after_filter_runonce = True
+            self._template_context = renderer.get_context()
+            if plan.async_after_filter:
+                filter_response = await self._after_filter(request=self._request)
+            else:
+                filter_response = await run_in_thread_pool(self._after_filter, request=self._request)
+            return self.__apply_after_filter_response(renderer, filter_response)
+        return None
 
+    def __apply_after_filter_response(self, renderer:Renderer, filter_response) -> Optional[HttpResponse]:
+        if issubclass(filter_response.__class__, HttpResponseBase):
+            return filter_response
+        elif filter_response is not None:
+            try:
+                renderer.update(filter_response)
+            except Exception as e:
+                raise ValueError("_after_filter tried to update existing data, but there was an error: %s." % e)
         return None
 
-            
     def _before_filter(self, request) -> Union[None,dict,HttpResponse,Renderer]:
         """If overridden, runs before every action.
         This method is useful to add some additional data to all your actions, set instance variables and
@@ -722,17 +1200,47 @@ class ActionController(object):
         """determine the renderer from the requests' Accept: header"""
         return self._get_renderer_for_request(data, **kwargs)
 
-    def _as_json(self, data, status_code=None, charset=default_charset, json_encoder=json_default_encoder, default=None, **kwargs):
-        """Render the returned dictionary as a JSON object. Accepts the json.dumps `default` argument for a custom encoder."""
+    def _as_json(self, data, status_code=None, charset=default_charset, json_encoder=None, default=None, streaming=False, json_backend=None, **kwargs):
+        """
+        Render the returned dictionary as a JSON object. Accepts the json.dumps `default` argument for a custom encoder.
+        `json_encoder` defaults to the controller's `json_default_encoder`, `json_backend` to the controller's `json_backend`.
+        With `streaming`, the data is encoded incrementally into a `StreamingHttpResponse`, see `StreamingJSONRenderer`.
+        """
+        if json_encoder is None:
+            json_encoder = self.json_default_encoder
         if default:
-            class CustomJSONEncoder(JSONEncoder):
-                pass
-            CustomJSONEncoder.default = default
-            json_encoder = CustomJSONEncoder
+            json_encoder = get_encoder_with_default(json_encoder, default)
+        if json_backend is None:
+            json_backend = self._get_json_backend_name()
 
         data, status_code = self.__split_action_status_and_result(data, status_code)
 
-        return JSONRenderer(data, json_default_encoder=json_encoder, charset=charset, status_code=status_code)
+        if streaming:
+            return StreamingJSONRenderer(data, json_default_encoder=json_encoder, json_backend=json_backend,
+                                         charset=charset, status_code=status_code, **kwargs)
+        return JSONRenderer(data, json_default_encoder=json_encoder, json_backend=json_backend, charset=charset, status_code=status_code)
+
+    def _as_ndjson(self, data, status_code=None, charset=default_charset, json_encoder=None, default=None, json_backend=None, **kwargs):
+        """
+        Stream the returned rows, a list, generator or QuerySet, as newline delimited JSON, see `NDJSONRenderer`.
+        `json_encoder`, `default` and `json_backend` are the same as for `_as_json`.
+        """
+        if json_encoder is None:
+            json_encoder = self.json_default_encoder
+        if default:
+            json_encoder = get_encoder_with_default(json_encoder, default)
+        if json_backend is None:
+            json_backend = self._get_json_backend_name()
+
+        data, status_code = self.__split_action_status_and_result(data, status_code)
+        return NDJSONRenderer(data, json_default_encoder=json_encoder, json_backend=json_backend,
+                              charset=charset, status_code=status_code, **kwargs)
+
+    def _as_csv(self, data, status_code=None, charset=default_charset, header=None, dialect='excel', filename=None, **kwargs):
+        """Stream the returned rows, a list, generator or QuerySet, as CSV, see `CSVRenderer`."""
+        data, status_code = self.__split_action_status_and_result(data, status_code)
+        return CSVRenderer(data, header=header, dialect=dialect, filename=filename,
+                           charset=charset, status_code=status_code, **kwargs)
 
     def _as_yaml(self, data, default_flow_style=yaml_default_flow_style, status_code=None, **kwargs):
         """Render the returned dictionary as a YAML object."""
@@ -743,10 +1251,26 @@ class ActionController(object):
         text, status_code = self.__split_action_status_and_result(text)
         return TextRenderer(data=text, mimetype=mimetype, charset=charset, status_code=status_code)
 
+    def _get_context(self, name:str):
+        """
+        The value of the context provider `name`, computed at most once per request,
+        so providers and actions can use the value of any provider, even one the action does not declare.
+        Raises `KeyError` if there is no such provider.
+        """
+        if name not in self._context_values:
+            self._context_values[name] = call_provider(self, get_provider(self, name))
+        return self._context_values[name]
+
+    async def _get_context_async(self, name:str):
+        """The asynchronous version of `_get_context`, for coroutine actions and providers."""
+        if name not in self._context_values:
+            self._context_values[name] = await call_provider_async(self, get_provider(self, name))
+        return self._context_values[name]
+
     def _get_flash(self):
         if self._flash_cache is None:
-            from .flash import FlashManager
-            self._flash_cache = FlashManager(self._request)
+            from .flash import get_flash
+            self._flash_cache = get_flash(self._request)
         return self._flash_cache
     _flash = property(_get_flash)
     
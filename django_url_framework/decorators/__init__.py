@@ -2,3 +2,5 @@ from .auth import *
 from .render import *
 from .http_methods import *
 from .action_options import *
+from .cache import *
+from .context import *
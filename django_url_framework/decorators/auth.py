@@ -3,10 +3,12 @@ try:
 except ImportError:
     from django.utils.functional import update_wrapper, wraps  # Python 2.4 fallback.
 
+from asgiref.sync import iscoroutinefunction, sync_to_async
 from django.contrib.auth import REDIRECT_FIELD_NAME
 from django.http import HttpResponseRedirect, HttpResponseForbidden
 from urllib.parse import quote
 
+from ..auth_cache import has_perms, is_member_of_group, passes_test, request_test
 from ..lib import is_ajax
 
 def user_passes_test(test_func, login_url=None, redirect_field_name=REDIRECT_FIELD_NAME):
@@ -14,30 +16,48 @@ def user_passes_test(test_func, login_url=None, redirect_field_name=REDIRECT_FIE
     Decorator for views that checks that the user passes the given test,
     redirecting to the log-in page if necessary. The test should be a callable
     that takes the user object and returns True if the user passes.
+    The result is remembered for the rest of the request, so stacked or repeated checks run it once.
     """
     if not login_url:
         from django.conf import settings
         login_url = settings.LOGIN_URL
 
+    def _access_denied(request):
+        path = quote(request.get_full_path())
+        tup = login_url, redirect_field_name, path
+        if is_ajax(request):
+            return HttpResponseForbidden()
+        else:
+            return HttpResponseRedirect('%s?%s=%s' % tup)
+
     def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _wrapped_async_view(self, request, *args, **kwargs):
+                # the user, and the test, may hit the database, which is not allowed from the event loop
+                if await sync_to_async(lambda: passes_test(request, test_func))():
+                    return await view_func(self, request, *args, **kwargs)
+                return _access_denied(request)
+            return _wrapped_async_view
+
         @wraps(view_func)
         def _wrapped_view(self, request, *args, **kwargs):
-            if test_func(request.user):
+            if passes_test(request, test_func):
                 return view_func(self, request, *args, **kwargs)
-            path = quote(request.get_full_path())
-            tup = login_url, redirect_field_name, path
-            if is_ajax(request):
-                return HttpResponseForbidden()
-            else:
-                return HttpResponseRedirect('%s?%s=%s' % tup)
+            return _access_denied(request)
         return _wrapped_view
     return decorator
 
 def must_be_member_of_group(group_name=None, redirect_field_name=REDIRECT_FIELD_NAME, login_url=None):
+    """
+    Decorator for views that checks that the user is a superuser, or a member of one of the groups.
+    The group names of the user are queried once per request, see `django_url_framework.auth_cache`.
+    """
     if type(group_name) not in (list, tuple):
         group_name = [group_name]
+    group_name = frozenset(group_name)
     actual_decorator = user_passes_test(
-        lambda u: (u.is_superuser or u.groups.filter(name__in=group_name).count() > 0),
+        request_test(lambda u, request: is_member_of_group(u, group_name, request)),
         login_url=login_url,
         redirect_field_name=redirect_field_name
     )
@@ -69,7 +89,11 @@ def login_required(function=None, redirect_field_name=REDIRECT_FIELD_NAME, login
 def permission_required(perm, login_url=None):
     """
     Decorator for views that checks whether a user has a particular permission
-    enabled, redirecting to the log-in page if necessary.
+    enabled, redirecting to the log-in page if necessary. `perm` may also be a list of permissions,
+    all of which are required.
     """
-    return user_passes_test(lambda u: u.has_perm(perm), login_url=login_url)
+    if isinstance(perm, str):
+        perm = (perm,)
+    perm = tuple(perm)
+    return user_passes_test(request_test(lambda u, request: has_perms(u, perm, request)), login_url=login_url)
 
@@ -0,0 +1,47 @@
+from ..action_cache import CacheOptions
+from ..conditional import ConditionalGet
+
+
+def cache_action(timeout, key=None, vary_on=(), vary_on_user=False, stale_timeout=0, cache_alias='default'):
+    """
+    Cache the rendered response of this action, for GET and HEAD requests that return status 200 and set no cookies.
+    The `_before_filter` is run for every request, cached or not, so it can still deny access or redirect.
+
+    Responses are cached separately for every set of url parameters, for ajax requests and,
+    for `@auto` actions, for every media type chosen from the Accept header.
+
+    Usage: @cache_action(60) or @cache_action(timeout=60, vary_on=['page'], stale_timeout=300)
+
+    :param timeout: seconds a response is served from the cache
+    :param key: a string, or a callable taking the controller and returning a string, added to the cache key
+    :param vary_on: names of query parameters, each combination of their values is cached separately
+    :param vary_on_user: cache responses separately for every user, use this for any content specific to the user
+    :param stale_timeout: seconds after `timeout` during which one request re-runs the action,
+                          while the others are served the stale response
+    :param cache_alias: the Django cache shared between processes, None keeps responses in the process only
+    """
+    if isinstance(vary_on, str):
+        vary_on = (vary_on,)
+    options = CacheOptions(timeout=timeout, key=key, vary_on=tuple(vary_on), vary_on_user=vary_on_user,
+                           stale_timeout=stale_timeout, cache_alias=cache_alias)
+    def decorator(action_function):
+        action_function.cache_options = options
+        return action_function
+    return decorator
+
+def conditional_get(etag=None, last_modified=None):
+    """
+    Answer conditional GET requests for this action with 304 Not Modified.
+    The callables take the same arguments as the action, the controller, the request and the url parameters,
+    and are evaluated after the `_before_filter`, so a matching request does not run the action or the renderer.
+    Without either of them, a strong ETag is computed from the rendered response.
+
+    Usage: @conditional_get() or @conditional_get(last_modified=lambda self, request, id: Article.objects.get(pk=id).modified)
+
+    :param etag: returns the ETag of the response, or None
+    :param last_modified: returns the `datetime` the response was last modified, or None
+    """
+    def decorator(action_function):
+        action_function.conditional_get = ConditionalGet(etag=etag, last_modified=last_modified)
+        return action_function
+    return decorator
@@ -0,0 +1,31 @@
+def provides(name=None, independent=False):
+    """
+    Make a controller method a context provider, called with the request, whose value is added to the
+    template context of the actions that use it, see `uses_context`. It is called at most once per request,
+    after `_before_filter`, and is never an action itself.
+
+    Usage: @provides() or @provides('profile', independent=True)
+
+    :param name: the name of the value, defaults to the name of the method without leading underscores
+    :param independent: the provider does not use the value of another provider,
+                        independent providers of an action are called concurrently
+    """
+    def decorator(provider_function):
+        provider_function.provides_context = name or provider_function.__name__.lstrip('_')
+        provider_function.independent_context = independent
+        return provider_function
+    return decorator
+
+def uses_context(*names, **providers):
+    """
+    The context providers this action uses, by name. Providers for this action only are given as keyword arguments,
+    callables taking the controller and the request, decorate them with `provides(independent=True)` to call them
+    concurrently. Set `shared_context` on the controller class to the names of the providers that every action uses.
+
+    Usage: @uses_context('profile', 'cart', stats=lambda controller, request: get_stats(request.user))
+    """
+    def decorator(action_function):
+        action_function.uses_context = names + tuple(providers)
+        action_function.context_providers = providers
+        return action_function
+    return decorator
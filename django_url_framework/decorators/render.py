@@ -1,26 +1,40 @@
 from functools import wraps
 
-from django.http import HttpResponse
+from asgiref.sync import iscoroutinefunction
+from django.http import HttpResponseBase
 
 
 def _action_renderer(renderer, **renderer_kwargs):
     def decorator(function):
+        def _render(self, response):
+            if issubclass(response.__class__, HttpResponseBase):
+                return response
+            return getattr(self,renderer)(response, **renderer_kwargs)
+
+        if iscoroutinefunction(function):
+            @wraps(function)
+            async def _wrapped_async_action(self, *args, **kwargs):
+                """Wrapper for the coroutine called by the url."""
+                return _render(self, await function(self, *args, **kwargs))
+            _wrapped_async_action.action_renderer = renderer
+            return _wrapped_async_action
+
         @wraps(function)
         def _wrapped_action(self, *args, **kwargs):
             """Wrapper for the function called by the url."""
-            response = function(self, *args, **kwargs)
-            if issubclass(response.__class__, HttpResponse):
-                return response
-            return getattr(self,renderer)(response, **renderer_kwargs)
+            return _render(self, function(self, *args, **kwargs))
+        _wrapped_action.action_renderer = renderer
         return _wrapped_action
     return decorator
 
-def json_action(json_encoder=None):
+def json_action(json_encoder=None, streaming=False):
     """
     Decorator that ensures any data returned from this function is encoded into JSON.
     Usage: @json_action() or @json_action(json_encoder=CustomJsonEncoder)
+
+    :param streaming: encode generators, iterators and QuerySets incrementally into a `StreamingHttpResponse`
     """
-    return _action_renderer(json_encoder=json_encoder, renderer="_as_json")
+    return _action_renderer(json_encoder=json_encoder, streaming=streaming, renderer="_as_json")
 
 def yaml_action(default_flow_style=None):
     """
@@ -31,8 +45,26 @@ def yaml_action(default_flow_style=None):
     """
     return _action_renderer(default_flow_style=default_flow_style, renderer="_as_yaml")
 
+def ndjson_action(json_encoder=None):
+    """
+    Stream the rows returned from this function, a list, generator or QuerySet, as newline delimited JSON.
+    Usage: @ndjson_action() or @ndjson_action(json_encoder=CustomJsonEncoder)
+    """
+    return _action_renderer(json_encoder=json_encoder, renderer="_as_ndjson")
+
+def csv_action(header=None, dialect='excel', filename=None):
+    """
+    Stream the rows returned from this function, a list, generator or QuerySet, as CSV.
+    Usage: @csv_action() or @csv_action(header=['id', 'name'], filename='users.csv')
+
+    :param header: the column names, the attributes written for rows that are objects, False for no header line
+    :param dialect: the `csv` dialect
+    :param filename: download the response as an attachment with this filename
+    """
+    return _action_renderer(header=header, dialect=dialect, filename=filename, renderer="_as_csv")
+
 
-def auto(json_encoder=None, yaml_default_flow_style=None):
+def auto(json_encoder=None, yaml_default_flow_style=None, streaming=False):
     """
         Decorator that determines the returned data renderer based on the Accept header.
         Be careful, if used incorrectly this can expose your data to an attacker.
@@ -44,6 +76,7 @@ def auto(json_encoder=None, yaml_default_flow_style=None):
         template, and someone sends Accept:application/json, your function will actually return the dictionary
         that was meant for a server-side template to the client.
 
-        Supported `auto` rendering types are json, yaml, template and plain text.
+        Supported `auto` rendering types are json, yaml, template, plain text, newline delimited json and csv.
+        With `streaming`, JSON is encoded incrementally into a `StreamingHttpResponse`.
     """
-    return _action_renderer(renderer="_as_auto_response", json_encoder=json_encoder, default_flow_style=yaml_default_flow_style)
+    return _action_renderer(renderer="_as_auto_response", json_encoder=json_encoder, default_flow_style=yaml_default_flow_style, streaming=streaming)
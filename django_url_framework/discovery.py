@@ -0,0 +1,214 @@
+import hashlib
+import importlib
+import json
+import logging
+import os
+import threading
+
+from django.http import Http404
+
+import django_url_framework
+from .controller import ActionController
+from .controller import ActionRoute
+from .controller import build_urlpatterns
+from .controller import dispatch_plan
+from .controller import dispatch_plan_async
+from .controller import get_actions
+from .controller import get_controller_name
+from .controller import get_controller_routes
+from .controller import get_dispatch_plan
+from .exceptions import InvalidActionError
+
+logger = logging.getLogger("django_url_framework")
+
+class ControllerDescriptor(object):
+    """
+    A stand-in for a controller class that has not been imported yet, mounted from a `DiscoveryManifest`.
+
+    It is used as the urlconf module of the controller's URL resolver, its URL patterns are generated from the
+    `routes` recorded in the manifest, so they can be resolved and reversed without importing the controller,
+    the controller module is imported the first time a request is routed to it.
+    """
+    def __init__(self, site, module_path:str, class_name:str, controller_name:str, routes, async_actions=()):
+        self.site = site
+        self.module_path = module_path
+        self.class_name = class_name
+        self.controller_name = controller_name
+        self.routes = routes
+        self.async_actions = frozenset(async_actions)
+        self._controller_class = None
+        self._is_loaded = False
+        self._urlpatterns = None
+        self._lock = threading.RLock()
+
+    def __repr__(self):
+        return "<ControllerDescriptor %s.%s as %s>" % (self.module_path, self.class_name, self.controller_name)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._is_loaded
+
+    def _load(self):
+        controller_module = importlib.import_module(self.module_path)
+        controller_class = getattr(controller_module, self.class_name, None)
+        if controller_class is None or not isinstance(controller_class, type) or not issubclass(controller_class, ActionController):
+            logger.warning("[FAIL] %s.%s is not an ActionController" % (self.module_path, self.class_name))
+            return None
+
+        if controller_class.use_inflection_library is None:
+            controller_class.use_inflection_library = self.site._use_inflection_lib
+        controller_name = get_controller_name(controller_class)
+        if controller_name != self.controller_name:
+            logger.warning("[LAZY] %s is mounted as %s, but its name resolves to %s after import, "
+                           "regenerate the discovery manifest."
+                           % (controller_class.__name__, self.controller_name, controller_name))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[LOADED] %s as %s" % (controller_class.__name__, self.controller_name))
+        return controller_class
+
+    @property
+    def controller_class(self):
+        if not self._is_loaded:
+            with self._lock:
+                if not self._is_loaded:
+                    self._controller_class = self._load()
+                    self._is_loaded = True
+        return self._controller_class
+
+    def get_plan(self, action_name):
+        try:
+            if self.controller_class is None:
+                raise InvalidActionError(action_name)
+            return get_dispatch_plan(self.controller_class, action_name)
+        except InvalidActionError:
+            raise Http404("Action '%s' not found in controller '%s'" % (action_name, self.controller_name))
+
+    def _get_view(self, action_name):
+        if action_name in self.async_actions:
+            async def wrapper(request, *args, **kwargs):
+                return await dispatch_plan_async(self.site, request, self.get_plan(action_name), *args, **kwargs)
+        else:
+            def wrapper(request, *args, **kwargs):
+                return dispatch_plan(self.site, request, self.get_plan(action_name), *args, **kwargs)
+        wrapper.__name__ = wrapper.__qualname__ = action_name
+        wrapper.get_dispatch_plan = lambda: self.get_plan(action_name)
+        return wrapper
+
+    @property
+    def urlpatterns(self) -> list:
+        if self._urlpatterns is None:
+            with self._lock:
+                if self._urlpatterns is None:
+                    self._urlpatterns = build_urlpatterns(self.routes, self._get_view)
+        return self._urlpatterns
+
+MANIFEST_VERSION = 1
+
+def describe_controller(controller_class:'ActionController.__class__') -> dict:
+    """Everything the manifest needs to know about a controller to mount it without importing it."""
+    return {
+        'class_name': controller_class.__name__,
+        'controller_name': get_controller_name(controller_class),
+        'actions': list(get_actions(controller_class).keys()),
+        'routes': [list(route) for route in get_controller_routes(controller_class)],
+        'async_actions': [action_name for action_name in get_actions(controller_class)
+                          if get_dispatch_plan(controller_class, action_name).is_async],
+    }
+
+def _get_file_digest(file_path:str) -> str:
+    with open(file_path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+class DiscoveryManifest(object):
+    """
+    An on-disk record of the controllers discovered in each app, so that `Site.autodiscover` does not have to scan,
+    import and introspect controller files that did not change since the manifest was written.
+
+    Controller files are validated by modification time and size, and by a content hash when those differ,
+    app directories by modification time, so added, removed and edited controller files are picked up automatically.
+    Changes to base classes defined outside of the controller files are not detected,
+    regenerate the manifest with the `build_url_manifest` management command when deploying.
+    """
+    def __init__(self, path:str, use_inflection_lib:bool = False):
+        self.path = path
+        self.use_inflection_lib = use_inflection_lib
+        self.apps = {}
+        self.modules = {}
+        self.changed = False
+
+    @classmethod
+    def load(cls, path:str, use_inflection_lib:bool = False) -> 'DiscoveryManifest':
+        manifest = cls(path=path, use_inflection_lib=use_inflection_lib)
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return manifest
+        if (data.get('version') == MANIFEST_VERSION
+                and data.get('framework_version') == django_url_framework.__version__
+                and data.get('use_inflection_lib') == use_inflection_lib):
+            manifest.apps = data.get('apps', {})
+            manifest.modules = data.get('modules', {})
+        return manifest
+
+    def save(self):
+        known_modules = set('%s.%s' % (app_name, controller_file)
+                            for app_name, entry in self.apps.items()
+                            for controller_file in entry['controller_files'])
+        for module_path in list(self.modules.keys()):
+            if module_path not in known_modules:
+                del self.modules[module_path]
+        data = {
+            'version': MANIFEST_VERSION,
+            'framework_version': django_url_framework.__version__,
+            'use_inflection_lib': self.use_inflection_lib,
+            'apps': self.apps,
+            'modules': self.modules,
+        }
+        tmp_path = "%s.%d.tmp" % (self.path, os.getpid())
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.changed = False
+
+    def get_controller_files(self, app_name:str, app_path:str, scan) -> list:
+        """
+        :param scan: a callable that lists the controller files of the app, called if the app directory changed
+        """
+        mtime_ns = os.stat(app_path).st_mtime_ns
+        entry = self.apps.get(app_name)
+        if entry is None or entry['path'] != app_path or entry['mtime_ns'] != mtime_ns:
+            entry = self.apps[app_name] = {'path': app_path, 'mtime_ns': mtime_ns, 'controller_files': list(scan())}
+            self.changed = True
+        return entry['controller_files']
+
+    def get_controllers(self, module_path:str, file_path:str, build) -> list:
+        """
+        Return the controller descriptions of a controller file, see `describe_controller`.
+        :param build: a callable that imports the file and returns the descriptions, called if the file changed
+        """
+        stat = os.stat(file_path)
+        entry = self.modules.get(module_path)
+        if entry is not None and entry['file'] == file_path:
+            if entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+                return entry['controllers']
+            digest = _get_file_digest(file_path)
+            if entry['sha1'] == digest:
+                entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                self.changed = True
+                return entry['controllers']
+        else:
+            digest = _get_file_digest(file_path)
+
+        entry = self.modules[module_path] = {
+            'file': file_path,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha1': digest,
+            'controllers': list(build()),
+        }
+        self.changed = True
+        return entry['controllers']
+
+def get_routes(controller_description:dict) -> list:
+    return [ActionRoute(*route) for route in controller_description['routes']]
@@ -1,15 +1,22 @@
+import json
+import threading
+import uuid
+
 from django.conf import settings
 import hashlib
 from django.utils.encoding import smart_str
+from django.utils.module_loading import import_string
 from django.utils.safestring import mark_safe
 
 class FlashMessage(object):
+    __slots__ = ('message', 'is_error', 'kind', 'digest')
+
     def __init__(self, message, is_error=False, kind='normal'):
         self.message = smart_str(message, encoding="utf8")
         self.is_error = is_error
         self.kind = kind
         self.digest = hashlib.sha1(self.message.encode('utf8') + kind.encode('utf8')).hexdigest()
-    
+
     def hash(self):
         return self.digest
 
@@ -24,40 +31,181 @@ class FlashMessage(object):
         return mark_safe(self.message)
 
     def __repr__(self):
-        return mark_safe(self.message.encode('utf8'))
+        return "<FlashMessage %s: %s>" % (self.kind, self.message)
 
     def __str__(self):
-        return self.__repr__()
+        return mark_safe(self.message)
+
+class FlashStorage(object):
+    """
+    Where flash messages are kept between requests. Messages are loaded the first time they are used,
+    and saved once, when the response is returned, only if they changed.
+    """
+    __slots__ = ('request',)
+    key = getattr(settings, 'URL_FRAMEWORK_SESSION_KEY', 'django_url_framework_flash')
+    # the messages can only be saved on a response, such as in a cookie
+    needs_response = False
 
-class FlashManager(object):
-    SESSION_KEY = getattr(settings, 'URL_FRAMEWORK_SESSION_KEY', 'django_url_framework_flash')
     def __init__(self, request):
         self.request = request
+
+    def load(self) -> list:
+        """Return the stored messages, as `FlashMessage.json_ready` dicts."""
+        raise NotImplementedError()
+
+    def save(self, response, messages:list):
+        """Store the messages, an empty list removes them."""
+        raise NotImplementedError()
+
+class SessionFlashStorage(FlashStorage):
+    """Keeps the messages in the session, which is saved by the session middleware as usual."""
+    __slots__ = ()
+    def load(self):
+        return self.request.session.get(self.key, [])
+
+    def save(self, response, messages):
+        if messages:
+            self.request.session[self.key] = messages
+        elif self.key in self.request.session:
+            del self.request.session[self.key]
+
+class CookieFlashStorage(FlashStorage):
+    """Keeps the messages in a signed cookie, so neither the session nor a cache is touched."""
+    __slots__ = ()
+    needs_response = True
+    salt = "django_url_framework.flash"
+
+    def load(self):
+        value = self.request.get_signed_cookie(self.key, default=None, salt=self.salt)
+        if value is None:
+            return []
+        try:
+            return json.loads(value)
+        except ValueError:
+            return []
+
+    def save(self, response, messages):
+        if messages:
+            response.set_signed_cookie(self.key, json.dumps(messages), salt=self.salt,
+                                       secure=settings.SESSION_COOKIE_SECURE,
+                                       httponly=True, samesite=settings.SESSION_COOKIE_SAMESITE)
+        elif self.key in self.request.COOKIES:
+            response.delete_cookie(self.key, samesite=settings.SESSION_COOKIE_SAMESITE)
+
+class CacheFlashStorage(CookieFlashStorage):
+    """
+    Keeps the messages in the Django cache `settings.URL_FRAMEWORK_FLASH_CACHE`, default "default",
+    under a random id that is stored in a signed cookie.
+    """
+    __slots__ = ()
+    timeout = 24 * 60 * 60
+
+    @property
+    def cache(self):
+        from django.core.cache import caches
+        return caches[getattr(settings, 'URL_FRAMEWORK_FLASH_CACHE', 'default')]
+
+    def _get_id(self):
+        return self.request.get_signed_cookie(self.key, default=None, salt=self.salt)
+
+    def load(self):
+        flash_id = self._get_id()
+        if flash_id is None:
+            return []
+        return self.cache.get("%s.%s" % (self.key, flash_id), [])
+
+    def save(self, response, messages):
+        flash_id = self._get_id()
+        if messages:
+            if flash_id is None:
+                flash_id = uuid.uuid4().hex
+                response.set_signed_cookie(self.key, flash_id, salt=self.salt,
+                                           secure=settings.SESSION_COOKIE_SECURE,
+                                           httponly=True, samesite=settings.SESSION_COOKIE_SAMESITE)
+            self.cache.set("%s.%s" % (self.key, flash_id), messages, self.timeout)
+        elif flash_id is not None:
+            self.cache.delete("%s.%s" % (self.key, flash_id))
+            response.delete_cookie(self.key, samesite=settings.SESSION_COOKIE_SAMESITE)
+
+FLASH_STORAGES = {
+    'session': SessionFlashStorage,
+    'cookie': CookieFlashStorage,
+    'cache': CacheFlashStorage,
+}
+
+def get_flash_storage_class(name:str = None) -> type:
+    """
+    :param name: `session`, `cookie`, `cache` or a dotted path to a `FlashStorage` subclass.
+                 Defaults to `settings.URL_FRAMEWORK_FLASH_STORAGE`, or `session`.
+    """
+    if name is None:
+        name = getattr(settings, 'URL_FRAMEWORK_FLASH_STORAGE', 'session')
+    if name in FLASH_STORAGES:
+        return FLASH_STORAGES[name]
+    return import_string(name)
+
+class FlashManager(object):
+    """
+    The flash messages of a request. Changes are saved by `flush(response)`, which controllers call when an action
+    returns or raises. Elsewhere, use the flash of `get_flash(request)` and add `FlashMiddleware`, or use it
+    as a context manager, which flushes on exit, storages that need a response are only flushed with one.
+    """
+    __slots__ = ('request', 'storage', '_messages_cache', '_digests', 'changed', '_lock')
+    SESSION_KEY = FlashStorage.key
+    def __init__(self, request, storage:FlashStorage = None):
+        self.request = request
+        if storage is None:
+            storage = get_flash_storage_class()(request)
+        self.storage = storage
         self._messages_cache = None
-    
+        self._digests = None
+        self.changed = False
+        # batch sub-requests that run concurrently share the flash of the batch request
+        self._lock = threading.RLock()
+
     def _get_messages(self):
         if self._messages_cache is None:
-            self._messages_cache = []
-            if self.SESSION_KEY in self.request.session:
-                for msg_data in self.request.session[self.SESSION_KEY]:
-                    self._messages_cache.append(FlashMessage(**msg_data))
+            with self._lock:
+                if self._messages_cache is None:
+                    messages = [FlashMessage(**msg_data) for msg_data in self.storage.load()]
+                    self._digests = set(message.digest for message in messages)
+                    self._messages_cache = messages
 
         return self._messages_cache
     messages = property(_get_messages)
-    
+
     def has_messages(self):
         return len(self) > 0
-    
+
     def clear(self):
-        self._messages_cache = []
-        if self.SESSION_KEY in self.request.session:
-            del(self.request.session[self.SESSION_KEY])
-            self.request.session.save()
+        with self._lock:
+            if self._messages_cache is None or self._messages_cache:
+                self.changed = True
+            self._messages_cache = []
+            self._digests = set()
 
     def get_and_clear(self):
-        messages = self.messages
-        self.clear()
-        return messages
+        with self._lock:
+            messages = self.messages
+            self.clear()
+            return messages
+
+    def flush(self, response=None):
+        """
+        Save the messages, if they changed. Without a response, messages of a storage that needs one
+        stay changed, to be saved with the next flush that has one.
+        """
+        if not self.changed or (response is None and self.storage.needs_response):
+            return
+        with self._lock:
+            self.changed = False
+            self.storage.save(response, [m.json_ready() for m in self.messages])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
 
     def __bool__(self):
         return len(self.messages) > 0
@@ -70,10 +218,10 @@ class FlashManager(object):
 
     def __getitem__(self, key):
         return self.messages[key]
-    
+
     def append_error(self, msg):
         self.append(msg=msg, msg_type='error')
-        
+
     def append(self, msg, msg_type='normal'):
 
         new_message = FlashMessage(**{
@@ -81,19 +229,52 @@ class FlashManager(object):
             'kind': msg_type,
             'is_error': msg_type == 'error'
         })
-        new_hash = new_message.hash()
 
-        for message in self.messages:
-            if message.hash() == new_hash:
+        with self._lock:
+            messages = self.messages
+            if new_message.digest in self._digests:
                 return
 
-        self.messages.append(new_message)
-        self.request.session[self.SESSION_KEY] = [m.json_ready() for m in self.messages]
+            messages.append(new_message)
+            self._digests.add(new_message.digest)
+            self.changed = True
 
     def set(self, msg, msg_type='normal'):
-        self.clear()
-        self.append(msg=msg, msg_type=msg_type)
+        with self._lock:
+            self.clear()
+            self.append(msg=msg, msg_type=msg_type)
 
     def error(self, msg):
-        self.clear()
-        self.append(msg=msg, msg_type='error')
+        with self._lock:
+            self.clear()
+            self.append(msg=msg, msg_type='error')
+
+FLASH_ATTRIBUTE = '_url_framework_flash'
+_flash_lock = threading.Lock()
+
+def get_flash(request) -> FlashManager:
+    """
+    The `FlashManager` of a request, shared by the controllers that handle it and `FlashMiddleware`.
+    The sub-requests of a batch share the flash of the batch request, so they do not overwrite each other's messages.
+    """
+    request = getattr(request, 'batch_request', request)
+    flash = getattr(request, FLASH_ATTRIBUTE, None)
+    if flash is None:
+        with _flash_lock:
+            flash = getattr(request, FLASH_ATTRIBUTE, None)
+            if flash is None:
+                flash = FlashManager(request)
+                setattr(request, FLASH_ATTRIBUTE, flash)
+    return flash
+
+class FlashMiddleware(object):
+    """Saves the flash messages of `get_flash(request)` on the response, for views that are not controllers."""
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        flash = getattr(request, FLASH_ATTRIBUTE, None)
+        if flash is not None:
+            flash.flush(response)
+        return response
@@ -9,9 +9,32 @@ class ApplicationHelper(object):
     """ApplicationHelpers can contain functions useful in a controller. Each controller is assigned a helper.
     Either the global ApplicationHelper, or a class with the same name as the controller such as foo_helper.py,
     and being a subclass of ApplicationHelper."""
+    __slots__ = ('controller', '__weakref__')
+
     def __init__(self, controller):
         self.controller = controller
     
+    def _get_named_url(self, controller = None, action = None):
+        from .controller import get_action_registry
+
+        if controller:
+            controllerClassOrInstance = self.controller._site.get_controller(controller)
+            if controllerClassOrInstance is None:
+                raise InvalidControllerError(controller)
+            controller_name = controller
+        else:
+            controllerClassOrInstance = self.controller
+            controller_name = self.controller._controller_name
+
+        if action:
+            action = action.strip('"\'')
+            return get_action_registry(controllerClassOrInstance).get_named_url(action)
+        return "%s_index" % controller_name
+
+    def _get_reverse_table(self):
+        site = getattr(self.controller, '_site', None)
+        return getattr(site, 'reverse_table', None)
+
     def url_for(self, controller = None, action = None, named_url  = None, url_params = None, url_args=None, url_kwargs=None):
         """
 
@@ -25,33 +48,37 @@ class ApplicationHelper(object):
         """
 
         if not named_url:
-            from .controller import get_actions, get_controller_name
-
-            if controller:
-                controllerClassOrInstance = self.controller._site.controllers.get(controller, None)
-                if controllerClassOrInstance is None:
-                    raise InvalidControllerError(controller)
-                controller_name = controller
-            else:
-                controllerClassOrInstance = self.controller
-                controller_name = self.controller._controller_name
-
-            if action:
-
-                try:
-                    action = action.strip('"\'')
-                    action_func = get_actions(controllerClassOrInstance,with_prefix=False)[action]
-                except KeyError:
-                    raise InvalidActionError(action)
-                
-                named_url = getattr(action_func,'named_url',None)
-                if named_url is None:
-                    controller_name = get_controller_name(controllerClassOrInstance, with_prefix=False)
-                    named_url = '%s_%s' % (controller_name, action)
-            else:
-                named_url = "%s_index" % controller_name
-
-        url = reverse(named_url, args=url_args, kwargs=url_kwargs)
+            named_url = self._get_named_url(controller=controller, action=action)
+
+        reverse_table = self._get_reverse_table()
+        if reverse_table is None:
+            url = reverse(named_url, args=url_args, kwargs=url_kwargs)
+        else:
+            url = reverse_table.reverse(named_url, args=url_args, kwargs=url_kwargs)
         if url_params is not None:
             return '%s?%s' % (url, urlencode(url_params))
         return url
+
+    def url_for_many(self, url_args_list, controller = None, action = None, named_url = None, url_params = None):
+        """
+        Build the URL of the same action for many arguments at once, such as for every row of a list.
+
+        :param url_args_list: each item is the arguments of one URL, a list or tuple of positional arguments,
+                              a dict of keyword arguments, or a single positional argument
+        :param url_params: The query string params, added to every URL
+        :return: a list of URLs, in the order of `url_args_list`
+
+        See `url_for` for the other parameters.
+        """
+        if not named_url:
+            named_url = self._get_named_url(controller=controller, action=action)
+
+        reverse_table = self._get_reverse_table()
+        if reverse_table is None:
+            from .reverse_table import ReverseTable
+            reverse_table = ReverseTable()
+        urls = reverse_table.reverse_many(named_url, url_args_list)
+        if url_params is not None:
+            query_string = urlencode(url_params)
+            return ['%s?%s' % (url, query_string) for url in urls]
+        return urls
@@ -0,0 +1,181 @@
+"""
+Inspection of the URL patterns a project actually mounts, used by the `url_routes` management command.
+
+Every route is listed with its full pattern, URL name, the controller and action it dispatches to,
+its parameters and allowed methods. A sample URL is generated for each route to find the routes
+that are shadowed by an earlier one, and to time resolving and reversing it.
+"""
+import re
+import timeit
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from django.http import Http404
+from django.urls import NoReverseMatch, Resolver404, URLPattern, URLResolver, get_resolver, reverse
+from django.urls.converters import get_converters
+from django.urls.resolvers import RegexPattern, RoutePattern
+from django.utils.regex_helper import normalize
+
+from .reverse_table import _PATH_PARAMETER_RE
+from .router import SiteRouter, _join_route
+
+# tried in order for each parameter, the first one its converter or regex accepts is used
+SAMPLE_VALUES = ('1', 'a', '2020', 'a-1', '00000000-0000-0000-0000-000000000000', 'a/b')
+
+class RouteInfo(NamedTuple):
+    """A URL pattern, with the patterns it is included under."""
+    position: int
+    pattern: str
+    name: Optional[str]
+    controller: Optional[str]
+    action: Optional[str]
+    parameters: Tuple[Tuple[str, str], ...]
+    allowed_methods: Optional[Tuple[str, ...]]
+    view: str
+    callback: object
+    chain: Tuple[object, ...]
+
+class RouteReport(NamedTuple):
+    route: RouteInfo
+    url: Optional[str]
+    resolve_time: Optional[float]
+    reverse_time: Optional[float]
+    problems: Tuple[str, ...]
+
+def _get_converter_names() -> dict:
+    return {converter.__class__: name for name, converter in get_converters().items()}
+
+def _get_parameters(pattern, converter_names:dict) -> List[Tuple[str, str]]:
+    if isinstance(pattern, RoutePattern):
+        return [(name, converter_names.get(converter.__class__, converter.__class__.__name__))
+                for name, converter in pattern.converters.items()]
+    if isinstance(pattern, RegexPattern):
+        return [(name, 'regex') for name in pattern.regex.groupindex]
+    return []
+
+def _walk(patterns, prefix:str, namespaces:tuple, parameters:list, chain:tuple, converter_names:dict):
+    for pattern in patterns:
+        if isinstance(pattern, SiteRouter):
+            # it resolves the patterns of its `ReverseOnlyResolver`, which are listed instead
+            continue
+        route = _join_route(prefix, str(pattern.pattern))
+        route_parameters = parameters + _get_parameters(pattern.pattern, converter_names)
+        if isinstance(pattern, URLResolver):
+            yield from _walk(pattern.url_patterns, route, namespaces + ((pattern.namespace,) if pattern.namespace else ()),
+                             route_parameters, chain + (pattern,), converter_names)
+        elif isinstance(pattern, URLPattern):
+            yield route, namespaces, route_parameters, chain + (pattern,)
+
+def iter_routes(urlconf=None) -> Iterator[RouteInfo]:
+    """Every URL pattern of `urlconf`, default the `ROOT_URLCONF`, in the order they are tried."""
+    converter_names = _get_converter_names()
+    routes = _walk(get_resolver(urlconf).url_patterns, '', (), [], (), converter_names)
+    for position, (route, namespaces, parameters, chain) in enumerate(routes):
+        pattern = chain[-1]
+        plan = None
+        get_dispatch_plan = getattr(pattern.callback, 'get_dispatch_plan', None)
+        if get_dispatch_plan is not None:
+            try:
+                plan = get_dispatch_plan()
+            except Http404:
+                pass
+        yield RouteInfo(position=position,
+                        pattern=route,
+                        name=':'.join(namespaces + (pattern.name,)) if pattern.name else None,
+                        controller=plan.controller_name if plan is not None else None,
+                        action=plan.action_name if plan is not None else None,
+                        parameters=tuple(parameters),
+                        allowed_methods=plan.allowed_methods if plan is not None else None,
+                        view=pattern.lookup_str,
+                        callback=pattern.callback,
+                        chain=chain)
+
+def _sample_route(pattern) -> Optional[Tuple[str, dict]]:
+    """A path matching a single pattern, and the values of its parameters."""
+    if isinstance(pattern, RoutePattern):
+        values = {}
+        def replace(match):
+            name = match.group('parameter')
+            converter = pattern.converters[name]
+            for value in SAMPLE_VALUES:
+                if re.fullmatch(converter.regex, value):
+                    values[name] = value
+                    return value
+            raise ValueError(name)
+        try:
+            return _PATH_PARAMETER_RE.sub(replace, str(pattern)), values
+        except ValueError:
+            return None
+    if isinstance(pattern, RegexPattern):
+        for format_string, names in normalize(pattern.regex.pattern):
+            for value in SAMPLE_VALUES:
+                candidate = format_string % {name: value for name in names}
+                match = pattern.regex.match(candidate)
+                if match and match.end() == len(candidate):
+                    return candidate, {name: value for name in names}
+        return None
+    return str(pattern), {}
+
+def get_sample_url(route:RouteInfo) -> Optional[Tuple[str, dict]]:
+    """A URL this route matches, and the values of its parameters, or None if none was found."""
+    url = '/'
+    values = {}
+    for pattern in route.chain:
+        sample = _sample_route(pattern.pattern)
+        if sample is None:
+            return None
+        url = url + sample[0]
+        values.update(sample[1])
+    return url, values
+
+def _time(func, number:int) -> float:
+    return timeit.Timer(func).timeit(number=number) / number
+
+def inspect_routes(urlconf=None, number:int = 100) -> List[RouteReport]:
+    """
+    Inspect every route, with the average time it takes to resolve and to reverse it, over `number` runs,
+    if `number` is 0 they are not timed. Duplicate patterns, routes that resolve to an earlier one, and routes
+    that can not be reversed from their name and parameters are reported as problems.
+    """
+    resolver = get_resolver(urlconf)
+    reports = []
+    seen_patterns = {}
+    for route in iter_routes(urlconf):
+        problems = []
+        duplicate = route.pattern in seen_patterns
+        if duplicate:
+            problems.append("duplicate of #%d" % seen_patterns[route.pattern])
+        else:
+            seen_patterns[route.pattern] = route.position
+
+        url = resolve_time = reverse_time = None
+        sample = get_sample_url(route)
+        if sample is None:
+            problems.append("no sample URL")
+        else:
+            url, values = sample
+            try:
+                match = resolver.resolve(url)
+            except Resolver404:
+                problems.append("%s does not resolve" % url)
+            else:
+                if match.func is not route.callback:
+                    if not duplicate:
+                        problems.append("shadowed by %s" % match.route)
+                elif number:
+                    resolve_time = _time(lambda: resolver.resolve(url), number)
+
+            if route.name is not None:
+                kwargs = {name: value for name, value in values.items() if not name.startswith('_')}
+                # unnamed regex groups are named `_0`, `_1`... by `normalize`
+                args = [values[name] for name in sorted(values, key=lambda name: int(name[1:]))] if not kwargs else ()
+                try:
+                    reversed_url = reverse(route.name, urlconf=urlconf, args=args, kwargs=kwargs)
+                except NoReverseMatch:
+                    problems.append("%s does not reverse" % route.name)
+                else:
+                    if reversed_url != url:
+                        problems.append("%s reverses to %s" % (route.name, reversed_url))
+                    elif number:
+                        reverse_time = _time(lambda: reverse(route.name, urlconf=urlconf, args=args, kwargs=kwargs), number)
+        reports.append(RouteReport(route, url, resolve_time, reverse_time, tuple(problems)))
+    return reports
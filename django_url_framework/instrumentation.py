@@ -0,0 +1,132 @@
+from time import perf_counter
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import Signal, receiver
+from django.utils.module_loading import import_string
+
+# sent by `SignalObserver`, with the controller, plan, phase and duration, in seconds, as keyword arguments
+phase_finished = Signal()
+# sent by `SignalObserver`, with the controller, plan, timings, total, response and renderer as keyword arguments
+dispatch_finished = Signal()
+
+PHASES = ('before_filter', 'conditional', 'cache', 'context', 'action', 'after_filter', 'render', 'flash')
+
+class DispatchObserver(object):
+    """
+    Receives the timing of each phase of dispatching an action. Subclass it and register an instance with
+    `register_observer`, or add its dotted path to `settings.URL_FRAMEWORK_OBSERVERS`.
+
+    The phases are `before_filter`, `conditional` (computing ETag and Last-Modified), `cache` (`@cache_action`),
+    `context` (context providers, see `uses_context`), `action`, `after_filter`, `render` and `flash`
+    (saving flash messages), phases that do not run are not reported.
+    Observers are called on the thread that dispatches the request, they should not block.
+    """
+    def phase_finished(self, controller, plan, phase:str, duration:float):
+        """Called when a phase finishes, `duration` is in seconds."""
+
+    def dispatch_finished(self, controller, plan, timings:dict, total:float, response, renderer:Optional[type] = None):
+        """
+        Called when the response is ready, or the action raised an exception, then `response` is None.
+        `timings` maps each phase that ran to its duration, `total` is the duration of the whole dispatch.
+        `renderer` is the class of the `Renderer` that rendered the response, None if a response was returned directly.
+        """
+
+class SignalObserver(DispatchObserver):
+    """Sends the `phase_finished` and `dispatch_finished` signals, with the controller class as the sender."""
+    def phase_finished(self, controller, plan, phase, duration):
+        phase_finished.send(sender=plan.controller_class, controller=controller, plan=plan, phase=phase, duration=duration)
+
+    def dispatch_finished(self, controller, plan, timings, total, response, renderer=None):
+        dispatch_finished.send(sender=plan.controller_class, controller=controller, plan=plan,
+                               timings=timings, total=total, response=response, renderer=renderer)
+
+class ServerTimingObserver(DispatchObserver):
+    """Adds the timings to the `Server-Timing` header of the response, enabled by `settings.URL_FRAMEWORK_SERVER_TIMING`."""
+    def dispatch_finished(self, controller, plan, timings, total, response, renderer=None):
+        if response is None:
+            return
+        metrics = ["%s;dur=%.3f" % (phase, duration * 1000) for phase, duration in timings.items()]
+        metrics.append("total;dur=%.3f" % (total * 1000))
+        if response.has_header('Server-Timing'):
+            metrics.insert(0, response['Server-Timing'])
+        response['Server-Timing'] = ", ".join(metrics)
+
+_observers = None
+_registered_observers = ()
+
+def _load_observers() -> Tuple[DispatchObserver, ...]:
+    global _observers
+    observers = []
+    for observer in getattr(settings, 'URL_FRAMEWORK_OBSERVERS', ()):
+        if isinstance(observer, str):
+            observer = import_string(observer)
+        if isinstance(observer, type):
+            observer = observer()
+        observers.append(observer)
+    observers += _registered_observers
+    if getattr(settings, 'URL_FRAMEWORK_SERVER_TIMING', False):
+        observers.append(ServerTimingObserver())
+    if getattr(settings, 'URL_FRAMEWORK_METRICS', False):
+        from .metrics import MetricsObserver
+        observers.append(MetricsObserver())
+    _observers = tuple(observers)
+    return _observers
+
+def get_observers() -> Tuple[DispatchObserver, ...]:
+    if _observers is None:
+        return _load_observers()
+    return _observers
+
+def register_observer(observer:DispatchObserver):
+    global _registered_observers, _observers
+    _registered_observers += (observer,)
+    _observers = None
+
+def unregister_observer(observer:DispatchObserver):
+    global _registered_observers, _observers
+    _registered_observers = tuple(o for o in _registered_observers if o is not observer)
+    _observers = None
+
+@receiver(setting_changed)
+def _reset_observers(setting, **kwargs):
+    global _observers
+    if setting in ('URL_FRAMEWORK_OBSERVERS', 'URL_FRAMEWORK_SERVER_TIMING', 'URL_FRAMEWORK_METRICS'):
+        _observers = None
+
+class PhaseTimer(object):
+    """
+    Times the phases of one dispatch. It only exists if there are observers,
+    so the dispatch code checks for None and does nothing else when instrumentation is off.
+    """
+    __slots__ = ('controller', 'plan', 'observers', 'timings', 'renderer', '_started', '_last')
+
+    def __init__(self, controller, plan, observers):
+        self.controller = controller
+        self.plan = plan
+        self.observers = observers
+        self.timings = {}
+        self.renderer = None
+        self._started = self._last = perf_counter()
+
+    def mark(self, phase:str):
+        """End `phase`, it is timed from the end of the previous one. A phase that runs twice adds up."""
+        now = perf_counter()
+        duration = now - self._last
+        self._last = now
+        self.timings[phase] = self.timings.get(phase, 0.0) + duration
+        for observer in self.observers:
+            observer.phase_finished(self.controller, self.plan, phase, duration)
+
+    def finish(self, response):
+        total = perf_counter() - self._started
+        for observer in self.observers:
+            observer.dispatch_finished(self.controller, self.plan, self.timings, total, response, renderer=self.renderer)
+
+def start_phase_timer(controller, plan) -> Optional[PhaseTimer]:
+    """A `PhaseTimer` for dispatching `plan`, or None if there are no observers."""
+    observers = _observers if _observers is not None else _load_observers()
+    if observers:
+        return PhaseTimer(controller, plan, observers)
+    return None
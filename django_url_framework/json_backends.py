@@ -0,0 +1,131 @@
+import codecs
+import json
+from functools import lru_cache
+from typing import Callable, Union
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+DEFAULT_JSON_BACKEND = "json"
+
+class JSONBackend(object):
+    """
+    Serializes data to JSON. A backend is created once per encoder class and shared between requests,
+    `encoder` is the `JSONEncoder` class whose `default` method handles the types the backend can not serialize itself.
+
+    The stdlib `json` backend uses the encoder class as is, the other backends only use its `default` method,
+    so encoders that override `encode` or set `indent` or `separators` should use the `json` backend.
+    """
+    name = DEFAULT_JSON_BACKEND
+
+    def __init__(self, encoder=DjangoJSONEncoder):
+        self.encoder = encoder
+        self._encoder = encoder()
+
+    def __repr__(self):
+        return "<%s %s>" % (self.__class__.__name__, self.encoder.__name__)
+
+    def dumps(self, data) -> Union[str, bytes]:
+        """Returns a string, or bytes encoded as utf-8."""
+        return self._encoder.encode(data)
+
+    def dumps_str(self, data) -> str:
+        data = self.dumps(data)
+        if isinstance(data, bytes):
+            return data.decode('utf-8')
+        return data
+
+class OrjsonBackend(JSONBackend):
+    """
+    Uses `orjson`. Dates, times and datetimes are passed to the encoder's `default`, so they are formatted exactly
+    as `DjangoJSONEncoder` formats them. The output is compact and not ASCII escaped.
+    Data `orjson` rejects, such as integers larger than 64 bits, is encoded by the stdlib `json` backend instead.
+    """
+    name = "orjson"
+
+    def __init__(self, encoder=DjangoJSONEncoder):
+        super(OrjsonBackend, self).__init__(encoder=encoder)
+        import orjson
+        self._orjson_dumps = orjson.dumps
+        self._orjson_options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    def dumps(self, data):
+        try:
+            return self._orjson_dumps(data, default=self._encoder.default, option=self._orjson_options)
+        except TypeError:
+            return self._encoder.encode(data)
+
+class UjsonBackend(JSONBackend):
+    """
+    Uses `ujson`, types it does not serialize natively are passed to the encoder's `default`.
+    Data `ujson` rejects is encoded by the stdlib `json` backend instead.
+    """
+    name = "ujson"
+
+    def __init__(self, encoder=DjangoJSONEncoder):
+        super(UjsonBackend, self).__init__(encoder=encoder)
+        import ujson
+        self._ujson_dumps = ujson.dumps
+
+    def dumps(self, data):
+        try:
+            return self._ujson_dumps(data, default=self._encoder.default, escape_forward_slashes=False)
+        except (TypeError, OverflowError):
+            return self._encoder.encode(data)
+
+JSON_BACKENDS = {
+    JSONBackend.name: JSONBackend,
+    OrjsonBackend.name: OrjsonBackend,
+    UjsonBackend.name: UjsonBackend,
+}
+# "fast" selects the first of these that is installed
+FAST_JSON_BACKENDS = (OrjsonBackend.name, UjsonBackend.name, JSONBackend.name)
+
+def _get_backend_class(name:str) -> type:
+    if name == "fast":
+        for fast_name in FAST_JSON_BACKENDS:
+            try:
+                return _get_backend_class(fast_name)
+            except ImproperlyConfigured:
+                continue
+    if name in JSON_BACKENDS:
+        backend_class = JSON_BACKENDS[name]
+    else:
+        try:
+            backend_class = import_string(name)
+        except ImportError as e:
+            raise ImproperlyConfigured("Unknown JSON backend '%s'" % name) from e
+    try:
+        backend_class()
+    except ImportError as e:
+        raise ImproperlyConfigured("The '%s' JSON backend requires the '%s' package" % (name, e.name)) from e
+    return backend_class
+
+@lru_cache(maxsize=128)
+def _get_json_backend(name:str, encoder) -> JSONBackend:
+    return _get_backend_class(name)(encoder=encoder)
+
+def get_json_backend(name:str = None, encoder=DjangoJSONEncoder) -> JSONBackend:
+    """
+    Return the shared backend for a name and encoder class.
+    :param name: `json`, `orjson`, `ujson`, `fast` or a dotted path to a `JSONBackend` subclass.
+                 Defaults to `settings.URL_FRAMEWORK_JSON_BACKEND`, or `json`.
+    """
+    if name is None:
+        name = getattr(settings, 'URL_FRAMEWORK_JSON_BACKEND', DEFAULT_JSON_BACKEND)
+    if encoder is None:
+        encoder = DjangoJSONEncoder
+    return _get_json_backend(name, encoder)
+
+@lru_cache(maxsize=128)
+def get_encoder_with_default(encoder, default:Callable):
+    """A subclass of `encoder` using `default`, created once per combination instead of for every response."""
+    return type("CustomJSONEncoder", (encoder or json.JSONEncoder,), {'default': staticmethod(default)})
+
+def is_utf8(charset:str) -> bool:
+    try:
+        return codecs.lookup(charset).name == 'utf-8'
+    except LookupError:
+        return False
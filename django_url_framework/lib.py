@@ -1,2 +1,28 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
 def is_ajax(request):
-  return request.headers.get('x-requested-with') == 'XMLHttpRequest'
+    return request.headers.get('x-requested-with') == 'XMLHttpRequest'
+
+_thread_pool = None
+_thread_pool_lock = threading.Lock()
+
+def get_thread_pool() -> ThreadPoolExecutor:
+    """
+    The bounded thread pool used to run synchronous code, such as sync actions on async controllers,
+    without blocking the event loop. Its size is set with `settings.URL_FRAMEWORK_THREAD_POOL_SIZE`.
+    """
+    global _thread_pool
+    if _thread_pool is None:
+        with _thread_pool_lock:
+            if _thread_pool is None:
+                _thread_pool = ThreadPoolExecutor(max_workers=getattr(settings, 'URL_FRAMEWORK_THREAD_POOL_SIZE', 10),
+                                                  thread_name_prefix="django_url_framework")
+    return _thread_pool
+
+async def run_in_thread_pool(func, *args, **kwargs):
+    """Await a synchronous callable in the bounded thread pool, see `get_thread_pool`."""
+    return await sync_to_async(func, thread_sensitive=False, executor=get_thread_pool())(*args, **kwargs)
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ...discovery import DiscoveryManifest
+from ...site import Site
+
+
+class Command(BaseCommand):
+    help = "Scan, import and introspect all controllers and write the discovery manifest used by `Site.autodiscover`."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=None,
+                            help="Path of the manifest file, defaults to settings.URL_FRAMEWORK_MANIFEST")
+        parser.add_argument('--include-app', action='append', default=[], dest='include_apps',
+                            help="Only include apps matching this regex, can be given multiple times")
+        parser.add_argument('--exclude-app', action='append', default=[], dest='exclude_apps',
+                            help="Exclude apps matching this regex, can be given multiple times")
+        parser.add_argument('--new-inflection-library', action='store_true',
+                            help="Must match the `new_inflection_library` argument given to `autodiscover`")
+
+    def handle(self, *args, **options):
+        path = options['output'] or getattr(settings, 'URL_FRAMEWORK_MANIFEST', None)
+        if not path:
+            raise CommandError("No manifest path, pass --output or set URL_FRAMEWORK_MANIFEST")
+
+        manifest = DiscoveryManifest(path=path, use_inflection_lib=options['new_inflection_library'])
+        site = Site()
+        site.autodiscover(include_apps=options['include_apps'],
+                          exclude_apps=options['exclude_apps'],
+                          new_inflection_library=options['new_inflection_library'],
+                          manifest=manifest)
+        # written even if nothing was found, or `autodiscover` already wrote it, so that it replaces an older manifest
+        # and a path that can not be written to fails the command
+        manifest.save()
+        self.stdout.write("Wrote %d controllers to %s" % (len(site.controller_descriptors), path))
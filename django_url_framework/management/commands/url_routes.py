@@ -0,0 +1,79 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...inspection import inspect_routes
+
+
+def _format_time(seconds):
+    if seconds is None:
+        return "-"
+    return "%.1f us" % (seconds * 1e6)
+
+
+class Command(BaseCommand):
+    help = ("List every URL pattern with its name, controller, action, parameters and allowed methods, "
+            "report duplicate and shadowed patterns, and time resolving and reversing each one.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--urlconf', default=None,
+                            help="Dotted path of the urlconf to inspect, defaults to settings.ROOT_URLCONF")
+        parser.add_argument('--number', type=int, default=100,
+                            help="Times each route is resolved and reversed to time it, 0 to skip timing, default 100")
+        parser.add_argument('--json', action='store_true', help="Write the routes as JSON")
+        parser.add_argument('--fail-on-problems', action='store_true',
+                            help="Exit with an error if any route is duplicate, shadowed or can not be reversed")
+
+    def handle(self, *args, **options):
+        reports = inspect_routes(urlconf=options['urlconf'], number=options['number'])
+
+        if options['json']:
+            self.stdout.write(json.dumps([self._as_dict(report) for report in reports], indent=2))
+        else:
+            self._write_table(reports)
+
+        problems = [report for report in reports if report.problems]
+        if problems and options['fail_on_problems']:
+            raise CommandError("%d of %d routes have problems" % (len(problems), len(reports)))
+
+    @staticmethod
+    def _as_dict(report):
+        route = report.route
+        return {
+            'pattern': route.pattern,
+            'name': route.name,
+            'controller': route.controller,
+            'action': route.action,
+            'parameters': dict(route.parameters),
+            'allowed_methods': list(route.allowed_methods) if route.allowed_methods else None,
+            'view': route.view,
+            'sample_url': report.url,
+            'resolve_time': report.resolve_time,
+            'reverse_time': report.reverse_time,
+            'problems': list(report.problems),
+        }
+
+    def _write_table(self, reports):
+        columns = ("#", "pattern", "name", "controller", "action", "parameters", "methods", "resolve", "reverse")
+        rows = []
+        for report in reports:
+            route = report.route
+            rows.append((str(route.position), route.pattern, route.name or "-", route.controller or "-",
+                         route.action or "-",
+                         ", ".join("%s:%s" % parameter for parameter in route.parameters) or "-",
+                         ", ".join(route.allowed_methods) if route.allowed_methods else "any",
+                         _format_time(report.resolve_time), _format_time(report.reverse_time)))
+        widths = [max([len(column)] + [len(row[index]) for row in rows]) for index, column in enumerate(columns)]
+        line = "  ".join("%%-%ds" % width for width in widths)
+        self.stdout.write(line % columns)
+        for report, row in zip(reports, rows):
+            self.stdout.write(line % row)
+            for problem in report.problems:
+                self.stdout.write(self.style.WARNING("    ! %s" % problem))
+
+        resolve_times = [report.resolve_time for report in reports if report.resolve_time is not None]
+        summary = "%d routes, %d with problems" % (len(reports), len([report for report in reports if report.problems]))
+        if resolve_times:
+            summary += ", resolve mean %s, max %s" % (_format_time(sum(resolve_times) / len(resolve_times)),
+                                                      _format_time(max(resolve_times)))
+        self.stdout.write("\n" + summary)
@@ -0,0 +1,270 @@
+"""
+Request counts and latency histograms per controller, action, status and renderer,
+exported in the Prometheus text format.
+
+Enabled with `settings.URL_FRAMEWORK_METRICS = True`. Each process keeps its own metrics, in memory,
+or, if `settings.URL_FRAMEWORK_METRICS_DIR` is set, in a memory-mapped file in that directory,
+so the export view of any worker can add up the metrics of all of them.
+
+The export view answers only the addresses in `settings.URL_FRAMEWORK_METRICS_ALLOWED_IPS`, `settings.INTERNAL_IPS`
+unless set, and staff users, everyone else gets 403 Forbidden.
+"""
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterator, Optional, Tuple
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import HttpResponse, HttpResponseForbidden
+
+from .instrumentation import DispatchObserver
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+METRIC_PREFIX = 'django_url_framework'
+FILE_PREFIX = 'django_url_framework_metrics_'
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_buckets = None
+
+def get_buckets() -> Tuple[float, ...]:
+    """The upper bounds of the histogram buckets, in seconds, `settings.URL_FRAMEWORK_METRICS_BUCKETS`."""
+    global _buckets
+    if _buckets is None:
+        buckets = tuple(sorted(float(b) for b in getattr(settings, 'URL_FRAMEWORK_METRICS_BUCKETS', DEFAULT_BUCKETS)))
+        if not buckets or buckets[-1] != float('inf'):
+            buckets += (float('inf'),)
+        _buckets = buckets
+    return _buckets
+
+def _format_bound(bound:float) -> str:
+    return '+Inf' if bound == float('inf') else repr(bound)
+
+class MemoryStore(object):
+    """Keeps the values of one process in a dict, keyed by a labels tuple and a field name."""
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def add(self, key:str, amount:float):
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def items(self) -> Iterator[Tuple[str, float]]:
+        with self._lock:
+            return iter(list(self._values.items()))
+
+class MmapStore(object):
+    """
+    Keeps the values of one process in a memory-mapped file, which other processes read to aggregate them.
+
+    The file starts with the number of bytes used, followed by entries of a key length, the utf-8 key,
+    padded to 8 bytes, and a double. Entries are only ever appended, and the number of bytes used is written
+    after the entry, so readers never see a partial entry.
+    """
+    _USED = struct.Struct('<I4x')
+    _KEY_LENGTH = struct.Struct('<I')
+    _VALUE = struct.Struct('<d')
+    initial_size = 64 * 1024
+
+    def __init__(self, path:str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, 'a+b')
+        size = os.fstat(self._file.fileno()).st_size
+        if size < self.initial_size:
+            self._file.truncate(self.initial_size)
+            size = self.initial_size
+        self._mmap = mmap.mmap(self._file.fileno(), size)
+        self._used = self._USED.unpack_from(self._mmap, 0)[0]
+        if self._used == 0:
+            self._used = self._USED.size
+            self._USED.pack_into(self._mmap, 0, self._used)
+        self._positions = {key: position for key, value, position in self._read_entries(self._mmap, self._used)}
+
+    @classmethod
+    def _read_entries(cls, data, used:int) -> Iterator[Tuple[str, float, int]]:
+        position = cls._USED.size
+        while position < used:
+            key_length = cls._KEY_LENGTH.unpack_from(data, position)[0]
+            key_start = position + cls._KEY_LENGTH.size
+            key = bytes(data[key_start:key_start + key_length]).decode('utf-8')
+            value_position = key_start + key_length + (-(cls._KEY_LENGTH.size + key_length) % 8)
+            yield key, cls._VALUE.unpack_from(data, value_position)[0], value_position
+            position = value_position + cls._VALUE.size
+
+    @classmethod
+    def read_file(cls, path:str) -> Iterator[Tuple[str, float]]:
+        """The values of a file written by any process."""
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < cls._USED.size:
+            return
+        used = min(cls._USED.unpack_from(data, 0)[0], len(data))
+        for key, value, position in cls._read_entries(data, used):
+            yield key, value
+
+    def _append(self, key:str) -> int:
+        encoded = key.encode('utf-8')
+        entry = (self._KEY_LENGTH.pack(len(encoded)) + encoded
+                 + b'\0' * (-(self._KEY_LENGTH.size + len(encoded)) % 8) + self._VALUE.pack(0.0))
+        if self._used + len(entry) > len(self._mmap):
+            size = len(self._mmap)
+            while self._used + len(entry) > size:
+                size *= 2
+            self._mmap.close()
+            self._file.truncate(size)
+            self._mmap = mmap.mmap(self._file.fileno(), size)
+        self._mmap[self._used:self._used + len(entry)] = entry
+        position = self._used + len(entry) - self._VALUE.size
+        self._used += len(entry)
+        self._USED.pack_into(self._mmap, 0, self._used)
+        self._positions[key] = position
+        return position
+
+    def add(self, key:str, amount:float):
+        with self._lock:
+            position = self._positions.get(key)
+            if position is None:
+                position = self._append(key)
+            self._VALUE.pack_into(self._mmap, position, self._VALUE.unpack_from(self._mmap, position)[0] + amount)
+
+    def items(self) -> Iterator[Tuple[str, float]]:
+        with self._lock:
+            return iter([(key, self._VALUE.unpack_from(self._mmap, position)[0])
+                         for key, position in self._positions.items()])
+
+    def close(self):
+        with self._lock:
+            self._mmap.close()
+            self._file.close()
+
+_store = None
+_store_pid = None
+_store_lock = threading.Lock()
+
+def get_metrics_dir() -> Optional[str]:
+    return getattr(settings, 'URL_FRAMEWORK_METRICS_DIR', None)
+
+def get_store():
+    """The store of the current process, a new one is created in a forked worker."""
+    global _store, _store_pid
+    pid = os.getpid()
+    if _store is None or _store_pid != pid:
+        with _store_lock:
+            if _store is None or _store_pid != pid:
+                metrics_dir = get_metrics_dir()
+                if metrics_dir:
+                    _store = MmapStore(os.path.join(metrics_dir, '%s%d.db' % (FILE_PREFIX, pid)))
+                else:
+                    _store = MemoryStore()
+                _store_pid = pid
+    return _store
+
+@receiver(setting_changed)
+def _reset_store(setting, **kwargs):
+    global _store, _buckets
+    if setting in ('URL_FRAMEWORK_METRICS_DIR', 'URL_FRAMEWORK_METRICS_BUCKETS'):
+        if isinstance(_store, MmapStore) and _store_pid == os.getpid():
+            _store.close()
+        _store = None
+        _buckets = None
+
+@lru_cache(maxsize=4096)
+def _make_key(labels:Tuple[str, ...], field:str) -> str:
+    return json.dumps(list(labels) + [field])
+
+def observe(controller_name:str, action_name:str, status, renderer:str, duration:float):
+    """Count one request and add its duration to the histogram of its labels."""
+    labels = (controller_name, action_name, str(status), renderer)
+    buckets = get_buckets()
+    store = get_store()
+    store.add(_make_key(labels, 'le:' + _format_bound(buckets[bisect_left(buckets, duration)])), 1.0)
+    store.add(_make_key(labels, 'sum'), duration)
+    store.add(_make_key(labels, 'count'), 1.0)
+
+def _iter_values() -> Iterator[Tuple[str, float]]:
+    metrics_dir = get_metrics_dir()
+    if not metrics_dir:
+        yield from get_store().items()
+        return
+    for path in sorted(glob.glob(os.path.join(metrics_dir, FILE_PREFIX + '*.db'))):
+        try:
+            yield from MmapStore.read_file(path)
+        except (OSError, ValueError, struct.error):
+            continue
+
+def collect() -> Dict[Tuple[str, ...], dict]:
+    """The metrics of all processes, by labels, each with `buckets` (non-cumulative counts by bound), `sum` and `count`."""
+    metrics = OrderedDict()
+    for key, value in _iter_values():
+        *labels, field = json.loads(key)
+        metric = metrics.setdefault(tuple(labels), {'buckets': {}, 'sum': 0.0, 'count': 0.0})
+        if field.startswith('le:'):
+            bound = field[3:]
+            metric['buckets'][bound] = metric['buckets'].get(bound, 0.0) + value
+        else:
+            metric[field] += value
+    return metrics
+
+def _escape(value:str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(labels:Tuple[str, ...], **extra) -> str:
+    pairs = list(zip(('controller', 'action', 'status', 'renderer'), labels)) + list(extra.items())
+    return '{%s}' % ','.join('%s="%s"' % (name, _escape(value)) for name, value in pairs)
+
+def render_prometheus(metrics:Dict[Tuple[str, ...], dict]) -> str:
+    """Render collected metrics in the Prometheus text exposition format."""
+    requests = '%s_requests_total' % METRIC_PREFIX
+    duration = '%s_request_duration_seconds' % METRIC_PREFIX
+    lines = [
+        '# HELP %s Requests dispatched to actions.' % requests,
+        '# TYPE %s counter' % requests,
+    ]
+    for labels, metric in sorted(metrics.items()):
+        lines.append('%s%s %r' % (requests, _format_labels(labels), metric['count']))
+    lines += [
+        '# HELP %s Time spent dispatching actions.' % duration,
+        '# TYPE %s histogram' % duration,
+    ]
+    bounds = [_format_bound(bound) for bound in get_buckets()]
+    for labels, metric in sorted(metrics.items()):
+        bucket_bounds = bounds + sorted(set(metric['buckets']).difference(bounds), key=float)
+        cumulative = 0.0
+        for bound in sorted(bucket_bounds, key=float):
+            cumulative += metric['buckets'].get(bound, 0.0)
+            lines.append('%s_bucket%s %r' % (duration, _format_labels(labels, le=bound), cumulative))
+        lines.append('%s_sum%s %r' % (duration, _format_labels(labels), metric['sum']))
+        lines.append('%s_count%s %r' % (duration, _format_labels(labels), metric['count']))
+    return '\n'.join(lines) + '\n'
+
+def can_view_metrics(request) -> bool:
+    """Whether the request comes from `settings.URL_FRAMEWORK_METRICS_ALLOWED_IPS`, or from a staff user."""
+    allowed_ips = getattr(settings, 'URL_FRAMEWORK_METRICS_ALLOWED_IPS', None)
+    if allowed_ips is None:
+        allowed_ips = settings.INTERNAL_IPS
+    if request.META.get('REMOTE_ADDR') in allowed_ips:
+        return True
+    user = getattr(request, 'user', None)
+    return bool(user is not None and user.is_active and user.is_staff)
+
+def metrics_view(request):
+    """The metrics of all processes in the Prometheus text format, mounted by `Site.urls` at `Site.metrics_url`."""
+    if not can_view_metrics(request):
+        return HttpResponseForbidden()
+    return HttpResponse(render_prometheus(collect()), content_type=PROMETHEUS_CONTENT_TYPE)
+
+class MetricsObserver(DispatchObserver):
+    """Records every dispatch, added to the observers by `settings.URL_FRAMEWORK_METRICS`."""
+    def dispatch_finished(self, controller, plan, timings, total, response, renderer=None):
+        status = response.status_code if response is not None else 500
+        observe(plan.controller_name, plan.action_name, status,
+                renderer.__name__ if renderer is not None else 'none', total)
@@ -0,0 +1,167 @@
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Iterable, NamedTuple, Optional, Tuple, Union
+
+from .renderers import CSVRenderer, JSONRenderer, NDJSONRenderer, Renderer, TemplateRenderer, TextRenderer, YAMLRenderer
+
+class MediaRange(NamedTuple):
+    type: str
+    subtype: str
+    quality: float
+    index: int
+
+    @property
+    def specificity(self) -> int:
+        if self.type == '*':
+            return 0
+        if self.subtype == '*':
+            return 1
+        return 2
+
+    def matches(self, media_type:str, media_subtype:str) -> bool:
+        return (self.type == '*' or self.type == media_type) and (self.subtype == '*' or self.subtype == media_subtype)
+
+@lru_cache(maxsize=256)
+def parse_accept(accept:str) -> Tuple[MediaRange, ...]:
+    """
+    Parse an Accept header into its media ranges, in the order they were sent.
+    Malformed entries, and parameters other than `q`, are ignored.
+    """
+    media_ranges = []
+    for index, entry in enumerate(accept.split(',')):
+        media_range, *params = entry.split(';')
+        media_range = media_range.strip().lower()
+        if media_range == '*':
+            media_range = '*/*'
+        if media_range.count('/') != 1:
+            continue
+        media_type, media_subtype = media_range.split('/')
+        if not media_type or not media_subtype or (media_type == '*' and media_subtype != '*'):
+            continue
+
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = min(max(float(value.strip()), 0.0), 1.0)
+                except ValueError:
+                    quality = None
+                break
+        if quality is not None:
+            media_ranges.append(MediaRange(media_type, media_subtype, quality, index))
+    return tuple(media_ranges)
+
+@lru_cache(maxsize=512)
+def select_media_type(media_types:Tuple[str, ...], accept:str) -> Optional[str]:
+    """
+    Choose the media type the client prefers out of the ones offered, by RFC 7231 content negotiation.
+
+    The quality of each offered type is given by the most specific media range that matches it.
+    Of the types with the highest quality, the one matched more specifically wins, then the one whose
+    media range comes first in the Accept header, then the one offered first.
+    Returns None if none of the types are acceptable.
+    """
+    media_ranges = parse_accept(accept)
+    best = None
+    best_score = None
+    for position, media_type in enumerate(media_types):
+        type_, _, subtype = media_type.partition('/')
+        match = None
+        for media_range in media_ranges:
+            if media_range.matches(type_, subtype) and (match is None or media_range.specificity > match.specificity):
+                match = media_range
+        if match is None or match.quality <= 0:
+            continue
+        score = (match.quality, match.specificity, -match.index, -position)
+        if best_score is None or score > best_score:
+            best, best_score = media_type, score
+    return best
+
+class RendererRegistry(object):
+    """
+    Maps media types to the renderer classes `@auto` chooses between, by the Accept header of the request.
+
+    A registry can extend a `parent`, its own media types replace the parent's, and are offered after them.
+    The order media types are registered in is the server's preference, used when the client accepts several equally,
+    such as with `*/*`. Requests that accept none of the media types are rendered with the `default` renderer.
+    """
+    def __init__(self, renderers:Union[dict, Iterable[tuple]] = (), default:Optional[type] = None,
+                 parent:Optional['RendererRegistry'] = None):
+        self.parent = parent
+        self._renderers = OrderedDict()
+        self._default = default
+        self._version = 0
+        self._resolved = None
+        if isinstance(renderers, dict):
+            renderers = renderers.items()
+        for media_type, renderer_class in renderers:
+            self.register(media_type, renderer_class)
+
+    def __repr__(self):
+        return "<RendererRegistry %s>" % ", ".join(self.media_types)
+
+    def register(self, media_type:str, renderer_class:type):
+        if not issubclass(renderer_class, Renderer):
+            raise TypeError("%r is not a Renderer" % renderer_class)
+        self._renderers[media_type.lower()] = renderer_class
+        self._version += 1
+
+    def unregister(self, media_type:str):
+        self._renderers.pop(media_type.lower(), None)
+        self._version += 1
+
+    @property
+    def version(self) -> tuple:
+        if self.parent is None:
+            return (self._version,)
+        return (self._version,) + self.parent.version
+
+    def _resolve(self):
+        version = self.version
+        if self._resolved is None or self._resolved[0] != version:
+            if self.parent is not None:
+                renderers = OrderedDict(self.parent.renderers)
+                default = self._default or self.parent.default
+            else:
+                renderers = OrderedDict()
+                default = self._default or TextRenderer
+            renderers.update(self._renderers)
+            self._resolved = (version, tuple(renderers.keys()), renderers, default)
+        return self._resolved
+
+    @property
+    def media_types(self) -> Tuple[str, ...]:
+        return self._resolve()[1]
+
+    @property
+    def renderers(self) -> OrderedDict:
+        return self._resolve()[2]
+
+    @property
+    def default(self) -> type:
+        return self._resolve()[3]
+
+    def get_media_type(self, accept:Union[str, list, tuple, None]) -> Optional[str]:
+        """The registered media type selected for an Accept header, None if the `default` renderer is used."""
+        if not accept:
+            return None
+        if isinstance(accept, (list, tuple)):
+            accept = ", ".join(accept)
+        return select_media_type(self.media_types, accept)
+
+    def get_renderer_class(self, accept:Union[str, list, tuple, None]) -> type:
+        """The renderer class for an Accept header, which may also be a list of media ranges."""
+        media_type = self.get_media_type(accept)
+        if media_type is None:
+            return self.default
+        return self.renderers[media_type]
+
+default_renderers = RendererRegistry([
+    ('text/plain', TextRenderer),
+    ('text/html', TemplateRenderer),
+    ('application/json', JSONRenderer),
+    ('application/yaml', YAMLRenderer),
+    ('application/x-ndjson', NDJSONRenderer),
+    ('text/csv', CSVRenderer),
+])
@@ -1,22 +1,140 @@
-import json
+import csv
+import weakref
+from collections import ChainMap
+from collections.abc import Iterator, Mapping
 
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
 from django.core.serializers.json import DjangoJSONEncoder
 
 import django_url_framework #for type hinting
+from .action_cache import LocalCache
+from .json_backends import get_json_backend, is_utf8
 
 import pprint
 from abc import ABC, abstractmethod
 
-from django.http import HttpResponseRedirect, HttpResponsePermanentRedirect
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.template import TemplateDoesNotExist, loader
+from django.template.backends.django import Template as DjangoTemplate
+from django.template.context import make_context
+from django.http import HttpResponseRedirect, HttpResponsePermanentRedirect, StreamingHttpResponse
 
 default_charset = "utf8"
+# how many compiled templates are kept
+TEMPLATE_CACHE_SIZE = 500
+
+class LayeredContext(ChainMap):
+    """
+    The layers of the context of an action, from the top: what `_after_filter` returned, what the action returned
+    and what `_before_filter` and the context providers returned, the `defaults` layers below the action.
+    No layer is copied, its keys are in the order they would have if the layers were merged into the action's dict.
+    """
+    def __init__(self, *maps, defaults:int = 0):
+        super(LayeredContext, self).__init__(*maps)
+        self.defaults = defaults
+
+    def _get_ordered_layers(self) -> list:
+        """The layer of the action, the layers below it and the layers above it, each from the nearest."""
+        base = len(self.maps) - 1 - self.defaults
+        if base == 0:
+            return self.maps
+        return self.maps[base:] + self.maps[base - 1::-1]
+
+    def __iter__(self):
+        keys = {}
+        for layer in self._get_ordered_layers():
+            keys.update(dict.fromkeys(layer))
+        return iter(keys)
+
+    def flatten(self) -> dict:
+        return {key: self[key] for key in self}
+
+def add_context_layer(context, layer:dict, below:bool = False):
+    """`context` with `layer` on top of it, its values override those of `context`, or below it, see `LayeredContext`."""
+    if context is None:
+        return layer
+    if isinstance(context, LayeredContext):
+        layers, defaults = context.maps, context.defaults
+    else:
+        layers, defaults = [context], 0
+    if below:
+        return LayeredContext(*layers, layer, defaults=defaults + 1)
+    return LayeredContext(layer, *layers, defaults=defaults)
+
+def get_context_layers(context) -> list:
+    """The layers of a context, from the bottom."""
+    if context is None:
+        return []
+    if isinstance(context, LayeredContext):
+        return context.maps[::-1]
+    return [context]
+
+def flatten_context(context):
+    """The context as a single `dict`, for the renderers that serialize it, other data is returned as it is."""
+    if isinstance(context, LayeredContext):
+        return context.flatten()
+    return context
+
+class FrameworkContext(Mapping):
+    """
+    The values `TemplateRenderer` adds on top of the context of a template, each one computed the first time
+    the template uses it, so a template that does not show flash messages does not load them.
+    """
+    __slots__ = ('controller', '_values')
+
+    getters = {
+        'request': lambda controller: controller._request,
+        'controller_name': lambda controller: controller._controller_name,
+        'controller_actions': lambda controller: list(controller._actions),
+        'action_name': lambda controller: controller._action_name,
+        'controller_helper': lambda controller: controller._helper,
+        'flash': lambda controller: controller._flash,
+    }
+
+    def __init__(self, controller:'django_url_framework.controller.ActionController'):
+        self.controller = controller
+        self._values = {}
+
+    def __getitem__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            value = self._values[key] = self.getters[key](self.controller)
+            return value
+
+    def __contains__(self, key):
+        # the template looks up every variable in each layer, that must not compute the values
+        return key in self.getters
+
+    def __iter__(self):
+        return iter(self.getters)
+
+    def __len__(self):
+        return len(self.getters)
+
 class Renderer(ABC):
+    # render in a thread when dispatched asynchronously, for renderers that may touch the database
+    render_in_thread = False
+    # renderer argument -> controller attribute, the default of the argument when the controller creates the renderer
+    controller_params = {}
+
     def __init__(self, data, mimetype=None, charset=default_charset, status_code=200, **kwargs):
         self._data = data
         self.mimetype=mimetype
         self.charset=charset
         self.status_code=status_code
 
+    @classmethod
+    def from_controller(cls, controller:'django_url_framework.controller.ActionController', data, **kwargs):
+        """Create the renderer for a controller, arguments that are not passed, or None, default to `controller_params`."""
+        for param, attribute in cls.controller_params.items():
+            if kwargs.get(param) is None:
+                kwargs[param] = getattr(controller, attribute)
+        return cls(data=data, **kwargs)
+
     def get_context(self):
         return self._data
 
@@ -25,52 +143,119 @@ class Renderer(ABC):
         pass
 
     def update(self, data)->None:
+        """Add `data` on top of the context, see `add_context_layer`."""
         if isinstance(data,dict):
-            self._data.update(data)
+            self._data = add_context_layer(self._data, data)
         else:
             raise ValueError("expecting a dictionary")
 
+    def add_defaults(self, data:dict)->None:
+        """Add `data` below the context, its values are used where the context has none."""
+        self._data = add_context_layer(self._data, data, below=True)
+
+# controller class -> (action name, ajax template, template prefix, extension and strings) -> template name,
+# weak so a controller class can still be released
+_template_name_cache = weakref.WeakKeyDictionary()
+# template name -> compiled template, the most recently used ones
+_template_cache = LocalCache(max_size=TEMPLATE_CACHE_SIZE)
+
+def clear_template_caches():
+    """Forget the resolved template names and compiled templates, called when the template settings change."""
+    _template_name_cache.clear()
+    _template_cache.clear()
+
+@receiver(setting_changed)
+def _clear_template_caches_on_setting_changed(setting, **kwargs):
+    if setting in ('TEMPLATES', 'DEBUG', 'INSTALLED_APPS'):
+        clear_template_caches()
+
 class TemplateRenderer(Renderer):
+    """
+    Renders the data with a Django template. The template name of each action, and the compiled template, are cached,
+    unless `settings.DEBUG` is on. The cached name is kept for each template prefix, extension and template string,
+    so controllers that change them per request get the name they set.
+    """
+    render_in_thread = True
+
     def __init__(self, data, template_name=None, **kwargs):
         super(TemplateRenderer, self).__init__(data=data, **kwargs)
         self._template_name = template_name
 
+    @staticmethod
+    def _resolve_template_name(controller:'django_url_framework.controller.ActionController', use_ajax_template:bool):
+        template_replacement_data = {'controller':controller._template_prefix,
+                                     'action':controller._action_name,
+                                     'ext':controller._template_extension}
+
+        if use_ajax_template:
+            if hasattr(controller._action_func, 'ajax_template_name'):
+                return controller._action_func.ajax_template_name
+            return controller._ajax_template_string % template_replacement_data
+        elif hasattr(controller._action_func,'template_name'):
+            return controller._action_func.template_name
+        return controller._template_string % template_replacement_data
+
     def get_template_name(self, controller:'django_url_framework.controller.ActionController'):
         if not self._template_name:
-            template_replacement_data = {'controller':controller._template_prefix,
-                                         'action':controller._action_name,
-                                         'ext':controller._template_extension}
-
-            if controller._is_ajax and controller._no_ajax_prefix==False:
-                if hasattr(controller._action_func, 'ajax_template_name'):
-                    self._template_name = controller._action_func.ajax_template_name
-                else:
-                    self._template_name = controller._ajax_template_string % template_replacement_data
-            elif hasattr(controller._action_func,'template_name'):
-                self._template_name = controller._action_func.template_name
+            use_ajax_template = controller._is_ajax and controller._no_ajax_prefix==False
+            if settings.DEBUG:
+                self._template_name = self._resolve_template_name(controller, use_ajax_template)
             else:
-                self._template_name = controller._template_string % template_replacement_data
+                class_cache = _template_name_cache.get(controller.__class__)
+                if class_cache is None:
+                    class_cache = _template_name_cache.setdefault(controller.__class__, {})
+                cache_key = (controller._action_name, use_ajax_template,
+                             controller._template_prefix, controller._template_extension,
+                             controller._template_string, controller._ajax_template_string)
+                template_name = class_cache.get(cache_key)
+                if template_name is None:
+                    template_name = class_cache[cache_key] = self._resolve_template_name(controller, use_ajax_template)
+                self._template_name = template_name
         return self._template_name
 
-    def render(self, controller):
-        from django.template import loader
-        dictionary = self._data
-        if dictionary is None:
-            dictionary = {}
+    @staticmethod
+    def get_template(template_name):
+        """`django.template.loader.get_template`, or `select_template` for a list of names, cached unless `settings.DEBUG` is on."""
+        if isinstance(template_name, list):
+            template_name = tuple(template_name)
+        template = None if settings.DEBUG else _template_cache.get(template_name)
+        if template is None:
+            if isinstance(template_name, tuple):
+                template = loader.select_template(template_name)
+            else:
+                template = loader.get_template(template_name)
+            if not settings.DEBUG:
+                _template_cache.set(template_name, template)
+        return template
 
-        dictionary.update({
-            'request':controller._request,
-            'controller_name':controller._controller_name,
-            'controller_actions':list(controller._actions.keys()),
-            'action_name':controller._action_name,
-            'controller_helper':controller._helper,
-            'flash': controller._flash,
-        })
+    @staticmethod
+    def render_layers(template:DjangoTemplate, layers:list, request)->str:
+        """Render a Django template with the layers of its context, from the bottom, without copying them."""
+        context = make_context(None, request, autoescape=template.backend.engine.autoescape)
+        # `Context.push` would copy each layer, the empty dict on top receives what the template assigns,
+        # such as `{% firstof a b as x %}`, as `Context.__setitem__` writes to the last dict
+        context.dicts.extend(layers)
+        context.dicts.append({})
+        try:
+            return template.template.render(context)
+        except TemplateDoesNotExist as exc:
+            # name the backend, as `django.template.backends.django.Template.render` does
+            new_exc = TemplateDoesNotExist(*exc.args, tried=exc.tried, backend=template.backend, chain=exc.chain)
+            if hasattr(exc, 'template_debug'):
+                new_exc.template_debug = exc.template_debug
+            raise new_exc from exc
 
+    def render(self, controller):
+        template = self.get_template(self.get_template_name(controller=controller))
+        layers = get_context_layers(self._data) + [FrameworkContext(controller)]
+        if isinstance(template, DjangoTemplate):
+            return self.render_layers(template, layers, controller._request)
 
-        return  loader.render_to_string(template_name=self.get_template_name(controller=controller),
-                                         context=self._data,
-                                         request=controller._request)
+        # other template backends take a single dict
+        context = {}
+        for layer in layers:
+            context.update(layer)
+        return template.render(context=context, request=controller._request)
 
 class TextRenderer(Renderer):
     def __init__(self, data, mimetype="text/plain", **kwargs):
@@ -78,34 +263,240 @@ class TextRenderer(Renderer):
     def render(self,  controller):
         if isinstance(self._data,str):
             return self._data
-        return pprint.pformat(self._data)
+        return pprint.pformat(flatten_context(self._data))
 
     def update(self, data):
-        if isinstance(self._data, dict) and isinstance(data, dict):
+        if isinstance(self._data, Mapping) and isinstance(data, dict):
             super(TextRenderer, self).update(data=data)
         elif isinstance(data,str):
             self._data = data
 
 class YAMLRenderer(Renderer):
+    controller_params = {'default_flow_style': 'yaml_default_flow_style'}
+
     def __init__(self, data, default_flow_style=None, **kwargs):
         super(YAMLRenderer, self).__init__(data=data, mimetype="application/yaml", **kwargs)
         self._default_flow_style = default_flow_style
     def render(self, controller):
         import yaml
-        return yaml.dump(self._data, default_flow_style=self._default_flow_style)
+        return yaml.dump(flatten_context(self._data), default_flow_style=self._default_flow_style)
 
 
 class JSONRenderer(Renderer):
-    def __init__(self, data, json_default_encoder=DjangoJSONEncoder, **kwargs):
+    """
+    :param json_default_encoder: the `JSONEncoder` class, handles the types the JSON backend does not serialize itself
+    :param json_backend: the name of a JSON backend, see `django_url_framework.json_backends.get_json_backend`
+    """
+    controller_params = {'json_default_encoder': 'json_default_encoder'}
+
+    def __init__(self, data, json_default_encoder=DjangoJSONEncoder, json_backend=None, **kwargs):
         super(JSONRenderer, self).__init__(data=data, mimetype="application/json", **kwargs)
         self._json_default_encoder = json_default_encoder
+        self._json_backend = json_backend
+
+    @classmethod
+    def from_controller(cls, controller, data, json_encoder=None, **kwargs):
+        """`json_encoder`, as passed to `@auto`, is the `json_default_encoder` of the renderer."""
+        if kwargs.get('json_default_encoder') is None:
+            kwargs['json_default_encoder'] = json_encoder
+        if kwargs.get('json_backend') is None:
+            kwargs['json_backend'] = controller._get_json_backend_name()
+        return super(JSONRenderer, cls).from_controller(controller, data=data, **kwargs)
+
+    def get_json_backend(self):
+        return get_json_backend(self._json_backend, self._json_default_encoder)
 
     def update(self, data):
-        if isinstance(self._data, dict) and isinstance(data, dict):
+        if isinstance(self._data, Mapping) and isinstance(data, dict):
             super(JSONRenderer, self).update(data=data)
 
     def render(self, controller):
-        return json.dumps(self._data, cls=self._json_default_encoder)
+        content = self.get_json_backend().dumps(flatten_context(self._data))
+        if isinstance(content, bytes) and not is_utf8(self.charset):
+            content = content.decode('utf-8')
+        return content
+
+class StreamingRendererMixin(object):
+    """
+    Renders into a `StreamingHttpResponse`, from the parts yielded by `iter_parts`, joined into chunks
+    of about `buffer_size` characters, so the whole content never has to be held in memory.
+    QuerySets are read with `QuerySet.iterator`, `queryset_chunk_size` rows at a time, so their rows are not cached either.
+    """
+    def __init__(self, data, buffer_size=64*1024, queryset_chunk_size=2000, **kwargs):
+        super(StreamingRendererMixin, self).__init__(data=data, **kwargs)
+        self._buffer_size = buffer_size
+        self._queryset_chunk_size = queryset_chunk_size
+
+    def iter_parts(self):
+        """Yield the content as strings of any size."""
+        raise NotImplementedError
+
+    def _iter_rows(self, data):
+        """The rows of line oriented data, one row if it is a dictionary, or anything other than a sequence."""
+        from django.db.models.query import QuerySet
+        if isinstance(data, QuerySet):
+            return data.iterator(chunk_size=self._queryset_chunk_size)
+        if isinstance(data, (list, tuple, range, Iterator)):
+            return iter(data)
+        if data is None:
+            return iter(())
+        return iter((flatten_context(data),))
+
+    def iter_chunks(self):
+        """Yield the encoded content in chunks of about `buffer_size` characters."""
+        buffer = []
+        buffered = 0
+        for part in self.iter_parts():
+            buffer.append(part)
+            buffered += len(part)
+            if buffered >= self._buffer_size:
+                yield ''.join(buffer).encode(self.charset)
+                buffer = []
+                buffered = 0
+        if buffer:
+            yield ''.join(buffer).encode(self.charset)
+
+    async def aiter_chunks(self):
+        """Like `iter_chunks`, each chunk is produced in the same worker thread, so QuerySets can be read under ASGI."""
+        chunks = self.iter_chunks()
+        next_chunk = sync_to_async(next, thread_sensitive=True)
+        while True:
+            chunk = await next_chunk(chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+
+    def get_headers(self) -> dict:
+        """Headers set on the response."""
+        return {}
+
+    def render(self, controller):
+        if isinstance(controller._request, ASGIRequest):
+            streaming_content = self.aiter_chunks()
+        else:
+            streaming_content = self.iter_chunks()
+        response = StreamingHttpResponse(streaming_content,
+                                         content_type="%s; charset=%s" % (self.mimetype, self.charset),
+                                         status=self.status_code or 200)
+        for header, value in self.get_headers().items():
+            response[header] = value
+        return response
+
+class StreamingJSONRenderer(StreamingRendererMixin, JSONRenderer):
+    """
+    Encodes the data into a `StreamingHttpResponse` chunk by chunk, instead of into one string.
+    Lists, tuples, iterators such as generators, and QuerySets, at the top level or as values of a top level dictionary,
+    are streamed one item at a time, so they never have to be held in memory as a whole.
+    QuerySets are read with `QuerySet.iterator` so their rows are not cached either.
+    """
+
+    def _iter_stream(self, data):
+        """Return an iterator over the items of `data` if it should be streamed, otherwise None."""
+        from django.db.models.query import QuerySet
+        if isinstance(data, QuerySet):
+            return data.iterator(chunk_size=self._queryset_chunk_size)
+        if isinstance(data, (list, tuple, range, Iterator)):
+            return iter(data)
+        return None
+
+    @staticmethod
+    def _encode_key(key, encode):
+        if isinstance(key, str):
+            pass
+        elif key is True:
+            key = 'true'
+        elif key is False:
+            key = 'false'
+        elif key is None:
+            key = 'null'
+        elif isinstance(key, (int, float)):
+            key = encode(key)
+        else:
+            raise TypeError("keys must be str, int, float, bool or None, not %s" % key.__class__.__name__)
+        return encode(key)
+
+    def _iter_json(self, data, encode, top_level=True):
+        if top_level and isinstance(data, Mapping):
+            yield '{'
+            first = True
+            for key, value in data.items():
+                yield ('%s: ' if first else ', %s: ') % self._encode_key(key, encode)
+                yield from self._iter_json(value, encode, top_level=False)
+                first = False
+            yield '}'
+            return
+
+        items = self._iter_stream(data)
+        if items is None:
+            yield encode(data)
+        else:
+            yield '['
+            first = True
+            for item in items:
+                yield encode(item) if first else ', ' + encode(item)
+                first = False
+            yield ']'
+
+    def iter_parts(self):
+        return self._iter_json(self._data, self.get_json_backend().dumps_str)
+
+class NDJSONRenderer(StreamingRendererMixin, JSONRenderer):
+    """
+    Streams newline delimited JSON, one JSON document per line for each item of a list, tuple, iterator or QuerySet,
+    so clients can process each row as it arrives. Any other data is a single line.
+    """
+    def __init__(self, data, **kwargs):
+        super(NDJSONRenderer, self).__init__(data=data, **kwargs)
+        self.mimetype = "application/x-ndjson"
+
+    def iter_parts(self):
+        encode = self.get_json_backend().dumps_str
+        for row in self._iter_rows(self._data):
+            yield encode(row) + '\n'
+
+class _CSVLine(object):
+    """A file for `csv.writer` that returns each line instead of writing it."""
+    def write(self, line):
+        return line
+
+class CSVRenderer(StreamingRendererMixin, Renderer):
+    """
+    Streams CSV, one line for each item of a list, tuple, iterator or QuerySet.
+
+    Rows can be sequences, dictionaries, such as from `QuerySet.values`, or objects, such as model instances,
+    whose `header` attributes are written. The `header` is the first line, for dictionaries it defaults to
+    the keys of the first row, `header=False` writes no header line.
+
+    :param header: the column names
+    :param dialect: the `csv` dialect
+    :param filename: sent in a `Content-Disposition: attachment` header
+    """
+    def __init__(self, data, header=None, dialect='excel', filename=None, mimetype="text/csv", **kwargs):
+        super(CSVRenderer, self).__init__(data=data, mimetype=mimetype, **kwargs)
+        self._header = header
+        self._dialect = dialect
+        self._filename = filename
+
+    def get_headers(self) -> dict:
+        if self._filename:
+            return {'Content-Disposition': 'attachment; filename="%s"' % self._filename.replace('"', '')}
+        return {}
+
+    def iter_parts(self):
+        writer = csv.writer(_CSVLine(), dialect=self._dialect)
+        columns = self._header or None
+        if columns:
+            yield writer.writerow(columns)
+        for row in self._iter_rows(self._data):
+            if isinstance(row, Mapping):
+                if columns is None:
+                    columns = list(row)
+                    if self._header is None:
+                        yield writer.writerow(columns)
+                row = [row.get(column) for column in columns]
+            elif columns and not isinstance(row, (list, tuple)):
+                row = [getattr(row, column) for column in columns]
+            yield writer.writerow(row)
 
 class RedirectRenderer(Renderer):
     def __init__(self, to_url, permanent=False, **kwargs):
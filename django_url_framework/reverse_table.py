@@ -0,0 +1,194 @@
+import re
+import threading
+import weakref
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+from urllib.parse import quote
+
+from django.urls import get_resolver, get_script_prefix, get_urlconf, reverse
+try:
+    from django.urls.converters import get_converters
+except ImportError: # Django < 5.1
+    from django.urls.converters import get_converter
+else:
+    def get_converter(raw_converter):
+        return get_converters()[raw_converter]
+
+# the same syntax `django.urls.path` accepts
+_PATH_PARAMETER_RE = re.compile(r"<(?:(?P<converter>[^>:]+):)?(?P<parameter>[^>]+)>")
+# safe characters from `pchar` definition of RFC 3986, as used by `django.urls.reverse`
+_SAFE_CHARACTERS = "!$&'()*+,;=" + "/~:@"
+
+class ReverseRoute(NamedTuple):
+    """
+    A route compiled for reversing, relative to where the site is mounted.
+    `template` is a `%` format string, `params` the names of its parameters in order,
+    and `converters` the converter of each parameter with a compiled regex to validate its output with.
+    """
+    name: str
+    template: str
+    params: Tuple[str, ...]
+    converters: Tuple[tuple, ...]
+
+    @classmethod
+    def compile(cls, name:str, route:str) -> 'ReverseRoute':
+        """Compile a `django.urls.path` route, raises ValueError for unknown converters."""
+        template = []
+        params = []
+        converters = []
+        position = 0
+        for match in _PATH_PARAMETER_RE.finditer(route):
+            template.append(route[position:match.start()].replace('%', '%%'))
+            parameter = match.group('parameter')
+            if not parameter.isidentifier() or parameter in params:
+                raise ValueError("Invalid parameter %r in route %r" % (parameter, route))
+            try:
+                converter = get_converter(match.group('converter') or 'str')
+            except KeyError as e:
+                raise ValueError("Invalid converter in route %r: %s" % (route, e))
+            template.append('%%(%s)s' % parameter)
+            params.append(parameter)
+            converters.append((converter, re.compile(converter.regex)))
+            position = match.end()
+        template.append(route[position:].replace('%', '%%'))
+        return cls(name, ''.join(template), tuple(params), tuple(converters))
+
+    def build(self, args:Optional[tuple], kwargs:Optional[dict]) -> Optional[str]:
+        """The quoted relative URL, or None if a value is not accepted by its converter."""
+        values = {}
+        for index, (param, (converter, regex)) in enumerate(zip(self.params, self.converters)):
+            value = args[index] if args else kwargs[param]
+            try:
+                text = converter.to_url(value)
+            except ValueError:
+                return None
+            if not isinstance(text, str) or regex.fullmatch(text) is None:
+                return None
+            values[param] = text
+        return quote(self.template % values, safe=_SAFE_CHARACTERS)
+
+class ReverseTable(object):
+    """
+    The named URLs of the controllers of a site, compiled when the urlconf is generated,
+    so `ApplicationHelper.url_for` can build URLs with string formatting instead of `django.urls.reverse`.
+
+    Routes are relative to the site, the prefix the site is mounted under is learned by reversing each
+    route once with `reverse()`, per URL resolver and script prefix.
+    Names that are also used outside of the site, regex routes, routes under an `urlconf_prefix`,
+    and names with more than one route for the same arguments are always reversed with `reverse()`.
+    """
+    _FOREIGN = object()
+
+    def __init__(self):
+        self._controllers = {}
+        self._index = None
+        self._prefixes = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def __contains__(self, name):
+        return self._get_index().get(name) is not None
+
+    def add_routes(self, controller_name:str, routes:Iterable['django_url_framework.controller.ActionRoute']):
+        """Replace the routes of a controller, mounted under `controller_name/`."""
+        with self._lock:
+            self._controllers[controller_name] = tuple(routes)
+            self._index = None
+
+    def set_routes(self, routes_by_controller:Dict[str, Iterable['django_url_framework.controller.ActionRoute']]):
+        """Replace the routes of all controllers, those of controllers that are not given are removed."""
+        with self._lock:
+            self._controllers = {controller_name: tuple(routes) for controller_name, routes in routes_by_controller.items()}
+            self._index = None
+
+    def _get_index(self) -> dict:
+        index = self._index
+        if index is None:
+            with self._lock:
+                routes_by_name = {}
+                for controller_name, routes in list(self._controllers.items()):
+                    for route in routes:
+                        routes_by_name.setdefault(route.name, []).append((controller_name, route))
+                index = {}
+                for name, routes in routes_by_name.items():
+                    index[name] = self._compile_name(name, routes)
+                self._index = index
+        return index
+
+    @staticmethod
+    def _compile_name(name, routes) -> Optional[Tuple[dict, dict]]:
+        """Index the routes of a name by number and names of their parameters, None if they can not be compiled."""
+        by_count = {}
+        by_params = {}
+        for controller_name, route in routes:
+            if route.is_regex or route.urlconf_prefix:
+                return None
+            try:
+                reverse_route = ReverseRoute.compile(name, "%s/%s" % (controller_name, route.route))
+            except ValueError:
+                return None
+            count = len(reverse_route.params)
+            params = frozenset(reverse_route.params)
+            # None marks arguments more than one route accepts, which are left to `reverse()`
+            by_count[count] = None if count in by_count else reverse_route
+            by_params[params] = None if params in by_params else reverse_route
+        return by_count, by_params
+
+    def _get_route(self, name:str, args:Optional[tuple], kwargs:Optional[dict]) -> Optional[ReverseRoute]:
+        routes = self._get_index().get(name)
+        if routes is None or (args and kwargs):
+            return None
+        by_count, by_params = routes
+        if args:
+            return by_count.get(len(args))
+        return by_params.get(frozenset(kwargs) if kwargs else frozenset())
+
+    def _get_prefixes(self) -> dict:
+        resolver = get_resolver(get_urlconf())
+        prefixes = self._prefixes.get(resolver)
+        if prefixes is None:
+            prefixes = self._prefixes.setdefault(resolver, {})
+        return prefixes
+
+    def reverse(self, name:str, args:Optional[Iterable] = None, kwargs:Optional[dict] = None) -> str:
+        """Like `django.urls.reverse(name, args=args, kwargs=kwargs)`, raises `NoReverseMatch` the same way."""
+        args = tuple(args) if args else None
+        route = self._get_route(name, args, kwargs)
+        if route is None:
+            return reverse(name, args=args, kwargs=kwargs)
+        return self._reverse_route(route, args, kwargs, self._get_prefixes(), get_script_prefix())
+
+    def _reverse_route(self, route:ReverseRoute, args, kwargs, prefixes:dict, script_prefix:str) -> str:
+        relative_url = route.build(args, kwargs)
+        if relative_url is None:
+            return reverse(route.name, args=args, kwargs=kwargs)
+        key = (script_prefix, route)
+        prefix = prefixes.get(key)
+        if prefix is None:
+            url = reverse(route.name, args=args, kwargs=kwargs)
+            prefix = url[:-len(relative_url)] if url.endswith(relative_url) else self._FOREIGN
+            prefixes[key] = prefix
+            return url
+        if prefix is self._FOREIGN:
+            return reverse(route.name, args=args, kwargs=kwargs)
+        return prefix + relative_url
+
+    def reverse_many(self, name:str, args_list:Iterable) -> list:
+        """
+        Reverse a name for each item of `args_list`, a tuple or list of positional arguments,
+        a dict of keyword arguments, or a single positional argument.
+        """
+        prefixes = self._get_prefixes()
+        script_prefix = get_script_prefix()
+        urls = []
+        for arguments in args_list:
+            if isinstance(arguments, dict):
+                args, kwargs = None, arguments
+            elif isinstance(arguments, (tuple, list)):
+                args, kwargs = tuple(arguments) or None, None
+            else:
+                args, kwargs = (arguments,), None
+            route = self._get_route(name, args, kwargs)
+            if route is None:
+                urls.append(reverse(name, args=args, kwargs=kwargs))
+            else:
+                urls.append(self._reverse_route(route, args, kwargs, prefixes, script_prefix))
+        return urls
@@ -0,0 +1,133 @@
+"""
+The router mode of `Site`, enabled with `Site(router=True)` or `settings.URL_FRAMEWORK_ROUTER`.
+
+Instead of an `include()` per controller, which Django's resolver tries one after another, the site mounts
+a single `SiteRouter` pattern. It finds the controller, and the routes of its actions, by dict lookups on the
+segments of the path, so resolving a URL does not get slower with the number of controllers and actions.
+Routes that can not be looked up by their leading segments, custom `@urlconf` regexes and routes under an
+`urlconf_prefix`, are tried in order as usual. The regular URL patterns are still mounted, but only for
+`reverse()`, by a `ReverseOnlyResolver`.
+"""
+import threading
+from typing import Iterator, List, Optional, Tuple
+
+from django.http import Http404
+from django.urls import Resolver404, URLPattern, URLResolver
+from django.urls.resolvers import ResolverMatch, RoutePattern
+
+def _route_key(route:str) -> str:
+    """The leading literal segments of a `django.urls.path` route, such as `show` for `show/<int:id>/`."""
+    literal = route.split('<', 1)[0]
+    return literal[:literal.rfind('/') + 1].rstrip('/')
+
+def _join_route(first:str, second:str) -> str:
+    """Join two routes of a `ResolverMatch`, as Django's resolver does."""
+    if first and second.startswith('^'):
+        second = second[1:]
+    return first + second
+
+def _path_keys(path:str) -> Iterator[str]:
+    """The keys a path may be routed by, each run of leading segments followed by a slash, the empty one first."""
+    yield ''
+    position = path.find('/')
+    while position != -1:
+        yield path[:position]
+        position = path.find('/', position + 1)
+
+class ControllerRoutes(object):
+    """
+    The URL patterns of one controller, indexed by the leading literal segments of their routes.
+    Each pattern keeps its position, so the first matching pattern wins, as it would in Django's resolver.
+    """
+    __slots__ = ('by_key', 'fallback')
+
+    def __init__(self, urlpatterns:list):
+        self.by_key = {}
+        self.fallback = []
+        for position, pattern in enumerate(urlpatterns):
+            if isinstance(pattern, URLPattern) and isinstance(pattern.pattern, RoutePattern):
+                self.by_key.setdefault(_route_key(str(pattern.pattern)), []).append((position, pattern))
+            else:
+                self.fallback.append((position, pattern))
+
+    def resolve(self, path:str) -> Optional[ResolverMatch]:
+        candidates = []
+        for key in _path_keys(path):
+            patterns = self.by_key.get(key)
+            if patterns is not None:
+                candidates += patterns
+        if self.fallback:
+            candidates += self.fallback
+        if len(candidates) > 1:
+            candidates.sort(key=lambda candidate: candidate[0])
+        for position, pattern in candidates:
+            try:
+                match = pattern.resolve(path)
+            except Resolver404:
+                continue
+            if match:
+                if isinstance(pattern, URLResolver):
+                    match.route = _join_route(str(pattern.pattern), match.route)
+                return match
+        return None
+
+def _router_view(request, *args, **kwargs):
+    raise Http404("The site router resolves its URLs itself.")
+
+class SiteRouter(URLPattern):
+    """
+    A single catch-all URL pattern for the controllers of a site.
+
+    :param controllers: the controller names, in the order they are mounted, and their URL patterns,
+                        or an object with an `urlpatterns` attribute, such as a lazy `ControllerDescriptor`
+    """
+    def __init__(self, controllers:List[Tuple[str, object]]):
+        super().__init__(RoutePattern('', is_endpoint=False), _router_view)
+        self.controllers = {}
+        self.positions = {}
+        for position, (controller_name, urlpatterns) in enumerate(controllers):
+            self.controllers.setdefault(controller_name, urlpatterns)
+            self.positions.setdefault(controller_name, position)
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "<%s %d controllers>" % (self.__class__.__name__, len(self.controllers))
+
+    def get_controller_routes(self, controller_name:str) -> ControllerRoutes:
+        routes = self._routes.get(controller_name)
+        if routes is None:
+            with self._lock:
+                routes = self._routes.get(controller_name)
+                if routes is None:
+                    urlpatterns = self.controllers[controller_name]
+                    routes = self._routes[controller_name] = ControllerRoutes(getattr(urlpatterns, 'urlpatterns', urlpatterns))
+        return routes
+
+    def _get_candidates(self, path:str) -> List[str]:
+        candidates = [key for key in _path_keys(path) if key and key in self.controllers]
+        if len(candidates) > 1:
+            candidates.sort(key=self.positions.__getitem__)
+        return candidates
+
+    def resolve(self, path):
+        path = str(path)
+        for controller_name in self._get_candidates(path):
+            match = self.get_controller_routes(controller_name).resolve(path[len(controller_name) + 1:])
+            if match:
+                return ResolverMatch(match.func, match.args, match.kwargs, match.url_name, match.app_names,
+                                     match.namespaces, route=_join_route(controller_name + '/', match.route),
+                                     captured_kwargs=match.captured_kwargs, extra_kwargs=match.extra_kwargs)
+        return None
+
+class ReverseOnlyResolver(URLResolver):
+    """Mounts URL patterns so `reverse()` finds them, but never resolves a URL to them."""
+    def __init__(self, urlpatterns:list):
+        super().__init__(RoutePattern(''), urlpatterns)
+
+    def resolve(self, path):
+        raise Resolver404({'path': str(path), 'tried': []})
+
+def build_router_urlpatterns(controllers:List[Tuple[str, object]], reverse_urlpatterns:list) -> list:
+    """The URL patterns of a site in router mode, see `Site._get_urls`."""
+    return [SiteRouter(controllers), ReverseOnlyResolver(reverse_urlpatterns)]
@@ -6,29 +6,71 @@ import os
 import importlib
 
 from django.apps import apps
+from django.conf import settings
 
 from .helper import ApplicationHelper
 from .controller import ActionController
 from .controller import get_controller_name
+from .controller import get_controller_routes
 from .controller import get_controller_urlconf
+from .discovery import ControllerDescriptor
+from .metrics import metrics_view
+from .batch import batch_view
+from .discovery import DiscoveryManifest
+from .discovery import describe_controller
+from .discovery import get_routes
+from .negotiation import RendererRegistry
+from .negotiation import default_renderers
+from .reverse_table import ReverseTable
+from .router import build_router_urlpatterns
 
 from django.urls import include, path
 
 class Site(object):
-    def __init__(self):
+    def __init__(self, json_backend=None, renderers=(), metrics_url=None, router=None, batch_url=None):
+        """
+        :param json_backend: the JSON backend of all controllers of the site that do not set their own `json_backend`
+        :param renderers: a dict of media types and `Renderer` classes, added to the default ones `@auto` chooses from,
+                          more can be added with `site.renderers.register`
+        :param metrics_url: the path, such as `"_metrics/"`, the Prometheus metrics of the actions are exported at.
+                            Defaults to `settings.URL_FRAMEWORK_METRICS_URL`, not exported if None.
+        :param router: mount the controllers under a single URL pattern that finds the action by dict lookups,
+                       instead of one pattern per action, see `django_url_framework.router`.
+                       Defaults to `settings.URL_FRAMEWORK_ROUTER`, or False.
+        :param batch_url: the path, such as `"_batch/"`, of the endpoint that dispatches many actions in one request,
+                          see `django_url_framework.batch`. Defaults to `settings.URL_FRAMEWORK_BATCH_URL`, not mounted if None.
+        """
+        self.json_backend = json_backend
+        self.metrics_url = metrics_url
+        self.router = router
+        self.batch_url = batch_url
+        self.renderers = RendererRegistry(renderers, parent=default_renderers)
+        self.reverse_table = ReverseTable()
         self.controllers = {}
+        self.controller_descriptors = {}
         self.helpers = {}
         self.logger = logging.getLogger("django_url_framework")
         self._use_inflection_lib = False
+        self._urls_cache = None
 
-    def autodiscover(self, include_apps = [], exclude_apps = [], new_inflection_library=False):
+    def autodiscover(self, include_apps = [], exclude_apps = [], new_inflection_library=False, manifest=None):
         """Autodiscover all urls within all applications that regex match any entry in 'include_apps'
         and exclude any in 'exclude_apps'.
         :param exclude_apps: A list of django apps not to include in auto generation
         :param include_apps: A list of apps to include in auto generation - use this will no longer auto detect apps
         :param new_inflection_library: Use `inflection` library to generate URLs from Controller class names (recommended!). Will be the default in 2020.
+        :param manifest: Path to a discovery manifest file, or a `DiscoveryManifest`. Defaults to `settings.URL_FRAMEWORK_MANIFEST`.
+                         Controllers that did not change since the manifest was written are mounted from it,
+                         without being scanned, imported or introspected, new and changed controllers are
+                         added to the manifest. Controllers are not imported until the first request is routed
+                         to them, as the URL patterns are generated from the manifest, reversing a URL imports none.
         """
         self._use_inflection_lib = new_inflection_library
+
+        if manifest is None:
+            manifest = getattr(settings, 'URL_FRAMEWORK_MANIFEST', None)
+        if isinstance(manifest, str):
+            manifest = DiscoveryManifest.load(manifest, use_inflection_lib=new_inflection_library)
         
         if type(include_apps) not in (list, tuple):
             include_apps = (include_apps,)
@@ -58,8 +100,13 @@ class Site(object):
             if must_skip:
                 continue
             try:
-                available_controllers = []
                 app_path = app_config.path
+                if manifest is not None:
+                    self._load_controllers_from_manifest(manifest=manifest,
+                                                         app_path=app_path,
+                                                         app_module_path=app_name)
+                    continue
+                available_controllers = []
                 for f in self._yield_controller_files(app_path):
                     available_controllers.append(f)
                 self._load_controllers(app_path=app_path,
@@ -69,6 +116,12 @@ class Site(object):
             except AttributeError as e:
                 self.logger.exception(e)
 
+        if manifest is not None and manifest.changed:
+            try:
+                manifest.save()
+            except OSError:
+                self.logger.warning("Failed to write the discovery manifest to %s" % manifest.path, exc_info=True)
+
     @staticmethod
     def _yield_controller_files(app_path):
         if sys.version_info>=(3,0):
@@ -136,12 +189,12 @@ class Site(object):
                 for controller_class in self._yield_controller_class(app_path=app_path,
                                                                      app_module_path=app_module_path,
                                                                      controller_file=controller_file):
-                    controller_name = get_controller_name(controller_class)
-                    self.controllers[controller_name] = controller_class
-
                     if controller_class.use_inflection_library is None:
                        controller_class.use_inflection_library = self._use_inflection_lib
 
+                    controller_name = get_controller_name(controller_class)
+                    self.controllers[controller_name] = controller_class
+
                     if self.logger.isEnabledFor(logging.DEBUG):
                         self.logger.debug("[LOADED] %s as %s" % (controller_class.__name__, controller_name))
 
@@ -155,16 +208,86 @@ class Site(object):
                 if found_controller:
                     found_controller[0].close()
             
-    def _get_urls(self):
+    def _load_controllers_from_manifest(self, manifest, app_path, app_module_path):
+        def build(controller_file):
+            for controller_class in self._yield_controller_class(app_path=app_path,
+                                                                 app_module_path=app_module_path,
+                                                                 controller_file=controller_file):
+                if controller_class.use_inflection_library is None:
+                    controller_class.use_inflection_library = self._use_inflection_lib
+                yield describe_controller(controller_class)
+
+        controller_files = manifest.get_controller_files(app_module_path, app_path,
+                                                         scan=lambda: self._yield_controller_files(app_path))
+        for controller_file in controller_files:
+            module_path = '%s.%s' % (app_module_path, controller_file)
+            try:
+                controllers = manifest.get_controllers(module_path,
+                                                       os.path.join(app_path, controller_file + '.py'),
+                                                       build=lambda: build(controller_file))
+            except (OSError, ImportError):
+                self.logger.warning("Failed to load controller %s" % module_path, exc_info=True)
+                continue
+            for controller in controllers:
+                self.controller_descriptors[controller['controller_name']] = ControllerDescriptor(site=self,
+                                                                                                  module_path=module_path,
+                                                                                                  class_name=controller['class_name'],
+                                                                                                  controller_name=controller['controller_name'],
+                                                                                                  routes=get_routes(controller),
+                                                                                                  async_actions=controller.get('async_actions', ()))
+
+    def get_controller(self, controller_name):
+        """Return the controller class for `controller_name`, importing it if it was discovered lazily."""
+        controller_class = self.controllers.get(controller_name)
+        if controller_class is None and controller_name in self.controller_descriptors:
+            controller_class = self.controller_descriptors[controller_name].controller_class
+        return controller_class
+
+    def _build_urls(self, router, metrics_url, batch_url):
         urlpatterns = []
+        controllers = []
+        routes_by_controller = {}
 
         for controller_name, controller_class in list(self.controllers.items()):
+            routes = get_controller_routes(controller_class)
+            routes_by_controller[controller_name] = routes
+            controller_urlpatterns = get_controller_urlconf(controller_class, site=self, routes=routes)
+            controllers.append((controller_name, controller_urlpatterns))
             urlpatterns.append(
                 path("%(controller)s/" % {'controller': controller_name},
-                     include(
-                         get_controller_urlconf(controller_class, site=self)
-                     )
+                     include(controller_urlpatterns)
                  )
             )
+        for controller_name, descriptor in list(self.controller_descriptors.items()):
+            routes_by_controller[controller_name] = descriptor.routes
+            controllers.append((controller_name, descriptor))
+            # a (urlconf_module, app_name, namespace) tuple, the resolver reads `descriptor.urlpatterns` on first use
+            urlpatterns.append(
+                path("%(controller)s/" % {'controller': controller_name}, (descriptor, None, None))
+            )
+        # controllers that were removed since the last build are dropped
+        self.reverse_table.set_routes(routes_by_controller)
+        if router:
+            urlpatterns = build_router_urlpatterns(controllers, urlpatterns)
+        if metrics_url:
+            urlpatterns.append(path(metrics_url, metrics_view, name='django_url_framework_metrics'))
+        if batch_url:
+            urlpatterns.append(path(batch_url, batch_view, {'site': self}, name='django_url_framework_batch'))
         return urlpatterns, 'django-url-framework', None
+
+    def _get_urls(self):
+        """
+        The URL patterns of the site, built once, and again only if controllers were added or removed,
+        or the settings they depend on changed.
+        """
+        router = self.router
+        if router is None:
+            router = getattr(settings, 'URL_FRAMEWORK_ROUTER', False)
+        metrics_url = self.metrics_url or getattr(settings, 'URL_FRAMEWORK_METRICS_URL', None)
+        batch_url = self.batch_url or getattr(settings, 'URL_FRAMEWORK_BATCH_URL', None)
+        key = (tuple(self.controllers.items()), tuple(self.controller_descriptors.items()), bool(router),
+               metrics_url, batch_url)
+        if self._urls_cache is None or self._urls_cache[0] != key:
+            self._urls_cache = (key, self._build_urls(router, metrics_url, batch_url))
+        return self._urls_cache[1]
     urls = property(_get_urls)
@@ -1,17 +1,42 @@
 from django import template
+from django.urls import get_resolver, get_script_prefix, get_urlconf
+
+from ..helper import ApplicationHelper
+
 register = template.Library()
 
 
 class UrlNode(template.Node):
+    """
+    The arguments of the tag are parsed when the template is compiled.
+    If all of them are literals, the URL is only built once per controller class, urlconf and script prefix.
+    """
     def __init__(self, named_url = None, action = None, extras = []):
         self.named_url = named_url
         self.action = action
-        self.extras = extras
+        self.extras = [template.Variable(extra) for extra in extras]
+        self.url_kwargs = parse_named_url(named_url) if named_url is not None else None
+        self.is_constant = all(extra.literal is not None for extra in self.extras)
+        self._url_cache = {}
+
+    def _reverse(self, helper, extras):
+        if self.url_kwargs is not None:
+            return helper.url_for(url_args=extras, **self.url_kwargs)
+        return helper.url_for(controller=None, action=self.action, url_args=extras)
+
     def render(self, context):
-        resolved_extras = []
-        for extra in self.extras:
-            resolved_extras.append(template.Variable(extra).resolve(context))
-        return reverse_url(context['controller_helper'], named_url = self.named_url, action = self.action, extras = resolved_extras)
+        helper = context['controller_helper']
+        if not self.is_constant or type(helper).url_for is not ApplicationHelper.url_for:
+            return self._reverse(helper, [extra.resolve(context) for extra in self.extras])
+
+        urlconf = get_urlconf()
+        key = (helper.controller.__class__, helper.controller._site, urlconf, get_script_prefix())
+        resolver = get_resolver(urlconf)
+        cached = self._url_cache.get(key)
+        # the resolver is replaced whenever the urlconf changes
+        if cached is None or cached[0] is not resolver:
+            cached = self._url_cache[key] = (resolver, self._reverse(helper, [extra.literal for extra in self.extras]))
+        return cached[1]
 
 @register.tag
 def go_action(parser, token):
@@ -31,42 +56,45 @@ def url_for(parser, token):
         raise template.TemplateSyntaxError("%r tag requires at least one argument" % token.contents.split()[0])
     return UrlNode(named_url='/'.join(tag_data[1:]))
 
+def parse_named_url(named_url):
+    """Split a named URL, as described in `reverse_url`, into the keyword arguments of `url_for`."""
+    kwargs = {}
+    url_parts = str(named_url).strip('/ ').split('/')
+    url_part_order = ['controller', 'action', 'id']
+    for url_part in url_parts:
+        if ':' in url_part:
+            name, value = url_part.split(':')
+        elif len(url_part_order) > 0:
+            name, value = (url_part_order.pop(0), url_part)
+        kwargs[name] = value
+    return kwargs
+
 def reverse_url(helper, named_url = None, action = None, extras = None):
     """Can be given parameters such as controller or action.
     Also accepts other unknown parameters such as 'id'.
-    
+
     If given 'named_url', the URL is split using the '/' character and then processed into
     'controller', 'action' and 'id', in that order.
-    
+
     If a part of the URL contains a ':', the value is split and the first part becomes the parameter key,
     while the second parameter value.
-    
+
     Examples:
-    
+
       /order/list/
                     => controller: order, action: list
-      /order/show/4 
+      /order/show/4
                     => controller: order, action: show, id: 4
-      /products/    
+      /products/
                     => controller: products, action: index
-      action:list 
+      action:list
                     => controller: The view controller, action: list
-      action:list controller:produts 
+      action:list controller:produts
                     => controller: products, action: list
       action:_delete item:bar
                     => controller: The view controller, action: _delete, item: bar
     """
     if named_url is not None:
-        kwargs = {}
-        url_parts = str(named_url).strip('/ ').split('/')
-        url_part_order = ['controller', 'action', 'id']
-        for url_part in url_parts:
-            if ':' in url_part:
-                name, value = url_part.split(':')
-            elif len(url_part_order) > 0:
-                name, value = (url_part_order.pop(0), url_part)
-            kwargs[name] = value
-        return helper.url_for(url_args=extras, **kwargs)
+        return helper.url_for(url_args=extras, **parse_named_url(named_url))
     else:
         return helper.url_for(controller=None, action=action, named_url=named_url, url_args=extras)
-
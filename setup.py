@@ -17,7 +17,8 @@ setup(
     author='Dimo Fedortchenko',
     author_email='d@angelhill.net',
     url='https://github.com/zeraien/django-url-framework/',
-    packages=[p for p in find_packages() if p!="tests"],
+    packages=[p for p in find_packages() if p not in ("tests", "benchmarks")],
+    install_requires=['Django>=4.2', 'asgiref>=3.7', 'PyYAML>=5', 'inflection>=0.5'],
     classifiers = ['Development Status :: 4 - Beta',
                    'Environment :: Web Environment',
                    'Framework :: Django',
@@ -3,6 +3,7 @@ from os.path import dirname, join
 
 from django.conf import settings
 settings.configure(
+    SECRET_KEY = 'django-url-framework-tests',
     TEMPLATES = [
         {
             'BACKEND': 'django.template.backends.dummy.TemplateStrings',
@@ -0,0 +1,65 @@
+import asyncio
+import json
+import threading
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.test import RequestFactory
+
+from django_url_framework import ActionController
+from django_url_framework.controller import get_controller_urlconf, get_dispatch_plan
+from django_url_framework.decorators import json_action
+from .duf_test_case import DUFTestCase
+
+
+class TestAsyncActions(DUFTestCase):
+    def test_async_action(self):
+        class AsyncJSONController(ActionController):
+            @json_action()
+            async def test_action(self, request):
+                results = await asyncio.gather(asyncio.sleep(0, "a"), asyncio.sleep(0, "b"))
+                return {"results": results}
+        plan = get_dispatch_plan(AsyncJSONController, "test_action")
+        self.assertTrue(plan.async_action)
+        self.assertTrue(plan.is_async)
+        self._request_and_test(AsyncJSONController, "test_action", expected_response=json.dumps({"results": ["a", "b"]}))
+
+    def test_async_filters(self):
+        class AsyncFilterController(ActionController):
+            async def _before_filter(self, request):
+                return {"before": True}
+            async def _after_filter(self, request):
+                return {"after": self._template_context["action"]}
+            @json_action()
+            def test_action(self, request):
+                return {"action": threading.current_thread().name.startswith("django_url_framework")}
+        plan = get_dispatch_plan(AsyncFilterController, "test_action")
+        self.assertFalse(plan.async_action)
+        self.assertTrue(plan.is_async)
+        response = self._request_and_test(AsyncFilterController, "test_action")
+        self.assertEqual(json.loads(response.content), {"before": True, "action": True, "after": True})
+
+    def test_async_before_filter_response(self):
+        class AsyncRedirectController(ActionController):
+            async def _before_filter(self, request):
+                return self._go(to_url="/baz/")
+            async def test_action(self, request):
+                return {}
+        response = self._request_and_test(AsyncRedirectController, "test_action", status_code=302)
+        self.assertEqual(response['Location'], "/baz/")
+
+    def test_sync_controller_is_not_async(self):
+        class SyncController(ActionController):
+            def test_action(self, request):
+                return {}
+        self.assertFalse(get_dispatch_plan(SyncController, "test_action").is_async)
+
+    def test_async_view(self):
+        class AsyncViewController(ActionController):
+            @json_action()
+            async def test_action(self, request, id:int):
+                return {"id": id}
+        match = get_controller_urlconf(AsyncViewController)[0].resolve("test_action/4/")
+        self.assertTrue(iscoroutinefunction(match.func))
+        request = RequestFactory().get("/async_view/test_action/4/")
+        response = async_to_sync(match.func)(request, *match.args, **match.kwargs)
+        self.assertEqual(json.loads(response.content), {"id": 4})
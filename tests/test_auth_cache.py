@@ -0,0 +1,158 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import RequestFactory, override_settings
+
+from django_url_framework import ActionController
+from django_url_framework.auth_cache import (get_group_names, invalidate_auth_cache, passes_test,
+                                            _on_group_permissions_changed, _on_user_groups_changed)
+from django_url_framework.controller import dispatch_plan, get_dispatch_plan
+from django_url_framework.decorators import must_be_member_of_group, permission_required
+from .duf_test_case import DUFTestCase
+
+
+class FakeGroups(object):
+    def __init__(self, names):
+        self.names = names
+        self.queries = 0
+
+    def values_list(self, field, flat=False):
+        self.queries += 1
+        return list(self.names)
+
+
+class FakeUser(object):
+    is_authenticated = True
+    is_active = True
+    is_superuser = False
+
+    def __init__(self, pk=1, groups=(), permissions=()):
+        self.pk = pk
+        self.groups = FakeGroups(groups)
+        self.permissions = set(permissions)
+        self.permission_queries = 0
+
+    def get_all_permissions(self):
+        self.permission_queries += 1
+        return set(self.permissions)
+
+    def has_perms(self, perms):
+        return self.permissions.issuperset(perms)
+
+
+class GroupController(ActionController):
+    @must_be_member_of_group("editors")
+    @must_be_member_of_group(["admins", "editors"])
+    def test_action(self, request):
+        return self._print("ok")
+
+    @permission_required(["app.view", "app.change"])
+    def permission_action(self, request):
+        return self._print("ok")
+
+
+class TestAuthCache(DUFTestCase):
+    def setUp(self):
+        caches["default"].clear()
+
+    def _dispatch(self, user, action_name="test_action"):
+        request = RequestFactory().get("/")
+        request.user = user
+        return dispatch_plan(None, request, get_dispatch_plan(GroupController, action_name))
+
+    def test_groups_queried_once_per_request(self):
+        user = FakeUser(groups=["editors"])
+        self.assertEqual(self._dispatch(user).status_code, 200)
+        self.assertEqual(user.groups.queries, 1)
+        self.assertEqual(self._dispatch(FakeUser(groups=["admins"])).status_code, 302)
+
+    def test_groups_cached_between_requests(self):
+        with override_settings(URL_FRAMEWORK_AUTH_CACHE_TIMEOUT=60):
+            self.assertEqual(get_group_names(FakeUser(groups=["editors"])), {"editors"})
+            user = FakeUser(groups=["admins"])
+            self.assertEqual(get_group_names(user), {"editors"})
+            self.assertEqual(user.groups.queries, 0)
+
+            invalidate_auth_cache(user)
+            self.assertEqual(get_group_names(user), {"admins"})
+            self.assertEqual(user.groups.queries, 1)
+
+            _on_user_groups_changed(sender=None, instance=None, action="post_add", reverse=True, pk_set={1})
+            self.assertEqual(get_group_names(FakeUser(groups=["readers"])), {"readers"})
+
+    def test_permissions(self):
+        user = FakeUser(permissions=["app.view"])
+        self.assertEqual(self._dispatch(user, "permission_action").status_code, 302)
+        self.assertEqual(self._dispatch(FakeUser(permissions=["app.view", "app.change"]), "permission_action").status_code, 200)
+        with override_settings(URL_FRAMEWORK_AUTH_CACHE_TIMEOUT=60):
+            user = FakeUser(permissions=["app.view", "app.change"])
+            self.assertEqual(self._dispatch(user, "permission_action").status_code, 200)
+            self.assertEqual(user.permission_queries, 1)
+            user = FakeUser(permissions=[])
+            self.assertEqual(self._dispatch(user, "permission_action").status_code, 200)
+            self.assertEqual(user.permission_queries, 0)
+
+    def test_group_cleared(self):
+        filters = []
+
+        class FakeUserManager(object):
+            def filter(self, **kwargs):
+                filters.append(kwargs)
+                return SimpleNamespace(values_list=lambda field, flat=False: [1])
+
+        through, group = object(), SimpleNamespace()
+        user_model = SimpleNamespace(_default_manager=FakeUserManager())
+        with override_settings(URL_FRAMEWORK_AUTH_CACHE_TIMEOUT=60), \
+                mock.patch.dict("django_url_framework.auth_cache._watched_fields", {through: "groups"}):
+            self.assertEqual(get_group_names(FakeUser(groups=["editors"])), {"editors"})
+            _on_user_groups_changed(sender=through, instance=group, action="pre_clear", reverse=True,
+                                    pk_set=None, model=user_model)
+            _on_user_groups_changed(sender=through, instance=group, action="post_clear", reverse=True,
+                                    pk_set=None, model=user_model)
+            self.assertEqual(filters, [{"groups": group}])
+            self.assertEqual(get_group_names(FakeUser(groups=[])), frozenset())
+            self.assertEqual(group.__dict__, {})
+
+    def test_test_results_are_kept_per_request(self):
+        calls = []
+        test_func = lambda user: calls.append(user) or True
+        user = FakeUser()
+        request = SimpleNamespace(user=user)
+        self.assertTrue(passes_test(request, test_func))
+        self.assertTrue(passes_test(request, test_func))
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(passes_test(SimpleNamespace(user=user), test_func))
+        self.assertEqual(len(calls), 2)
+        request.user = FakeUser(pk=2)
+        passes_test(request, test_func)
+        self.assertEqual(calls[-1], request.user)
+
+    def test_groups_are_kept_on_the_request(self):
+        user = FakeUser(groups=["editors"])
+        self.assertEqual(self._dispatch(user).status_code, 200)
+        user.groups.names = ["readers"]
+        self.assertEqual(self._dispatch(user).status_code, 302)
+        self.assertEqual(user.groups.queries, 2)
+        self.assertEqual(user.__dict__.keys(), {"pk", "groups", "permissions", "permission_queries"})
+
+    def test_group_permissions_changed(self):
+        with override_settings(URL_FRAMEWORK_AUTH_CACHE_TIMEOUT=60), \
+                mock.patch("django_url_framework.auth_cache._get_group_user_pks", return_value={1}) as get_user_pks:
+            for action, reverse, pk_set, filters in (("post_add", False, {5}, {"groups": "group"}),
+                                                     ("post_remove", True, {3}, {"groups__pk__in": {3}})):
+                with self.subTest(action=action, reverse=reverse):
+                    invalidate_auth_cache(user_pk=1)
+                    self.assertEqual(get_group_names(FakeUser(groups=["editors"])), {"editors"})
+                    _on_group_permissions_changed(sender=None, instance="group", action=action, reverse=reverse,
+                                                  pk_set=pk_set)
+                    get_user_pks.assert_called_with(**filters)
+                    self.assertEqual(get_group_names(FakeUser(groups=[])), frozenset())
+
+            permission = SimpleNamespace()
+            invalidate_auth_cache(user_pk=1)
+            self.assertEqual(get_group_names(FakeUser(groups=["editors"])), {"editors"})
+            _on_group_permissions_changed(sender=None, instance=permission, action="pre_clear", reverse=True, pk_set=None)
+            get_user_pks.assert_called_with(groups__permissions=permission)
+            _on_group_permissions_changed(sender=None, instance=permission, action="post_clear", reverse=True, pk_set=None)
+            self.assertEqual(get_group_names(FakeUser(groups=[])), frozenset())
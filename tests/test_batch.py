@@ -0,0 +1,151 @@
+import json
+import threading
+from types import SimpleNamespace
+
+from django.contrib.sessions.backends.signed_cookies import SessionStore
+from django.test import RequestFactory, override_settings
+
+from django_url_framework import ActionController
+from django_url_framework.batch import batch_view, copy_session, parse_batch, BatchError
+from django_url_framework.decorators import POST, json_action, user_passes_test
+from django_url_framework.site import Site
+from .duf_test_case import DUFTestCase
+
+
+class BatchedController(ActionController):
+    threads = []
+
+    @json_action()
+    def show(self, request, id:int):
+        return {"id": int(id), "page": request.GET.get("page"), "user": request.user.username}
+
+    @json_action()
+    def record(self, request):
+        BatchedController.threads.append(threading.current_thread().name)
+        return {"session": request.session.get("key")}
+
+    @POST
+    @json_action()
+    def add(self, request):
+        self._set_cookie("added", request.POST["item"])
+        return {"item": request.POST["item"]}
+
+    @user_passes_test(lambda user: user.is_staff)
+    def secret(self, request):
+        return self._print("secret")
+
+    def text(self, request):
+        return self._print("plain")
+
+    def broken_json(self, request):
+        return self._print('{"id": 1}, "injected": true', mimetype="application/json")
+
+    def failing(self, request):
+        raise ValueError("failed")
+
+    @json_action()
+    def write(self, request):
+        request.session["written"] = request.GET["value"]
+        return {"written": request.session["written"]}
+
+
+site = Site(batch_url="_batch/")
+site.controllers["batched"] = BatchedController
+
+
+class TestBatch(DUFTestCase):
+    def _batch(self, specs, user=None):
+        request = RequestFactory().post("/_batch/", data=json.dumps(specs), content_type="application/json")
+        request.user = user or SimpleNamespace(username="someone", is_staff=False)
+        request.session = {"key": "value"}
+        response = batch_view(request, site=site)
+        return response, json.loads(response.content)
+
+    def test_batch(self):
+        response, data = self._batch([
+            {"id": "first", "controller": "batched", "action": "show", "args": [1], "params": {"page": 2}},
+            {"controller": "batched", "action": "add", "method": "POST", "data": {"item": "5"}},
+            {"controller": "batched", "action": "text"},
+            {"controller": "batched", "action": "missing"},
+            {"controller": "missing"},
+        ])
+        first, add, text, missing_action, missing_controller = data["responses"]
+        self.assertEqual(first["id"], "first")
+        self.assertEqual(first["status"], 200)
+        self.assertEqual(first["body"], {"id": 1, "page": "2", "user": "someone"})
+        self.assertEqual(add["id"], 1)
+        self.assertEqual(add["body"], {"item": "5"})
+        self.assertEqual(response.cookies["added"].value, "5")
+        self.assertEqual(text["body"], "plain")
+        self.assertEqual(text["headers"]["Content-Type"], "text/plain; charset=utf8")
+        self.assertEqual(missing_action["status"], 404)
+        self.assertEqual(missing_controller["status"], 404)
+
+    def test_invalid_json_body_is_a_string(self):
+        response, data = self._batch([{"controller": "batched", "action": "broken_json"}])
+        broken, = data["responses"]
+        self.assertEqual(broken["body"], '{"id": 1}, "injected": true')
+        self.assertEqual(set(broken.keys()), {"id", "status", "headers", "body"})
+
+    def test_permissions_and_methods(self):
+        specs = [{"controller": "batched", "action": "secret"},
+                 {"controller": "batched", "action": "add", "params": {"item": "5"}}]
+        secret, add = self._batch(specs)[1]["responses"]
+        self.assertEqual(secret["status"], 302)
+        self.assertEqual(add["status"], 405)
+        secret, add = self._batch(specs, user=SimpleNamespace(username="admin", is_staff=True))[1]["responses"]
+        self.assertEqual(secret["body"], "secret")
+
+    def test_errors(self):
+        with self.assertLogs("django_url_framework", level="ERROR"):
+            failing, = self._batch([{"controller": "batched", "action": "failing"}])[1]["responses"]
+        self.assertEqual(failing["status"], 500)
+        for body in (b"", b"{}", b'[{"action": "show"}]', b'[{"controller": "batched", "args": 1}]'):
+            with self.subTest(body=body), self.assertRaises(BatchError):
+                parse_batch(body)
+        for field, value in (("controller", 1), ("action", ["show"]), ("method", None), ("params", [1]),
+                             ("data", "item=5"), ("params", {"page": {"nested": 1}}), ("kwargs", []),
+                             ("independent", "yes"), ("id", True), ("id", {})):
+            with self.subTest(field=field, value=value):
+                request = RequestFactory().post("/_batch/", content_type="application/json",
+                                                data=json.dumps([{"controller": "batched", field: value}]))
+                response = batch_view(request, site=site)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(field, json.loads(response.content)["error"])
+        self.assertEqual(batch_view(RequestFactory().get("/_batch/"), site=site).status_code, 405)
+
+    def test_independent_requests_run_concurrently(self):
+        BatchedController.threads = []
+        spec = {"controller": "batched", "action": "record", "independent": True}
+        responses = self._batch([spec, spec, {"controller": "batched", "action": "record"}])[1]["responses"]
+        self.assertEqual([response["body"] for response in responses], [{"session": "value"}] * 3)
+        self.assertTrue(all(name.startswith("django_url_framework_batch") for name in BatchedController.threads[:2]))
+        self.assertEqual(BatchedController.threads[2], threading.current_thread().name)
+
+        BatchedController.threads = []
+        with override_settings(URL_FRAMEWORK_BATCH_THREAD_POOL_SIZE=0):
+            self._batch([spec, spec])
+        self.assertEqual(BatchedController.threads, [threading.current_thread().name] * 2)
+
+    def test_mounted(self):
+        self.assertEqual(site.urls[0][-1].name, "django_url_framework_batch")
+
+    def test_concurrent_requests_copy_the_session(self):
+        spec = {"controller": "batched", "action": "write", "independent": True}
+        request = RequestFactory().post("/_batch/", content_type="application/json", data=json.dumps([
+            dict(spec, params={"value": "first"}), dict(spec, params={"value": "second"}),
+            {"controller": "batched", "action": "write", "params": {"value": "third"}},
+        ]))
+        request.user = SimpleNamespace(username="someone")
+        request.session = {"key": "value"}
+        responses = json.loads(batch_view(request, site=site).content)["responses"]
+        self.assertEqual([response["body"]["written"] for response in responses], ["first", "second", "third"])
+        self.assertEqual(request.session, {"key": "value", "written": "third"})
+
+    def test_copy_session(self):
+        session = SessionStore()
+        session["key"] = "value"
+        session_copy = copy_session(session)
+        session_copy["written"] = True
+        self.assertEqual(session_copy["key"], "value")
+        self.assertNotIn("written", session)
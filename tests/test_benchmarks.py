@@ -0,0 +1,29 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from benchmarks import runner
+from benchmarks.suite import Benchmark
+
+
+class TestBenchmarkRunner(TestCase):
+    def test_run_save_and_compare(self):
+        benchmarks = [Benchmark("group.noop", lambda: (lambda: None), "group"),
+                      Benchmark("group.skipped", lambda: (lambda: None), "group")]
+        results = runner.run(benchmarks, repeat=1, pattern="noop")
+        self.assertEqual([result.name for result in results], ["group.noop"])
+        self.assertIn("group.noop", runner.format_results(results))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baseline.json")
+            runner.save(results, path)
+            baseline = runner.load(path)
+        self.assertEqual(baseline["group.noop"], results[0])
+
+        slower = [results[0]._replace(best=results[0].best * 2)]
+        report, regressions = runner.compare(baseline, slower, threshold=0.1)
+        self.assertEqual(regressions, ["group.noop"])
+        self.assertIn("SLOWER", report)
+        report, regressions = runner.compare({}, results)
+        self.assertEqual(regressions, [])
+        self.assertIn("new", report)
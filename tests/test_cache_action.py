@@ -0,0 +1,166 @@
+import json
+import time
+from unittest import mock
+
+from django.core.cache import caches
+from django.http import HttpResponseForbidden
+from django.test import RequestFactory
+
+from django_url_framework import ActionController
+from django_url_framework.action_cache import get_local_cache
+from django_url_framework.controller import get_dispatch_plan, dispatch_plan
+from django_url_framework.decorators import cache_action, json_action, auto
+from django_url_framework.renderers import JSONRenderer
+from .duf_test_case import DUFTestCase
+
+
+class TestCacheAction(DUFTestCase):
+    def setUp(self):
+        get_local_cache().clear()
+        caches['default'].clear()
+
+    def _get(self, controller_class, action_name, path="/", **headers):
+        request = RequestFactory().get(path, **headers)
+        return dispatch_plan(None, request, get_dispatch_plan(controller_class, action_name))
+
+    def test_cached_response(self):
+        calls = []
+        class CachedController(ActionController):
+            def _before_filter(self, request):
+                calls.append("before")
+            @cache_action(60, cache_alias=None)
+            @json_action()
+            def test_action(self, request):
+                calls.append("action")
+                return {"calls": len(calls)}
+        first = self._get(CachedController, "test_action")
+        second = self._get(CachedController, "test_action")
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(second["Content-Type"], "application/json; charset=utf8")
+        self.assertEqual(calls, ["before", "action", "before"])
+
+    def test_vary_on_query_parameters(self):
+        class CachedVaryController(ActionController):
+            @cache_action(60, vary_on="page", cache_alias=None)
+            @json_action()
+            def test_action(self, request):
+                return {"page": request.GET.get("page"), "other": request.GET.get("other")}
+        self.assertEqual(json.loads(self._get(CachedVaryController, "test_action", "/?page=1&other=a").content),
+                         {"page": "1", "other": "a"})
+        self.assertEqual(json.loads(self._get(CachedVaryController, "test_action", "/?page=2&other=b").content),
+                         {"page": "2", "other": "b"})
+        self.assertEqual(json.loads(self._get(CachedVaryController, "test_action", "/?page=1&other=c").content),
+                         {"page": "1", "other": "a"})
+
+    def test_auto_caches_each_renderer(self):
+        class CachedAutoController(ActionController):
+            @cache_action(60, cache_alias=None)
+            @auto()
+            def test_action(self, request):
+                return {"foo": "bar"}
+        self.assertEqual(self._get(CachedAutoController, "test_action", HTTP_ACCEPT="application/json").content,
+                         b'{"foo": "bar"}')
+        self.assertEqual(self._get(CachedAutoController, "test_action", HTTP_ACCEPT="text/plain").content,
+                         b"{'foo': 'bar'}")
+        self.assertEqual(self._get(CachedAutoController, "test_action", HTTP_ACCEPT="application/json").content,
+                         b'{"foo": "bar"}')
+
+    def test_auto_keys_on_the_selected_media_type(self):
+        class CachedMediaTypeController(ActionController):
+            renderers = {"application/vnd.api+json": JSONRenderer}
+
+            @cache_action(60, cache_alias=None)
+            @auto()
+            def test_action(self, request):
+                return {}
+        action_cache = get_dispatch_plan(CachedMediaTypeController, "test_action").action_cache
+
+        def get_key(accept):
+            request = RequestFactory().get("/", HTTP_ACCEPT=accept)
+            return action_cache.get_key(CachedMediaTypeController(None, request, None, {}), (), {})
+        self.assertEqual(get_key("application/json"), get_key("application/json;q=0.9, image/webp, */*;q=0.1"))
+        self.assertNotEqual(get_key("application/json"), get_key("application/vnd.api+json"))
+        self.assertEqual(get_key("image/webp"), get_key("image/png"))
+
+    def test_before_filter_still_runs(self):
+        class CachedDeniedController(ActionController):
+            def _before_filter(self, request):
+                if request.GET.get("deny"):
+                    return HttpResponseForbidden()
+            @cache_action(60, cache_alias=None)
+            def test_action(self, request):
+                return self._print("secret")
+        self.assertEqual(self._get(CachedDeniedController, "test_action").content, b"secret")
+        response = self._get(CachedDeniedController, "test_action", "/?deny=1")
+        self.assertEqual(response.status_code, 403)
+
+    def test_not_cached(self):
+        calls = []
+        class CachedErrorController(ActionController):
+            @cache_action(60, cache_alias=None)
+            def test_action(self, request):
+                calls.append("action")
+                return self._as_json({"error": True}, status_code=400)
+        self._get(CachedErrorController, "test_action")
+        self._get(CachedErrorController, "test_action")
+        request = RequestFactory().post("/")
+        dispatch_plan(None, request, get_dispatch_plan(CachedErrorController, "test_action"))
+        self.assertEqual(len(calls), 3)
+
+    def test_shared_cache(self):
+        calls = []
+        class CachedSharedController(ActionController):
+            @cache_action(60)
+            def test_action(self, request):
+                calls.append("action")
+                return self._print("shared")
+        self._get(CachedSharedController, "test_action")
+        get_local_cache().clear()
+        self.assertEqual(self._get(CachedSharedController, "test_action").content, b"shared")
+        self.assertEqual(calls, ["action"])
+
+    def test_stale_while_revalidate(self):
+        calls = []
+        class CachedStaleController(ActionController):
+            @cache_action(1, stale_timeout=60, cache_alias=None)
+            def test_action(self, request):
+                calls.append("action")
+                return self._print(str(len(calls)))
+        self._get(CachedStaleController, "test_action")
+        plan = get_dispatch_plan(CachedStaleController, "test_action")
+        with mock.patch("django_url_framework.action_cache.time.time", return_value=time.time() + 10):
+            controller = CachedStaleController(site=None, request=RequestFactory().get("/"), helper_class=None, url_params=None)
+            key = plan.action_cache.get_key(controller, (), {})
+            # another request is revalidating, this one is served the stale response
+            self.assertTrue(get_local_cache().claim(key, 30))
+            self.assertEqual(self._get(CachedStaleController, "test_action").content, b"1")
+            get_local_cache().release(key)
+            self.assertEqual(self._get(CachedStaleController, "test_action").content, b"2")
+        self.assertEqual(self._get(CachedStaleController, "test_action").content, b"2")
+
+    def test_claim_released_when_the_action_raises(self):
+        class CachedFailingController(ActionController):
+            fail = False
+            @cache_action(1, stale_timeout=60, cache_alias=None)
+            def test_action(self, request):
+                if CachedFailingController.fail:
+                    raise ValueError("failed")
+                return self._print("ok")
+        self._get(CachedFailingController, "test_action")
+        plan = get_dispatch_plan(CachedFailingController, "test_action")
+        CachedFailingController.fail = True
+        with mock.patch("django_url_framework.action_cache.time.time", return_value=time.time() + 10):
+            with self.assertRaises(ValueError):
+                self._get(CachedFailingController, "test_action")
+            controller = CachedFailingController(site=None, request=RequestFactory().get("/"), helper_class=None, url_params=None)
+            self.assertTrue(get_local_cache().claim(plan.action_cache.get_key(controller, (), {}), 30))
+
+    def test_auto_varies_on_accept(self):
+        class CachedVaryAcceptController(ActionController):
+            @cache_action(60, cache_alias=None)
+            @auto()
+            def test_action(self, request):
+                return {"foo": "bar"}
+        for _ in range(2):
+            response = self._get(CachedVaryAcceptController, "test_action", HTTP_ACCEPT="application/json")
+            self.assertEqual(response["Vary"], "Accept")
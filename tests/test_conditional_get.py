@@ -0,0 +1,86 @@
+import datetime
+
+from django.test import RequestFactory
+
+from django_url_framework import ActionController
+from django_url_framework.action_cache import get_local_cache
+from django_url_framework.controller import get_dispatch_plan, dispatch_plan
+from django_url_framework.decorators import conditional_get, cache_action, json_action
+from .duf_test_case import DUFTestCase
+
+
+class TestConditionalGet(DUFTestCase):
+    def _get(self, controller_class, action_name, *args, method="get", **headers):
+        request = getattr(RequestFactory(), method)("/", **headers)
+        return dispatch_plan(None, request, get_dispatch_plan(controller_class, action_name), *args)
+
+    def test_automatic_etag(self):
+        class AutoETagController(ActionController):
+            conditional_get = True
+            @json_action()
+            def test_action(self, request):
+                return {"foo": "bar"}
+        response = self._get(AutoETagController, "test_action")
+        etag = response["ETag"]
+        self.assertTrue(etag.startswith('"'))
+        not_modified = self._get(AutoETagController, "test_action", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified["ETag"], etag)
+        self.assertEqual(self._get(AutoETagController, "test_action", HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+    def test_only_get_and_head_are_conditional(self):
+        calls = []
+        class ConditionalPostController(ActionController):
+            conditional_get = True
+            def _get_etag(self, request):
+                return "v1"
+            def test_action(self, request):
+                calls.append(request.method)
+                return self._print("created")
+        response = self._get(ConditionalPostController, "test_action", method="post", HTTP_IF_NONE_MATCH='"v1"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"created")
+        response = self._get(ConditionalPostController, "test_action", method="delete", HTTP_IF_MATCH='"other"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(calls, ["POST", "DELETE"])
+        self.assertEqual(self._get(ConditionalPostController, "test_action", HTTP_IF_NONE_MATCH='"v1"').status_code, 304)
+
+    def test_etag_hook_skips_action(self):
+        calls = []
+        class ETagHookController(ActionController):
+            def _get_etag(self, request, id):
+                return "v%s" % id
+            def test_action(self, request, id):
+                calls.append(id)
+                return self._print("item %s" % id)
+        response = self._get(ETagHookController, "test_action", 1)
+        self.assertEqual(response["ETag"], '"v1"')
+        self.assertEqual(self._get(ETagHookController, "test_action", 1, HTTP_IF_NONE_MATCH='"v1"').status_code, 304)
+        self.assertEqual(self._get(ETagHookController, "test_action", 2, HTTP_IF_NONE_MATCH='"v1"').status_code, 200)
+        self.assertEqual(calls, [1, 2])
+
+    def test_last_modified_decorator(self):
+        modified = datetime.datetime(2020, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+        class LastModifiedController(ActionController):
+            @conditional_get(last_modified=lambda self, request: modified)
+            def test_action(self, request):
+                return self._print("modified")
+            def test_plain(self, request):
+                return self._print("plain")
+        response = self._get(LastModifiedController, "test_action")
+        self.assertEqual(response["Last-Modified"], "Thu, 02 Jan 2020 03:04:05 GMT")
+        self.assertFalse(response.has_header("ETag"))
+        self.assertEqual(self._get(LastModifiedController, "test_action",
+                                   HTTP_IF_MODIFIED_SINCE="Fri, 03 Jan 2020 00:00:00 GMT").status_code, 304)
+        self.assertFalse(self._get(LastModifiedController, "test_plain").has_header("Last-Modified"))
+
+    def test_cached_response_is_conditional(self):
+        get_local_cache().clear()
+        class CachedConditionalController(ActionController):
+            @conditional_get()
+            @cache_action(60, cache_alias=None)
+            def test_action(self, request):
+                return self._print("cached")
+        etag = self._get(CachedConditionalController, "test_action")["ETag"]
+        self.assertEqual(self._get(CachedConditionalController, "test_action", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self._get(CachedConditionalController, "test_action")["ETag"], etag)
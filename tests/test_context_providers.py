@@ -0,0 +1,168 @@
+import asyncio
+import json
+import threading
+from unittest import mock
+
+from django.test import override_settings
+
+from django_url_framework import ActionController
+from django_url_framework.context import get_context_thread_pool
+from django_url_framework.controller import get_actions, get_dispatch_plan
+from django_url_framework.decorators import json_action, provides, uses_context
+from django_url_framework.exceptions import ConfigurationError
+from .duf_test_case import DUFTestCase
+
+
+class ProvidingController(ActionController):
+    shared_context = ('site_name',)
+    calls = []
+
+    @provides()
+    def _site_name(self, request):
+        ProvidingController.calls.append('site_name')
+        return "example"
+
+    @provides('profile')
+    def profile(self, request):
+        ProvidingController.calls.append('profile')
+        return {"name": "someone"}
+
+    @provides()
+    def _greeting(self, request):
+        ProvidingController.calls.append('greeting')
+        return "hello %s" % self._get_context('profile')["name"]
+
+    @json_action()
+    @uses_context('greeting', 'profile')
+    def show(self, request):
+        return {"greeting": self._get_context('greeting'), "again": self._get_context('profile')["name"]}
+
+    @json_action()
+    @uses_context(local=lambda controller, request: request.GET.get("page", "1"))
+    def local(self, request):
+        return {}
+
+    @json_action()
+    def plain(self, request):
+        return {}
+
+
+class TestContextProviders(DUFTestCase):
+    def test_providers_are_not_actions(self):
+        self.assertEqual(sorted(get_actions(ProvidingController)), ["local", "plain", "show"])
+
+    def test_only_used_providers_are_called_once(self):
+        ProvidingController.calls = []
+        response = self._request_and_test(ProvidingController, "show")
+        self.assertEqual(json.loads(response.content), {
+            "site_name": "example", "greeting": "hello someone", "profile": {"name": "someone"},
+            "again": "someone",
+        })
+        self.assertEqual(ProvidingController.calls, ['site_name', 'greeting', 'profile'])
+
+        ProvidingController.calls = []
+        response = self._request_and_test(ProvidingController, "plain")
+        self.assertEqual(json.loads(response.content), {"site_name": "example"})
+        self.assertEqual(ProvidingController.calls, ['site_name'])
+
+    def test_action_providers(self):
+        plan = get_dispatch_plan(ProvidingController, "local")
+        self.assertEqual([provider.name for provider in plan.context_providers], ["site_name", "local"])
+        response = self._request_and_test(ProvidingController, "local")
+        self.assertEqual(json.loads(response.content), {"site_name": "example", "local": "1"})
+
+    def test_unknown_provider(self):
+        class MissingProviderController(ActionController):
+            @uses_context('missing')
+            def show(self, request):
+                return {}
+        with self.assertRaises(ConfigurationError):
+            get_dispatch_plan(MissingProviderController, "show")
+
+    def test_independent_providers_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        class ConcurrentController(ActionController):
+            @provides(independent=True)
+            def _first(self, request):
+                barrier.wait()
+                return threading.current_thread().name
+
+            @provides(independent=True)
+            def _second(self, request):
+                barrier.wait()
+                return threading.current_thread().name
+
+            @json_action()
+            @uses_context('first', 'second')
+            def show(self, request):
+                return {}
+
+        self.assertFalse(get_dispatch_plan(ConcurrentController, "show").is_async)
+        data = json.loads(self._request_and_test(ConcurrentController, "show").content)
+        self.assertNotEqual(data["first"], data["second"])
+        self.assertTrue(data["first"].startswith("django_url_framework"))
+
+    def test_async_providers(self):
+        class AsyncProvidingController(ActionController):
+            running = 0
+            peak = 0
+
+            @provides(independent=True)
+            async def _first(self, request):
+                return await self._count("first")
+
+            @provides(independent=True)
+            async def _second(self, request):
+                return await self._count("second")
+
+            @provides()
+            def _third(self, request):
+                return threading.current_thread().name
+
+            async def _count(self, value):
+                AsyncProvidingController.running += 1
+                AsyncProvidingController.peak = max(AsyncProvidingController.peak, AsyncProvidingController.running)
+                await asyncio.sleep(0.01)
+                AsyncProvidingController.running -= 1
+                return value
+
+            @json_action()
+            @uses_context('first', 'second', 'third')
+            async def show(self, request):
+                return {"fourth": await self._get_context_async('first')}
+
+        self.assertTrue(get_dispatch_plan(AsyncProvidingController, "show").is_async)
+        data = json.loads(self._request_and_test(AsyncProvidingController, "show").content)
+        self.assertEqual((data["first"], data["second"], data["fourth"]), ("first", "second", "first"))
+        self.assertTrue(data["third"].startswith("django_url_framework"))
+        self.assertEqual(AsyncProvidingController.peak, 2)
+
+    def test_providers_in_the_context_pool_run_inline(self):
+        class NestedController(ActionController):
+            @provides(independent=True)
+            def _first(self, request):
+                return threading.current_thread().name
+
+            @provides(independent=True)
+            def _second(self, request):
+                return threading.current_thread().name
+
+            @json_action()
+            @uses_context('first', 'second')
+            def show(self, request):
+                return {}
+
+        with mock.patch("django_url_framework.context.close_old_connections") as close_old_connections:
+            data = json.loads(self._request_and_test(NestedController, "show").content)
+        self.assertTrue(data["first"].startswith("django_url_framework_context"))
+        self.assertEqual(close_old_connections.call_count, 4)
+
+        # an action dispatched from a thread of the pool does not wait for threads that may all be busy
+        future = get_context_thread_pool().submit(self._request_and_test, NestedController, "show")
+        data = json.loads(future.result(timeout=5).content)
+        self.assertEqual(data["first"], data["second"])
+
+        with override_settings(URL_FRAMEWORK_CONTEXT_THREAD_POOL_SIZE=0):
+            data = json.loads(self._request_and_test(NestedController, "show").content)
+        self.assertEqual(data["first"], threading.current_thread().name)
@@ -0,0 +1,95 @@
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from django_url_framework import ActionController
+from django_url_framework.controller import dispatch_plan, get_action_registry, get_dispatch_plan
+from django_url_framework.decorators import json_action
+from django_url_framework.helper import ApplicationHelper
+from .duf_test_case import DUFTestCase
+
+
+class CookieHelper(ApplicationHelper):
+    pass
+
+
+class MetadataController(ActionController):
+    template_prefix = "meta"
+    no_subdirectories = True
+
+    def index(self, request):
+        return {}
+
+    def redirect(self, request):
+        self._set_cookie("visited", "yes")
+        return self._go(to_url="/elsewhere/")
+
+    def direct(self, request):
+        self._set_cookie("visited", "yes")
+        response = HttpResponse("direct")
+        response.set_cookie("own", "kept")
+        return response
+
+    @json_action()
+    def data(self, request):
+        return {"ok": True}, 201
+
+
+class TestControllerMetadata(DUFTestCase):
+    def _controller(self, helper_class=None):
+        return MetadataController(site=None, request=RequestFactory().get("/"), helper_class=helper_class, url_params={})
+
+    def _dispatch(self, action_name):
+        return dispatch_plan(None, RequestFactory().get("/"), get_dispatch_plan(MetadataController, action_name))
+
+    def test_metadata_computed_once(self):
+        metadata = get_action_registry(MetadataController).metadata
+        self.assertIs(get_action_registry(MetadataController).metadata, metadata)
+        self.assertEqual(metadata.controller_name, "metadata")
+        self.assertEqual(metadata.template_prefix, "meta")
+        self.assertEqual(metadata.template_string, "%(controller)s_%(action)s.%(ext)s")
+
+        controller = self._controller()
+        self.assertEqual(controller._controller_name, "metadata")
+        self.assertEqual(controller._template_prefix, "meta")
+        self.assertIs(controller._actions, get_action_registry(MetadataController).actions)
+
+    def test_lazy_helper_and_response(self):
+        controller = self._controller(helper_class=CookieHelper)
+        self.assertIsNone(controller._helper_instance)
+        self.assertIsNone(controller._response_instance)
+        self.assertIsInstance(controller._helper, CookieHelper)
+        self.assertIs(controller._helper, controller._helper)
+        self.assertIsInstance(self._controller()._helper, ApplicationHelper)
+
+    def test_assigned_response_and_attributes(self):
+        class AssigningController(ActionController):
+            def _before_filter(self, request):
+                self.page_title = "assigned"
+                self._response = HttpResponse(headers={"X-Assigned": "yes"})
+
+            def test_action(self, request):
+                return self._print(self.page_title)
+
+        response = dispatch_plan(None, RequestFactory().get("/"), get_dispatch_plan(AssigningController, "test_action"))
+        self.assertEqual(response["X-Assigned"], "yes")
+        self.assertEqual(response.content, b"assigned")
+
+        controller = self._controller()
+        helper = ApplicationHelper(controller)
+        controller._helper = helper
+        self.assertIs(controller._helper, helper)
+
+    def test_status_code(self):
+        response = self._dispatch("data")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response["Content-Type"], "application/json; charset=utf8")
+
+    def test_cookies_on_returned_responses(self):
+        response = self._dispatch("redirect")
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.cookies["visited"].value, "yes")
+
+        response = self._dispatch("direct")
+        self.assertEqual(response.content, b"direct")
+        self.assertEqual(response.cookies["visited"].value, "yes")
+        self.assertEqual(response.cookies["own"].value, "kept")
@@ -0,0 +1,75 @@
+import json
+from unittest import TestCase
+
+from django.test import RequestFactory
+
+from django_url_framework import ActionController
+from django_url_framework.controller import get_dispatch_plan, dispatch_plan, get_controller_urlconf
+from django_url_framework.decorators import json_action, GET, POST, disable_filters
+from django_url_framework.exceptions import InvalidActionError
+
+
+class TestDispatchPlan(TestCase):
+    def test_plan_resolves_action_metadata(self):
+        class PlanMetadataController(ActionController):
+            consume_urlconf_keyword_arguments = ['skip']
+            @GET
+            @POST
+            @disable_filters
+            def test_action(self, request):
+                return {}
+        plan = get_dispatch_plan(PlanMetadataController, "test_action")
+        self.assertEqual(plan.allowed_methods, ("POST", "GET"))
+        self.assertEqual(plan.controller_name, "plan_metadata")
+        self.assertTrue(plan.disable_filters)
+        self.assertTrue(plan.pass_request)
+        self.assertEqual(plan.consumed_kwargs, frozenset(['skip']))
+        self.assertIs(plan, get_dispatch_plan(PlanMetadataController, "test_action"))
+
+    def test_plan_inherits_allowed_methods_from_before_filter(self):
+        class PlanBeforeFilterController(ActionController):
+            @POST
+            def _before_filter(self, request):
+                return None
+            def test_action(self, request):
+                return {}
+        self.assertEqual(get_dispatch_plan(PlanBeforeFilterController, "test_action").allowed_methods, ("POST",))
+
+    def test_missing_action(self):
+        class PlanMissingController(ActionController):
+            def test_action(self, request):
+                return {}
+        with self.assertRaises(InvalidActionError):
+            get_dispatch_plan(PlanMissingController, "missing")
+
+    def test_dispatch_consumes_kwargs(self):
+        class PlanConsumeController(ActionController):
+            consume_urlconf_keyword_arguments = ['skip']
+            @json_action()
+            def test_action(self, request, id):
+                return {"id": id, "url_params": self._url_params}
+        request = RequestFactory().get('/plan_consume/test_action/1/')
+        plan = get_dispatch_plan(PlanConsumeController, "test_action")
+        response = dispatch_plan(None, request, plan, id=1, skip=True)
+        self.assertEqual(json.loads(response.content), {"id": 1, "url_params": {"id": 1, "skip": True}})
+
+    def test_method_not_allowed(self):
+        class PlanNotAllowedController(ActionController):
+            @POST
+            def test_action(self, request):
+                return {}
+        request = RequestFactory().get('/plan_not_allowed/test_action/')
+        response = dispatch_plan(None, request, get_dispatch_plan(PlanNotAllowedController, "test_action"))
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(response['Allow'], "POST")
+
+    def test_urlconf_view_runs_plan(self):
+        class PlanUrlconfController(ActionController):
+            @json_action()
+            def test_action(self, request):
+                return {"foo": "bar"}
+        urlpatterns = get_controller_urlconf(PlanUrlconfController)
+        self.assertEqual(len(urlpatterns), 1)
+        match = urlpatterns[0].resolve("test_action/")
+        response = match.func(RequestFactory().get('/plan_urlconf/test_action/'), *match.args, **match.kwargs)
+        self.assertEqual(json.loads(response.content), {"foo": "bar"})
@@ -0,0 +1,147 @@
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from django_url_framework import ActionController
+from django_url_framework.controller import dispatch_plan, get_dispatch_plan
+from django_url_framework.flash import (FlashManager, FlashMiddleware, CookieFlashStorage, CacheFlashStorage,
+                                       SessionFlashStorage, get_flash)
+from .duf_test_case import DUFTestCase
+
+
+class TrackingSession(dict):
+    """A stand-in for a session that records whether it was read or written."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.accessed = False
+        self.modified = False
+
+    def get(self, *args):
+        self.accessed = True
+        return super().get(*args)
+
+    def __contains__(self, key):
+        self.accessed = True
+        return super().__contains__(key)
+
+    def __setitem__(self, key, value):
+        self.modified = True
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.modified = True
+        super().__delitem__(key)
+
+
+class TestFlash(DUFTestCase):
+    def _request(self, session=None, **cookies):
+        request = RequestFactory().get("/")
+        request.session = TrackingSession(session or {})
+        request.COOKIES.update(cookies)
+        return request
+
+    def test_session_not_touched_when_unused(self):
+        class FlashUnusedController(ActionController):
+            def test_action(self, request):
+                self._flash
+                return self._print("ok")
+        request = self._request()
+        dispatch_plan(None, request, get_dispatch_plan(FlashUnusedController, "test_action"))
+        self.assertFalse(request.session.accessed)
+        self.assertFalse(request.session.modified)
+
+    def test_single_write_with_dedup(self):
+        class FlashAppendController(ActionController):
+            def test_action(self, request):
+                self._flash.append("hello")
+                self._flash.append("hello")
+                self._flash.error("oops")
+                self._flash.append("hello")
+                return self._go(to_url="/")
+        request = self._request()
+        dispatch_plan(None, request, get_dispatch_plan(FlashAppendController, "test_action"))
+        self.assertEqual(request.session[FlashManager.SESSION_KEY],
+                         [{"message": "oops", "is_error": True, "kind": "error"},
+                          {"message": "hello", "is_error": False, "kind": "normal"}])
+
+    def test_read_without_change_does_not_write(self):
+        stored = [{"message": "hello", "is_error": False, "kind": "normal"}]
+        flash = FlashManager(self._request({FlashManager.SESSION_KEY: stored}), storage=None)
+        self.assertEqual([str(m) for m in flash], ["hello"])
+        flash.flush(HttpResponse())
+        self.assertFalse(flash.request.session.modified)
+        self.assertEqual([str(m) for m in flash.get_and_clear()], ["hello"])
+        flash.flush(HttpResponse())
+        self.assertNotIn(FlashManager.SESSION_KEY, flash.request.session)
+
+    def test_cookie_storage(self):
+        request = self._request()
+        flash = FlashManager(request, storage=CookieFlashStorage(request))
+        flash.append("cookie")
+        response = HttpResponse()
+        flash.flush(response)
+        self.assertFalse(request.session.accessed)
+
+        request = self._request(**{CookieFlashStorage.key: response.cookies[CookieFlashStorage.key].value})
+        flash = FlashManager(request, storage=CookieFlashStorage(request))
+        self.assertEqual([str(m) for m in flash.get_and_clear()], ["cookie"])
+        response = HttpResponse()
+        flash.flush(response)
+        self.assertEqual(response.cookies[CookieFlashStorage.key].value, "")
+
+    def test_cache_storage(self):
+        caches["default"].clear()
+        request = self._request()
+        flash = FlashManager(request, storage=CacheFlashStorage(request))
+        flash.append("cached")
+        response = HttpResponse()
+        flash.flush(response)
+
+        request = self._request(**{CacheFlashStorage.key: response.cookies[CacheFlashStorage.key].value})
+        flash = FlashManager(request, storage=CacheFlashStorage(request))
+        self.assertEqual([str(m) for m in flash], ["cached"])
+        self.assertFalse(request.session.accessed)
+
+    def test_storage_setting(self):
+        with override_settings(URL_FRAMEWORK_FLASH_STORAGE="cookie"):
+            self.assertIsInstance(FlashManager(self._request()).storage, CookieFlashStorage)
+        self.assertIsInstance(FlashManager(self._request()).storage, SessionFlashStorage)
+
+    def test_saved_when_the_action_raises(self):
+        class FlashRaisingController(ActionController):
+            def test_action(self, request):
+                self._flash.error("failed")
+                raise ValueError("failed")
+        request = self._request()
+        with self.assertRaises(ValueError):
+            dispatch_plan(None, request, get_dispatch_plan(FlashRaisingController, "test_action"))
+        self.assertEqual(request.session[FlashManager.SESSION_KEY],
+                         [{"message": "failed", "is_error": True, "kind": "error"}])
+
+    def test_standalone(self):
+        request = self._request()
+        with FlashManager(request) as flash:
+            flash.append("standalone")
+        self.assertEqual([m["message"] for m in request.session[FlashManager.SESSION_KEY]], ["standalone"])
+
+        request = self._request()
+        with override_settings(URL_FRAMEWORK_FLASH_STORAGE="cookie"):
+            with get_flash(request) as flash:
+                flash.append("later")
+            self.assertTrue(flash.changed)
+            response = FlashMiddleware(lambda request: HttpResponse())(request)
+        self.assertFalse(flash.changed)
+        self.assertIn(CookieFlashStorage.key, response.cookies)
+
+    def test_shared_by_the_request(self):
+        class FlashSharingController(ActionController):
+            def test_action(self, request):
+                self._flash.append(request.GET["message"])
+                return self._print("ok")
+        batch_request = self._request()
+        for message in ("first", "second"):
+            request = RequestFactory().get("/", {"message": message})
+            request.session = batch_request.session
+            request.batch_request = batch_request
+            dispatch_plan(None, request, get_dispatch_plan(FlashSharingController, "test_action"))
+        self.assertEqual([m["message"] for m in batch_request.session[FlashManager.SESSION_KEY]], ["first", "second"])
@@ -1,7 +1,10 @@
+import gc
+import weakref
 from unittest import TestCase
 
 from django_url_framework.controller import _get_arg_name_and_default
 from django_url_framework.controller import get_actions
+from django_url_framework.controller import get_action_registry
 from django_url_framework import ActionController
 
 
@@ -27,6 +30,40 @@ class TestGetActions(TestCase):
         self.assertEqual(actions, {'export_my_unpaid_hours_to_csv':test_get_actionsController.export_my_unpaid_hours_to_csv,
                                    'action2':test_get_actionsController.action2})
 
+    def test_get_actions_same_class_name(self):
+        def make_controller(action_name):
+            class SameNameController(ActionController):
+                pass
+            def action(self, request):
+                return {}
+            action.__name__ = action_name
+            setattr(SameNameController, action_name, action)
+            return SameNameController
+        first = make_controller("first")
+        second = make_controller("second")
+        self.assertEqual(list(get_actions(first).keys()), ['first'])
+        self.assertEqual(list(get_actions(second).keys()), ['second'])
+
+    def test_get_actions_with_prefix(self):
+        from django_url_framework.decorators import prefix, name
+        class test_get_actions_with_prefixController(ActionController):
+            @prefix("pre_")
+            @name("renamed")
+            def action1(self, request):
+                return {}
+        self.assertEqual(list(get_actions(test_get_actions_with_prefixController).keys()), ['pre_renamed'])
+        self.assertEqual(list(get_actions(test_get_actions_with_prefixController, with_prefix=False).keys()), ['renamed'])
+
+    def test_registry_is_released_with_class(self):
+        class test_registry_releasedController(ActionController):
+            def action1(self, request):
+                return {}
+        self.assertIn('action1', get_action_registry(test_registry_releasedController).actions)
+        controller_class = weakref.ref(test_registry_releasedController)
+        del test_registry_releasedController
+        gc.collect()
+        self.assertIsNone(controller_class())
+
     def test_has_defaults_request_has_default(self):
         class test_has_defaults1Controller(ActionController):
             def _after_filter(self, request):
@@ -0,0 +1,91 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.http import HttpResponse
+from django.test import override_settings
+from django.urls import include, path
+
+from django_url_framework import ActionController
+from django_url_framework.decorators import GET, urlconf
+from django_url_framework.inspection import inspect_routes
+from django_url_framework.management.commands.url_routes import Command
+from django_url_framework.site import Site
+from .duf_test_case import DUFTestCase
+
+
+class InspectedController(ActionController):
+    @urlconf([r"^(?P<anything>[a-z]+)/$"])
+    def catch_all(self, request, anything):
+        return {}
+
+    @GET
+    def show(self, request, id:int):
+        return {}
+
+    def list(self, request):
+        return {}
+
+
+site = Site()
+site.controllers["inspected"] = InspectedController
+
+
+class urls:
+    urlpatterns = [
+        path("app/", include(site.urls[0])),
+        path("app/inspected/show/<int:id>/", lambda request, id: HttpResponse(), name="other_show"),
+    ]
+
+
+class TestInspection(DUFTestCase):
+    def setUp(self):
+        self.urlconf = override_settings(ROOT_URLCONF=urls)
+        self.urlconf.enable()
+
+    def tearDown(self):
+        self.urlconf.disable()
+
+    def test_inspect_routes(self):
+        reports = {report.route.pattern: report for report in inspect_routes(number=2)
+                   if report.route.name != "other_show"}
+        show = reports["app/inspected/show/<int:id>/"]
+        self.assertEqual((show.route.controller, show.route.action), ("inspected", "show"))
+        self.assertEqual(show.route.parameters, (("id", "int"),))
+        self.assertEqual(show.route.allowed_methods, ("GET",))
+        self.assertEqual(show.url, "/app/inspected/show/1/")
+        self.assertEqual(show.problems, ())
+        self.assertGreater(show.resolve_time, 0)
+        self.assertGreater(show.reverse_time, 0)
+
+        list_report = reports["app/inspected/list/"]
+        self.assertEqual(list_report.problems, ("shadowed by app/inspected/(?P<anything>[a-z]+)/$",))
+        self.assertIsNone(list_report.resolve_time)
+
+        duplicate = [report for report in inspect_routes(number=0) if report.route.name == "other_show"][0]
+        self.assertEqual(duplicate.problems, ("duplicate of #%d" % show.route.position,))
+        self.assertIsNone(duplicate.resolve_time)
+
+    def test_command(self):
+        out = StringIO()
+        call_command(Command(), number=1, stdout=out)
+        self.assertIn("app/inspected/show/<int:id>/", out.getvalue())
+        self.assertIn("shadowed by", out.getvalue())
+
+        out = StringIO()
+        call_command(Command(), number=0, json=True, stdout=out)
+        routes = json.loads(out.getvalue())
+        self.assertEqual(routes[0]["controller"], "inspected")
+
+        with self.assertRaises(CommandError):
+            call_command(Command(), number=0, fail_on_problems=True, stdout=StringIO())
+
+    def test_site_urls_cached(self):
+        cached_site = Site()
+        cached_site.controllers["inspected"] = InspectedController
+        urlpatterns = cached_site.urls[0]
+        self.assertIs(cached_site.urls[0], urlpatterns)
+        cached_site.controllers["other"] = InspectedController
+        self.assertIsNot(cached_site.urls[0], urlpatterns)
+        self.assertEqual(len(cached_site.urls[0]), 2)
@@ -0,0 +1,86 @@
+from django.test import RequestFactory, override_settings
+
+from django_url_framework import ActionController
+from django_url_framework.controller import dispatch_plan, get_dispatch_plan
+from django_url_framework.decorators import json_action
+from django_url_framework.renderers import JSONRenderer
+from django_url_framework.instrumentation import (DispatchObserver, SignalObserver, dispatch_finished,
+                                                  register_observer, start_phase_timer, unregister_observer)
+from .duf_test_case import DUFTestCase
+
+
+class RecordingObserver(DispatchObserver):
+    def __init__(self):
+        self.phases = []
+        self.finished = []
+        self.renderers = []
+
+    def phase_finished(self, controller, plan, phase, duration):
+        self.phases.append(phase)
+
+    def dispatch_finished(self, controller, plan, timings, total, response, renderer=None):
+        self.finished.append((plan.action_name, dict(timings), total, response))
+        self.renderers.append(renderer)
+
+
+class TimedController(ActionController):
+    def _before_filter(self, request):
+        return {"user": "someone"}
+
+    @json_action()
+    def test_action(self, request):
+        return {"ok": True}
+
+    def failing(self, request):
+        raise ValueError("failed")
+
+
+class TestInstrumentation(DUFTestCase):
+    def _dispatch(self, action_name="test_action"):
+        request = RequestFactory().get("/")
+        return dispatch_plan(None, request, get_dispatch_plan(TimedController, action_name))
+
+    def test_disabled(self):
+        self.assertIsNone(start_phase_timer(None, get_dispatch_plan(TimedController, "test_action")))
+        self.assertFalse(self._dispatch().has_header("Server-Timing"))
+
+    def test_observer(self):
+        observer = RecordingObserver()
+        register_observer(observer)
+        try:
+            response = self._dispatch()
+            with self.assertRaises(ValueError):
+                self._dispatch("failing")
+        finally:
+            unregister_observer(observer)
+        self.assertEqual(observer.phases, ["before_filter", "action", "after_filter", "render", "before_filter"])
+        (action_name, timings, total, finished_response), failed = observer.finished
+        self.assertEqual(action_name, "test_action")
+        self.assertEqual(observer.renderers, [JSONRenderer, None])
+        self.assertIs(finished_response, response)
+        self.assertEqual(list(timings), ["before_filter", "action", "after_filter", "render"])
+        self.assertGreaterEqual(total, sum(timings.values()))
+        self.assertEqual(failed[0], "failing")
+        self.assertIsNone(failed[3])
+
+        self._dispatch()
+        self.assertEqual(len(observer.finished), 2)
+
+    def test_server_timing(self):
+        with override_settings(URL_FRAMEWORK_SERVER_TIMING=True):
+            header = self._dispatch()["Server-Timing"]
+        self.assertRegex(header, r"^before_filter;dur=[\d.]+, action;dur=[\d.]+, after_filter;dur=[\d.]+, "
+                                 r"render;dur=[\d.]+, total;dur=[\d.]+$")
+        self.assertFalse(self._dispatch().has_header("Server-Timing"))
+
+    def test_signals(self):
+        received = []
+        def on_dispatch_finished(sender, **kwargs):
+            received.append((sender, kwargs["plan"].action_name, kwargs["response"].status_code))
+        dispatch_finished.connect(on_dispatch_finished)
+        try:
+            with override_settings(URL_FRAMEWORK_OBSERVERS=[SignalObserver]):
+                self._dispatch()
+        finally:
+            dispatch_finished.disconnect(on_dispatch_finished)
+        self.assertEqual(received, [(TimedController, "test_action", 200)])
@@ -0,0 +1,88 @@
+import datetime
+import decimal
+import json
+import uuid
+from unittest import TestCase, skipUnless
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.functional import lazy
+
+from django_url_framework import ActionController
+from django_url_framework.decorators import json_action, auto
+from django_url_framework.json_backends import get_json_backend, get_encoder_with_default, JSONBackend
+from .duf_test_case import DUFTestCase
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DATA = {
+    "datetime": datetime.datetime(2020, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc),
+    "date": datetime.date(2020, 1, 2),
+    "time": datetime.time(3, 4, 5, 678901),
+    "duration": datetime.timedelta(days=1, seconds=5),
+    "decimal": decimal.Decimal("1.10"),
+    "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "promise": lazy(lambda: "lazy", str)(),
+    "list": [1, 2.5, None, True, "ä"],
+    "big": 2 ** 70,
+}
+
+
+class TestJSONBackends(TestCase):
+    def test_backends_are_shared(self):
+        self.assertIs(get_json_backend("json"), get_json_backend("json", DjangoJSONEncoder))
+        self.assertIs(get_json_backend("json", None), get_json_backend("json"))
+
+    def test_encoder_with_default_is_cached(self):
+        default = str
+        encoder = get_encoder_with_default(DjangoJSONEncoder, default)
+        self.assertIs(encoder, get_encoder_with_default(DjangoJSONEncoder, default))
+        self.assertEqual(json.dumps({1}, cls=encoder), '"{1}"')
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ImproperlyConfigured):
+            get_json_backend("no.such.Backend")
+
+    def test_fast_backend(self):
+        self.assertIsInstance(get_json_backend("fast"), JSONBackend)
+
+    @skipUnless(orjson, "orjson is not installed")
+    def test_orjson_matches_django_encoder(self):
+        expected = json.loads(json.dumps(DATA, cls=DjangoJSONEncoder))
+        self.assertEqual(json.loads(get_json_backend("orjson").dumps(DATA)), expected)
+        self.assertEqual(json.loads(get_json_backend("fast").dumps(DATA)), expected)
+
+
+class TestControllerJSONBackend(DUFTestCase):
+    def test_json_action_uses_controller_encoder(self):
+        class TestEncoder(DjangoJSONEncoder):
+            def default(self, o):
+                if isinstance(o, set):
+                    return sorted(o)
+                return super().default(o)
+
+        class JSONEncoderController(ActionController):
+            json_default_encoder = TestEncoder
+            @json_action()
+            def test_action(self, request):
+                return {"set": {2, 1}, "date": datetime.date(2020, 1, 2)}
+            @auto(json_encoder=DjangoJSONEncoder)
+            def test_auto(self, request):
+                return {"date": datetime.date(2020, 1, 2)}
+
+        response = self._request_and_test(JSONEncoderController, "test_action")
+        self.assertEqual(json.loads(response.content), {"set": [1, 2], "date": "2020-01-02"})
+        self._request_and_test(JSONEncoderController, "test_auto",
+                               expected_response='{"date": "2020-01-02"}', HTTP_ACCEPT="application/json")
+
+    @skipUnless(orjson, "orjson is not installed")
+    def test_controller_backend(self):
+        class OrjsonController(ActionController):
+            json_backend = "orjson"
+            @json_action()
+            def test_action(self, request):
+                return {"foo": [1, 2]}
+        self._request_and_test(OrjsonController, "test_action", expected_response='{"foo":[1,2]}')
@@ -0,0 +1,185 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import textwrap
+from types import SimpleNamespace
+from unittest import TestCase, mock
+
+from django.apps import apps
+from django.core.management import call_command
+from django.test import RequestFactory, override_settings
+from django.urls import URLResolver
+from django.urls.resolvers import RegexPattern
+
+from django_url_framework.discovery import DiscoveryManifest
+from django_url_framework.management.commands import build_url_manifest
+from django_url_framework.site import Site
+
+CONTROLLER_SOURCE = textwrap.dedent('''
+    from django_url_framework import ActionController
+    from django_url_framework.decorators import json_action
+
+    class LazyCartController(ActionController):
+        @json_action()
+        def index(self, request):
+            return {"cart": "index"}
+
+    class NamedLazyController(ActionController):
+        controller_name = "named"
+        controller_prefix = "prefixed_"
+        @json_action()
+        def show(self, request, id:int):
+            return {"id": id}
+''')
+
+OTHER_CONTROLLER_SOURCE = textwrap.dedent('''
+    from django_url_framework import ActionController
+
+    class OtherController(ActionController):
+        def index(self, request):
+            return {}
+''')
+
+
+class LazyAppTestCase(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.app_path = os.path.join(self.tmp_dir.name, "lazy_app")
+        os.mkdir(self.app_path)
+        open(os.path.join(self.app_path, "__init__.py"), "w").close()
+        with open(os.path.join(self.app_path, "cart_controller.py"), "w") as f:
+            f.write(CONTROLLER_SOURCE)
+        sys.path.insert(0, self.tmp_dir.name)
+
+    def tearDown(self):
+        sys.path.remove(self.tmp_dir.name)
+        for module_name in ("lazy_app.cart_controller", "lazy_app"):
+            sys.modules.pop(module_name, None)
+        self.tmp_dir.cleanup()
+
+
+class TestLazyDiscovery(LazyAppTestCase):
+    def setUp(self):
+        super(TestLazyDiscovery, self).setUp()
+        with open(os.path.join(self.app_path, "other_controller.py"), "w") as f:
+            f.write(OTHER_CONTROLLER_SOURCE)
+
+    def tearDown(self):
+        sys.modules.pop("lazy_app.other_controller", None)
+        super(TestLazyDiscovery, self).tearDown()
+
+    def _get_site(self):
+        manifest = DiscoveryManifest(os.path.join(self.tmp_dir.name, "manifest.json"))
+        Site()._load_controllers_from_manifest(manifest=manifest, app_path=self.app_path, app_module_path="lazy_app")
+        manifest.save()
+        for module_name in ("lazy_app.cart_controller", "lazy_app.other_controller"):
+            sys.modules.pop(module_name, None)
+
+        site = Site()
+        site._load_controllers_from_manifest(manifest=DiscoveryManifest.load(manifest.path),
+                                             app_path=self.app_path, app_module_path="lazy_app")
+        return site
+
+    def test_autodiscover_with_manifest_setting(self):
+        self._get_site()
+        site = Site()
+        app_config = SimpleNamespace(name="lazy_app", path=self.app_path)
+        with mock.patch.dict(apps.app_configs, {"lazy_app": app_config}), \
+                override_settings(URL_FRAMEWORK_MANIFEST=os.path.join(self.tmp_dir.name, "manifest.json")):
+            site.autodiscover()
+        self.assertEqual(sorted(site.controller_descriptors.keys()), ["lazy_cart", "other", "prefixed_named"])
+        self.assertNotIn("lazy_app.cart_controller", sys.modules)
+        self.assertNotIn("lazy_app.other_controller", sys.modules)
+
+    def test_reverse_and_request_import_one_controller(self):
+        site = self._get_site()
+        self.assertEqual(sorted(site.controller_descriptors.keys()), ["lazy_cart", "other", "prefixed_named"])
+        urlpatterns, app_name, namespace = site.urls
+        resolver = URLResolver(RegexPattern(r'^/'), urlpatterns)
+
+        self.assertEqual(resolver.reverse("lazy_cart_index"), "lazy_cart/")
+        self.assertNotIn("lazy_app.cart_controller", sys.modules)
+        self.assertNotIn("lazy_app.other_controller", sys.modules)
+
+        match = resolver.resolve("/prefixed_named/show/5/")
+        response = match.func(RequestFactory().get("/prefixed_named/show/5/"), *match.args, **match.kwargs)
+        self.assertEqual(json.loads(response.content), {"id": 5})
+        self.assertIn("lazy_app.cart_controller", sys.modules)
+        self.assertNotIn("lazy_app.other_controller", sys.modules)
+        self.assertFalse(site.controller_descriptors["other"].is_loaded)
+
+    def test_get_controller(self):
+        site = self._get_site()
+        controller_class = site.get_controller("lazy_cart")
+        self.assertEqual(controller_class.__name__, "LazyCartController")
+        self.assertNotIn("lazy_app.other_controller", sys.modules)
+        self.assertIsNone(site.get_controller("missing"))
+
+
+class TestDiscoveryManifest(LazyAppTestCase):
+    def _forget_module(self):
+        sys.modules.pop("lazy_app.cart_controller", None)
+
+    def _get_manifest_site(self, manifest):
+        site = Site()
+        site._load_controllers_from_manifest(manifest=manifest, app_path=self.app_path, app_module_path="lazy_app")
+        return site
+
+    def _write_manifest(self):
+        manifest = DiscoveryManifest(os.path.join(self.tmp_dir.name, "manifest.json"))
+        self._get_manifest_site(manifest)
+        self.assertTrue(manifest.changed)
+        manifest.save()
+        self._forget_module()
+        return manifest.path
+
+    def test_manifest_records_controllers(self):
+        manifest = DiscoveryManifest.load(self._write_manifest())
+        controllers = manifest.modules["lazy_app.cart_controller"]["controllers"]
+        self.assertEqual(sorted(c["controller_name"] for c in controllers), ["lazy_cart", "prefixed_named"])
+        self.assertEqual(manifest.apps["lazy_app"]["controller_files"], ["cart_controller"])
+
+    def test_manifest_mounts_without_import(self):
+        manifest = DiscoveryManifest.load(self._write_manifest())
+        site = self._get_manifest_site(manifest)
+        self.assertFalse(manifest.changed)
+
+        urlpatterns, app_name, namespace = site.urls
+        resolver = URLResolver(RegexPattern(r'^/'), urlpatterns)
+        self.assertEqual(resolver.reverse("named_show", id=3), "prefixed_named/show/3/")
+        self.assertNotIn("lazy_app.cart_controller", sys.modules)
+
+        match = resolver.resolve("/prefixed_named/show/3/")
+        response = match.func(RequestFactory().get("/prefixed_named/show/3/"), *match.args, **match.kwargs)
+        self.assertEqual(json.loads(response.content), {"id": 3})
+
+    def test_manifest_invalidated_by_change(self):
+        manifest_path = self._write_manifest()
+        controller_path = os.path.join(self.app_path, "cart_controller.py")
+        with open(controller_path, "a") as f:
+            f.write("\nclass ExtraController(ActionController):\n    def extra(self, request):\n        return {}\n")
+
+        manifest = DiscoveryManifest.load(manifest_path)
+        site = self._get_manifest_site(manifest)
+        self.assertTrue(manifest.changed)
+        self.assertIn("extra", site.controller_descriptors)
+
+    def test_manifest_touch_without_change(self):
+        manifest_path = self._write_manifest()
+        controller_path = os.path.join(self.app_path, "cart_controller.py")
+        stat = os.stat(controller_path)
+        os.utime(controller_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        manifest = DiscoveryManifest.load(manifest_path)
+        self._get_manifest_site(manifest)
+        self.assertNotIn("lazy_app.cart_controller", sys.modules)
+
+    def test_build_command_replaces_manifest(self):
+        manifest_path = self._write_manifest()
+        stdout = io.StringIO()
+        with mock.patch.dict(apps.app_configs, clear=True):
+            call_command(build_url_manifest.Command(), output=manifest_path, stdout=stdout)
+        self.assertEqual(stdout.getvalue(), "Wrote 0 controllers to %s\n" % manifest_path)
+        self.assertEqual(DiscoveryManifest.load(manifest_path).modules, {})
@@ -0,0 +1,96 @@
+import os
+import tempfile
+from types import SimpleNamespace
+
+from django.test import RequestFactory, override_settings
+
+from django_url_framework import ActionController
+from django_url_framework.controller import dispatch_plan, get_dispatch_plan
+from django_url_framework.decorators import json_action
+from django_url_framework.metrics import FILE_PREFIX, MmapStore, collect, metrics_view, observe, render_prometheus
+from django_url_framework.site import Site
+from .duf_test_case import DUFTestCase
+
+
+class MeasuredController(ActionController):
+    @json_action()
+    def test_action(self, request):
+        return {"ok": True}
+
+
+class TestMmapStore(DUFTestCase):
+    def test_round_trip_and_growth(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "store.db")
+            store = MmapStore(path)
+            store.add("a", 1.5)
+            store.add("a", 1.0)
+            for index in range(3000):
+                store.add("key %d" % index, index)
+            self.assertGreater(os.path.getsize(path), MmapStore.initial_size)
+            values = dict(MmapStore.read_file(path))
+            self.assertEqual(values["a"], 2.5)
+            self.assertEqual(values["key 2999"], 2999)
+            self.assertEqual(len(values), 3001)
+            store.close()
+
+            store = MmapStore(path)
+            store.add("a", 1)
+            self.assertEqual(dict(store.items())["a"], 3.5)
+            store.close()
+
+
+class TestMetrics(DUFTestCase):
+    def test_aggregates_processes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for pid, durations in ((1, (0.001, 0.2)), (2, (0.001,))):
+                store = MmapStore(os.path.join(directory, "%s%d.db" % (FILE_PREFIX, pid)))
+                for duration in durations:
+                    store.add('["cart", "show", "200", "JSONRenderer", "count"]', 1)
+                    store.add('["cart", "show", "200", "JSONRenderer", "sum"]', duration)
+                    store.add('["cart", "show", "200", "JSONRenderer", "le:%s"]' % ("0.005" if duration < 0.005 else "0.25"), 1)
+                store.close()
+            with override_settings(URL_FRAMEWORK_METRICS_DIR=directory):
+                metrics = collect()
+                text = render_prometheus(metrics)
+        labels = ("cart", "show", "200", "JSONRenderer")
+        self.assertEqual(metrics[labels]["count"], 3)
+        self.assertEqual(metrics[labels]["buckets"], {"0.005": 2, "0.25": 1})
+        self.assertIn('django_url_framework_requests_total{controller="cart",action="show",status="200",renderer="JSONRenderer"} 3.0', text)
+        self.assertIn('django_url_framework_request_duration_seconds_bucket{controller="cart",action="show",status="200",renderer="JSONRenderer",le="0.1"} 2.0', text)
+        self.assertIn('django_url_framework_request_duration_seconds_bucket{controller="cart",action="show",status="200",renderer="JSONRenderer",le="+Inf"} 3.0', text)
+
+    def test_dispatch_is_measured(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(URL_FRAMEWORK_METRICS=True, URL_FRAMEWORK_METRICS_DIR=directory,
+                                   URL_FRAMEWORK_METRICS_ALLOWED_IPS=["127.0.0.1"]):
+                for _ in range(2):
+                    dispatch_plan(None, RequestFactory().get("/"), get_dispatch_plan(MeasuredController, "test_action"))
+                observe("other", "index", 404, "none", 0.5)
+                response = metrics_view(RequestFactory().get("/metrics/"))
+        self.assertEqual(response["Content-Type"], "text/plain; version=0.0.4; charset=utf-8")
+        content = response.content.decode("utf8")
+        self.assertIn('django_url_framework_requests_total{controller="measured",action="test_action",status="200",renderer="JSONRenderer"} 2.0', content)
+        self.assertIn('django_url_framework_request_duration_seconds_count{controller="other",action="index",status="404",renderer="none"} 1.0', content)
+
+    def test_access(self):
+        def get_status(remote_addr="10.0.0.1", user=None):
+            request = RequestFactory().get("/metrics/", REMOTE_ADDR=remote_addr)
+            if user is not None:
+                request.user = user
+            return metrics_view(request).status_code
+        self.assertEqual(get_status(), 403)
+        self.assertEqual(get_status(user=SimpleNamespace(is_active=True, is_staff=False)), 403)
+        self.assertEqual(get_status(user=SimpleNamespace(is_active=True, is_staff=True)), 200)
+        self.assertEqual(get_status(user=SimpleNamespace(is_active=False, is_staff=True)), 403)
+        with override_settings(INTERNAL_IPS=["10.0.0.1"]):
+            self.assertEqual(get_status(), 200)
+            with override_settings(URL_FRAMEWORK_METRICS_ALLOWED_IPS=["10.0.0.2"]):
+                self.assertEqual(get_status(), 403)
+                self.assertEqual(get_status(remote_addr="10.0.0.2"), 200)
+
+    def test_site_urls(self):
+        urlpatterns, app_name, namespace = Site(metrics_url="_metrics/").urls
+        self.assertEqual(str(urlpatterns[-1].pattern), "_metrics/")
+        self.assertIs(urlpatterns[-1].callback, metrics_view)
+        self.assertEqual(Site().urls[0], [])
@@ -0,0 +1,89 @@
+from unittest import TestCase
+
+from django.test import RequestFactory
+
+from django_url_framework import ActionController
+from django_url_framework.controller import dispatch_plan, get_dispatch_plan
+from django_url_framework.decorators import auto
+from django_url_framework.negotiation import RendererRegistry, default_renderers, parse_accept, select_media_type
+from django_url_framework.renderers import JSONRenderer, TextRenderer, YAMLRenderer, TemplateRenderer
+from django_url_framework.renderers import CSVRenderer as DefaultCSVRenderer
+from django_url_framework.site import Site
+from .duf_test_case import DUFTestCase
+
+MEDIA_TYPES = ('text/plain', 'text/html', 'application/json', 'application/yaml')
+
+
+class CSVRenderer(TextRenderer):
+    def __init__(self, data, **kwargs):
+        kwargs['mimetype'] = "text/csv"
+        super(CSVRenderer, self).__init__(data=data, **kwargs)
+
+    def render(self, controller):
+        return ",".join(self._data)
+
+
+class TestAcceptParsing(TestCase):
+    def test_parse_accept(self):
+        media_ranges = parse_accept("text/html;level=1, application/JSON; q=0.5 ,*; q=0.1, bad, */json, text/*;q=x")
+        self.assertEqual([(r.type, r.subtype, r.quality, r.index) for r in media_ranges],
+                         [("text", "html", 1.0, 0), ("application", "json", 0.5, 1), ("*", "*", 0.1, 2)])
+        self.assertIs(media_ranges, parse_accept("text/html;level=1, application/JSON; q=0.5 ,*; q=0.1, bad, */json, text/*;q=x"))
+
+    def test_select_media_type(self):
+        self.assertEqual(select_media_type(MEDIA_TYPES, "application/json"), "application/json")
+        self.assertEqual(select_media_type(MEDIA_TYPES, "application/yaml, application/json"), "application/yaml")
+        self.assertEqual(select_media_type(MEDIA_TYPES, "application/yaml;q=0.5, application/json"), "application/json")
+        self.assertEqual(select_media_type(MEDIA_TYPES, "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"),
+                         "text/html")
+        self.assertEqual(select_media_type(MEDIA_TYPES, "*/*"), "text/plain")
+        self.assertEqual(select_media_type(MEDIA_TYPES, "*/*, application/json"), "application/json")
+        self.assertEqual(select_media_type(MEDIA_TYPES, "application/*"), "application/json")
+        self.assertEqual(select_media_type(MEDIA_TYPES, "*/*;q=0.5, text/plain;q=0"), "text/html")
+        self.assertIsNone(select_media_type(MEDIA_TYPES, "image/png"))
+
+
+class TestRendererRegistry(TestCase):
+    def test_default_renderers(self):
+        self.assertIs(default_renderers.get_renderer_class(None), TextRenderer)
+        self.assertIs(default_renderers.get_renderer_class("image/png"), TextRenderer)
+        self.assertIs(default_renderers.get_renderer_class(["application/yaml", "application/json"]), YAMLRenderer)
+        self.assertIs(default_renderers.get_renderer_class("text/html"), TemplateRenderer)
+
+    def test_child_registry(self):
+        registry = RendererRegistry({"text/csv": CSVRenderer}, parent=default_renderers)
+        self.assertEqual(registry.media_types[-1], "text/csv")
+        self.assertIs(registry.get_renderer_class("text/csv"), CSVRenderer)
+        self.assertIs(registry.get_renderer_class("application/json"), JSONRenderer)
+        registry.unregister("text/csv")
+        self.assertIs(registry.get_renderer_class("text/csv"), DefaultCSVRenderer)
+
+    def test_register_requires_renderer(self):
+        with self.assertRaises(TypeError):
+            RendererRegistry({"text/csv": str})
+
+
+class TestControllerRenderers(DUFTestCase):
+    def test_controller_renderers(self):
+        class CSVController(ActionController):
+            renderers = {"text/csv": CSVRenderer}
+            @auto()
+            def test_action(self, request):
+                return ["a", "b"]
+        response = self._request_and_test(CSVController, "test_action", expected_response="a,b",
+                                          HTTP_ACCEPT="text/csv, application/json;q=0.9")
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf8")
+        self._request_and_test(CSVController, "test_action", expected_response='["a", "b"]',
+                               HTTP_ACCEPT="text/csv;q=0.5, application/json")
+
+    def test_site_renderers(self):
+        site = Site(renderers={"text/csv": CSVRenderer})
+        class SiteCSVController(ActionController):
+            @auto()
+            def test_action(self, request):
+                return ["a", "b"]
+        request = RequestFactory().get("/", HTTP_ACCEPT="text/csv")
+        response = dispatch_plan(site, request, get_dispatch_plan(SiteCSVController, "test_action"))
+        self.assertEqual(response.content, b"a,b")
+        self.assertIs(site.renderers.get_renderer_class("text/csv"), CSVRenderer)
+        self.assertIs(Site().renderers.get_renderer_class("text/csv"), DefaultCSVRenderer)
@@ -0,0 +1,115 @@
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import NoReverseMatch, include, path, reverse, set_script_prefix
+
+from django_url_framework import ActionController
+from django_url_framework.site import Site
+from django_url_framework.reverse_table import ReverseRoute, ReverseTable
+from .duf_test_case import DUFTestCase
+
+
+class ReverseController(ActionController):
+    def index(self, request):
+        return {}
+
+    def show(self, request, id:int):
+        return {}
+
+    def page(self, request, slug=None):
+        return {}
+
+
+site = Site()
+site.controllers["reverse"] = ReverseController
+
+
+class urls:
+    urlpatterns = [
+        path("app/", include(site.urls[0])),
+        path("elsewhere/<int:id>/", lambda request: HttpResponse(), name="reverse_show"),
+    ]
+
+
+class TestReverseTable(DUFTestCase):
+    def setUp(self):
+        self.urlconf = override_settings(ROOT_URLCONF=urls)
+        self.urlconf.enable()
+        self.controller = ReverseController(site, RequestFactory().get("/"), None, {})
+        self.helper = self.controller._helper
+
+    def tearDown(self):
+        set_script_prefix("/")
+        self.urlconf.disable()
+
+    def test_url_for_matches_reverse(self):
+        for args in ([], ["my-page"]):
+            with self.subTest(args=args):
+                self.assertEqual(self.helper.url_for(action="page", url_args=args), reverse("reverse_page", args=args))
+                self.assertEqual(self.helper.url_for(action="page", url_args=args), reverse("reverse_page", args=args))
+        self.assertEqual(self.helper.url_for(action="page", url_kwargs={"slug": "x"}), "/app/reverse/page/x/")
+        self.assertEqual(self.helper.url_for(url_params={"q": "a b"}), "/app/reverse/?q=a+b")
+
+    def test_calibrated_once(self):
+        with mock.patch("django_url_framework.reverse_table.reverse", wraps=reverse) as reverse_mock:
+            self.assertEqual(self.helper.url_for(action="page", url_args=["a"]), "/app/reverse/page/a/")
+            self.assertEqual(self.helper.url_for(action="page", url_args=["b"]), "/app/reverse/page/b/")
+            self.assertEqual(reverse_mock.call_count, 1)
+            set_script_prefix("/mounted/")
+            self.assertEqual(self.helper.url_for(action="page", url_args=["c"]), "/mounted/app/reverse/page/c/")
+            self.assertEqual(self.helper.url_for(action="page", url_args=["d"]), "/mounted/app/reverse/page/d/")
+            self.assertEqual(reverse_mock.call_count, 2)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(NoReverseMatch):
+            self.helper.url_for(action="page", url_args=["not a slug"])
+        with self.assertRaises(NoReverseMatch):
+            self.helper.url_for(action="show", url_args=[1, 2])
+
+    def test_foreign_name(self):
+        url = reverse("reverse_show", args=[3])
+        self.assertEqual(self.helper.url_for(action="show", url_args=[3]), url)
+        self.assertEqual(self.helper.url_for(action="show", url_args=[4]), reverse("reverse_show", args=[4]))
+
+    def test_url_for_many(self):
+        self.assertEqual(self.helper.url_for_many(["a", ("b",), {"slug": "c"}, ()], action="page", url_params={"x": 1}),
+                         ["/app/reverse/page/a/?x=1", "/app/reverse/page/b/?x=1",
+                          "/app/reverse/page/c/?x=1", "/app/reverse/page/?x=1"])
+
+
+    def test_removed_controllers_are_dropped(self):
+        class RemovedController(ActionController):
+            def show(self, request, id:int):
+                return {}
+
+        removable = Site()
+        removable.controllers["reverse"] = ReverseController
+        removable.controllers["removed"] = RemovedController
+        removable.urls
+        self.assertIn("removed_show", removable.reverse_table)
+        del removable.controllers["removed"]
+        removable.urls
+        self.assertNotIn("removed_show", removable.reverse_table)
+        self.assertIn("reverse_show", removable.reverse_table)
+
+
+class TestReverseRoute(DUFTestCase):
+    def test_compile(self):
+        route = ReverseRoute.compile("name", "items/<int:id>/100%/<slug>/")
+        self.assertEqual(route.template, "items/%(id)s/100%%/%(slug)s/")
+        self.assertEqual(route.params, ("id", "slug"))
+        self.assertEqual(route.build((1, "a"), None), "items/1/100%25/a/")
+        self.assertIsNone(route.build(("x", "a"), None))
+        with self.assertRaises(ValueError):
+            ReverseRoute.compile("name", "items/<unknown:id>/")
+
+    def test_ambiguous_names_are_not_compiled(self):
+        from django_url_framework.controller import ActionRoute
+        table = ReverseTable()
+        table.add_routes("a", [ActionRoute("show", "show/<int:id>/", "shared")])
+        self.assertIn("shared", table)
+        table.add_routes("b", [ActionRoute("show", "show/<int:id>/", "shared")])
+        self.assertIsNone(table._get_route("shared", (1,), None))
+        table.add_routes("b", [ActionRoute("show", "custom/$", "shared", is_regex=True)])
+        self.assertNotIn("shared", table)
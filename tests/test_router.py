@@ -0,0 +1,83 @@
+from django.test import override_settings
+from django.urls import Resolver404, include, path, resolve, reverse
+
+from django_url_framework import ActionController
+from django_url_framework.decorators.action_options import url_parameters, urlconf
+from django_url_framework.router import SiteRouter
+from django_url_framework.site import Site
+from .duf_test_case import DUFTestCase
+
+
+class RoutedController(ActionController):
+    def index(self, request, id:int=None):
+        return {}
+
+    def show(self, request, id:int):
+        return {}
+
+    def nested__page(self, request):
+        return {}
+
+    @url_parameters("<slug:first>/<slug:second>/")
+    def pair(self, request, first, second):
+        return {}
+
+    @urlconf([r"^custom/(?P<year>\d{4})/$"])
+    def archive(self, request, year):
+        return {}
+
+
+class PrefixedController(ActionController):
+    urlconf_prefix = [r"^(?P<account>\w+)/"]
+    consume_urlconf_keyword_arguments = ["account"]
+
+    def show(self, request, id:int):
+        return {}
+
+
+def make_site(router):
+    site = Site(router=router)
+    site.controllers["routed"] = RoutedController
+    site.controllers["prefixed"] = PrefixedController
+    return site
+
+
+class regex_urls:
+    urlpatterns = [path("app/", include(make_site(router=False).urls[0]))]
+
+
+class router_urls:
+    urlpatterns = [path("app/", include(make_site(router=True).urls[0]))]
+
+
+PATHS = ["/app/routed/", "/app/routed/5/", "/app/routed/show/3/", "/app/routed/nested/page/",
+         "/app/routed/pair/a/b/", "/app/routed/custom/2020/", "/app/prefixed/acme/show/7/"]
+MISSING = ["/app/routed/show/", "/app/routed/show/x/", "/app/routed/nested/", "/app/routed/archive/",
+           "/app/other/", "/app/prefixed/show/7/", "/app/routed"]
+
+
+class TestRouter(DUFTestCase):
+    def _resolve_all(self, urls):
+        with override_settings(ROOT_URLCONF=urls):
+            matches = {}
+            for url in PATHS:
+                match = resolve(url)
+                matches[url] = (match.func.__wrapped__.__name__, match.args, match.kwargs, match.url_name, match.route)
+            for url in MISSING:
+                with self.assertRaises(Resolver404, msg=url):
+                    resolve(url)
+            urls_by_name = [reverse("routed_show", args=[3]), reverse("routed_nested__page"),
+                            reverse("routed_archive", kwargs={"year": "2020"}),
+                            reverse("prefixed_show", kwargs={"account": "acme", "id": 7})]
+            return matches, urls_by_name
+
+    def test_same_as_regex_resolver(self):
+        self.assertEqual(self._resolve_all(router_urls), self._resolve_all(regex_urls))
+
+    def test_router_pattern(self):
+        urlpatterns = make_site(router=True).urls[0]
+        self.assertIsInstance(urlpatterns[0], SiteRouter)
+        with override_settings(URL_FRAMEWORK_ROUTER=True):
+            self.assertIsInstance(Site().urls[0][0], SiteRouter)
+        self.assertFalse(any(isinstance(pattern, SiteRouter) for pattern in make_site(router=False).urls[0]))
+
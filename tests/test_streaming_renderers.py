@@ -0,0 +1,117 @@
+import datetime
+import json
+from types import SimpleNamespace
+
+from asgiref.sync import async_to_sync
+from django.http import StreamingHttpResponse
+
+from django_url_framework import ActionController
+from django_url_framework.decorators import json_action, auto, ndjson_action, csv_action
+from django_url_framework.renderers import StreamingJSONRenderer, NDJSONRenderer, CSVRenderer
+from .duf_test_case import DUFTestCase
+
+
+def _read(response):
+    return b"".join(response.streaming_content).decode("utf8")
+
+
+class TestStreamingJSONRenderer(DUFTestCase):
+    def test_streaming_json_action(self):
+        class StreamingJSONController(ActionController):
+            @json_action(streaming=True)
+            def test_action(self, request):
+                return {"count": 3, "items": ({"id": i} for i in range(3)), "nested": {"a": [1, 2]}, 1: None}
+        response = self._request_and_test(StreamingJSONController, "test_action")
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(response["Content-Type"], "application/json; charset=utf8")
+        expected = {"count": 3, "items": [{"id": 0}, {"id": 1}, {"id": 2}], "nested": {"a": [1, 2]}, 1: None}
+        self.assertEqual(_read(response), json.dumps(expected))
+
+    def test_streaming_top_level_generator_with_status(self):
+        class StreamingStatusController(ActionController):
+            @json_action(streaming=True)
+            def test_action(self, request):
+                return (str(i) for i in range(2)), 201
+        response = self._request_and_test(StreamingStatusController, "test_action", status_code=201)
+        self.assertEqual(_read(response), '["0", "1"]')
+
+    def test_streaming_chunks(self):
+        data = {"items": iter(range(1000)), "when": datetime.date(2020, 1, 2)}
+        renderer = StreamingJSONRenderer(data, buffer_size=100)
+        chunks = list(renderer.iter_chunks())
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(json.loads(b"".join(chunks)), {"items": list(range(1000)), "when": "2020-01-02"})
+
+    def test_async_chunks(self):
+        renderer = StreamingJSONRenderer([1, 2, 3], buffer_size=1)
+        async def collect():
+            return [chunk async for chunk in renderer.aiter_chunks()]
+        self.assertEqual(b"".join(async_to_sync(collect)()), b"[1, 2, 3]")
+
+    def test_auto_streaming(self):
+        class AutoStreamingController(ActionController):
+            @auto(streaming=True)
+            def test_action(self, request):
+                return {"items": iter(["a", "b"])}
+        response = self._request_and_test(AutoStreamingController, "test_action", HTTP_ACCEPT="application/json")
+        self.assertEqual(_read(response), '{"items": ["a", "b"]}')
+
+    def test_returned_renderer(self):
+        class ReturnedRendererController(ActionController):
+            def test_action(self, request):
+                return StreamingJSONRenderer(data=range(3))
+        response = self._request_and_test(ReturnedRendererController, "test_action")
+        self.assertEqual(_read(response), "[0, 1, 2]")
+
+
+class TestLineRenderers(DUFTestCase):
+    def test_ndjson_action(self):
+        class NDJSONController(ActionController):
+            @ndjson_action()
+            def test_action(self, request):
+                return ({"id": i, "when": datetime.date(2020, 1, i + 1)} for i in range(2))
+        response = self._request_and_test(NDJSONController, "test_action")
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson; charset=utf8")
+        self.assertEqual(_read(response), '{"id": 0, "when": "2020-01-01"}\n{"id": 1, "when": "2020-01-02"}\n')
+
+    def test_csv_action(self):
+        class CSVController(ActionController):
+            @csv_action()
+            def dicts(self, request):
+                return iter([{"id": 1, "name": "a,b"}, {"name": "c", "id": 2}])
+
+            @csv_action(header=["id", "name"], filename="users.csv")
+            def objects(self, request):
+                return [SimpleNamespace(id=1, name="a"), SimpleNamespace(id=2, name="b")], 201
+
+            @csv_action(header=False)
+            def rows(self, request):
+                return [(1, "a"), [2, None]]
+        response = self._request_and_test(CSVController, "dicts")
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf8")
+        self.assertEqual(_read(response), 'id,name\r\n1,"a,b"\r\n2,c\r\n')
+
+        response = self._request_and_test(CSVController, "objects", status_code=201)
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="users.csv"')
+        self.assertEqual(_read(response), "id,name\r\n1,a\r\n2,b\r\n")
+
+        self.assertEqual(_read(self._request_and_test(CSVController, "rows")), "1,a\r\n2,\r\n")
+
+    def test_auto_negotiation(self):
+        class AutoLinesController(ActionController):
+            @auto()
+            def test_action(self, request):
+                return [{"id": 1}, {"id": 2}]
+        response = self._request_and_test(AutoLinesController, "test_action", HTTP_ACCEPT="application/x-ndjson")
+        self.assertEqual(_read(response), '{"id": 1}\n{"id": 2}\n')
+        response = self._request_and_test(AutoLinesController, "test_action", HTTP_ACCEPT="text/csv")
+        self.assertEqual(_read(response), "id\r\n1\r\n2\r\n")
+
+    def test_chunks(self):
+        chunks = list(NDJSONRenderer(iter(range(1000)), buffer_size=100).iter_chunks())
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(b"".join(chunks).decode("utf8").splitlines(), [str(i) for i in range(1000)])
+        chunks = list(CSVRenderer(([i, i] for i in range(1000)), buffer_size=100).iter_chunks())
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(b"".join(chunks).count(b"\r\n"), 1000)
@@ -0,0 +1,75 @@
+import gc
+import weakref
+from unittest import mock
+
+from django.template import loader
+from django.test import RequestFactory, override_settings
+
+from django_url_framework import ActionController
+from django_url_framework import renderers
+from .duf_test_case import DUFTestCase
+
+
+class TestTemplateCache(DUFTestCase):
+    def setUp(self):
+        renderers.clear_template_caches()
+
+    def test_template_name_and_template_are_cached(self):
+        class TestTemplateRendererController(ActionController):
+            def test_action(self, request):
+                return {"data": "foo"}
+        with mock.patch.object(loader, "get_template", wraps=loader.get_template) as get_template:
+            self._request_and_test(TestTemplateRendererController, "test_action", expected_response="HTML:foo")
+            self._request_and_test(TestTemplateRendererController, "test_action", expected_response="HTML:foo")
+        self.assertEqual(get_template.call_count, 1)
+        self.assertEqual(list(renderers._template_name_cache[TestTemplateRendererController].values()),
+                         ["test_template_renderer/test_action.html"])
+
+    def test_template_name_per_template_prefix(self):
+        class TemplatePrefixController(ActionController):
+            def test_action(self, request):
+                return {}
+
+        def get_template_name(prefix=None, extension=None):
+            controller = TemplatePrefixController(None, RequestFactory().get("/"), None, {})
+            controller._action_name = "test_action"
+            controller._action_func = controller.test_action
+            if prefix is not None:
+                controller._template_prefix = prefix
+            if extension is not None:
+                controller._template_extension = extension
+            return renderers.TemplateRenderer({}).get_template_name(controller)
+        self.assertEqual(get_template_name(), "template_prefix/test_action.html")
+        self.assertEqual(get_template_name(prefix="other"), "other/test_action.html")
+        self.assertEqual(get_template_name(extension="txt"), "template_prefix/test_action.txt")
+        self.assertEqual(get_template_name(), "template_prefix/test_action.html")
+
+    def test_no_cache_in_debug(self):
+        class TestTemplateRendererController(ActionController):
+            def test_action(self, request):
+                return {"data": "foo"}
+        with override_settings(DEBUG=True):
+            self._request_and_test(TestTemplateRendererController, "test_action", expected_response="HTML:foo")
+            self.assertEqual(len(renderers._template_name_cache), 0)
+            self.assertIsNone(renderers._template_cache.get("test_template_renderer/test_action.html"))
+
+    def test_settings_change_clears_cache(self):
+        class TestTemplateRendererController(ActionController):
+            def test_action(self, request):
+                return {"data": "foo"}
+        self._request_and_test(TestTemplateRendererController, "test_action", expected_response="HTML:foo")
+        self.assertIsNotNone(renderers._template_cache.get("test_template_renderer/test_action.html"))
+        with override_settings(TEMPLATES=[]):
+            self.assertIsNone(renderers._template_cache.get("test_template_renderer/test_action.html"))
+
+    def test_controller_classes_are_released(self):
+        class ReleasedTemplateController(ActionController):
+            controller_name = "test_template_renderer"
+            def test_action(self, request):
+                return {"data": "foo"}
+        self._request_and_test(ReleasedTemplateController, "test_action", expected_response="HTML:foo")
+        controller_class = weakref.ref(ReleasedTemplateController)
+        del ReleasedTemplateController
+        gc.collect()
+        self.assertIsNone(controller_class())
+        self.assertEqual(len(renderers._template_name_cache), 0)
@@ -0,0 +1,112 @@
+import json
+from types import SimpleNamespace
+from unittest import mock
+
+from django.template import Engine, TemplateDoesNotExist
+from django.template.backends.django import Template
+from django.test import RequestFactory
+
+from django_url_framework import ActionController
+from django_url_framework.decorators import json_action
+from django_url_framework.renderers import LayeredContext, TemplateRenderer, add_context_layer, flatten_context
+from .duf_test_case import DUFTestCase
+
+
+def django_template(source):
+    engine = Engine()
+    return Template(engine.from_string(source), SimpleNamespace(engine=engine))
+
+
+class TestTemplateContext(DUFTestCase):
+    def test_layers(self):
+        before, action, after = {"a": 1, "b": 1}, {"b": 2, "c": 2}, {"c": 3, "d": 3}
+        context = add_context_layer(add_context_layer(action, before, below=True), after)
+        self.assertIsInstance(context, LayeredContext)
+        self.assertEqual(context.maps, [after, action, before])
+        self.assertEqual(list(context.items()), [("b", 2), ("c", 3), ("a", 1), ("d", 3)])
+        self.assertEqual(flatten_context(context), {"b": 2, "c": 3, "a": 1, "d": 3})
+        self.assertEqual(action, {"b": 2, "c": 2})
+        self.assertIs(flatten_context(action), action)
+
+    def test_filters_do_not_copy_the_action_data(self):
+        data = {"foo": "action"}
+
+        class LayeredController(ActionController):
+            def _before_filter(self, request):
+                return {"foo": "before", "before": True}
+
+            def _after_filter(self, request):
+                return {"after": self._template_context["foo"]}
+
+            @json_action()
+            def test_action(self, request):
+                return data
+
+        response = self._request_and_test(LayeredController, "test_action")
+        self.assertEqual(json.loads(response.content), {"foo": "action", "before": True, "after": "action"})
+        self.assertEqual(data, {"foo": "action"})
+
+    def test_action_data_is_a_single_layer(self):
+        data = {"data": "action"}
+        contexts = []
+
+        class SingleLayerController(ActionController):
+            controller_name = "test_template_renderer"
+
+            def _after_filter(self, request):
+                contexts.append(self._template_context)
+
+            def test_action(self, request):
+                return data
+
+        self._request_and_test(SingleLayerController, "test_action", expected_response="HTML:action")
+        self.assertIs(contexts[0], data)
+
+    def test_framework_values_are_lazy(self):
+        class LazyController(ActionController):
+            def test_action(self, request):
+                return {"data": "foo"}
+
+            def test_flash(self, request):
+                self._flash.append("hello")
+                return {}
+
+        request = self._request("/")
+        controller = LazyController(site=None, request=request, helper_class=None, url_params=None)
+        with mock.patch.object(TemplateRenderer, "get_template",
+                               return_value=django_template("{{ data }} {{ action_name }} {{ request.path }}")):
+            response = controller._call_action("test_action")
+        self.assertEqual(response.content.decode("utf8"), "foo test_action /")
+        self.assertIsNone(controller._flash_cache)
+        self.assertIsNone(controller._helper_instance)
+
+        controller = LazyController(site=None, request=self._request("/"), helper_class=None, url_params=None)
+        source = "{{ controller_actions|join:',' }}{% if flash.has_messages %} flash{% endif %}"
+        with mock.patch.object(TemplateRenderer, "get_template", return_value=django_template(source)):
+            response = controller._call_action("test_flash")
+        self.assertEqual(response.content.decode("utf8"), "test_action,test_flash flash")
+
+    def test_template_assignments(self):
+        class AssigningController(ActionController):
+            def test_action(self, request):
+                return {"a": "", "b": "second"}
+
+        controller = AssigningController(site=None, request=self._request("/"), helper_class=None, url_params=None)
+        with mock.patch.object(TemplateRenderer, "get_template",
+                               return_value=django_template("{% firstof a b as x %}{{ x }}")):
+            response = controller._call_action("test_action")
+        self.assertEqual(response.content.decode("utf8"), "second")
+
+    def test_missing_include_names_the_backend(self):
+        template = django_template('{% include "missing.html" %}')
+        with self.assertRaises(TemplateDoesNotExist) as raised:
+            TemplateRenderer.render_layers(template, [{}], self._request("/"))
+        self.assertIs(raised.exception.backend, template.backend)
+        self.assertEqual(raised.exception.args, ("missing.html",))
+        self.assertIsInstance(raised.exception.__cause__, TemplateDoesNotExist)
+
+    @staticmethod
+    def _request(path):
+        request = RequestFactory().get(path)
+        request.session = {}
+        return request
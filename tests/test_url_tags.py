@@ -0,0 +1,65 @@
+from unittest import mock
+
+from django.template import Context, Engine
+from django.test import RequestFactory, override_settings
+from django.urls import clear_url_caches, include, path
+
+from django_url_framework import ActionController
+from django_url_framework.helper import ApplicationHelper
+from django_url_framework.site import Site
+from .duf_test_case import DUFTestCase
+
+
+class TagController(ActionController):
+    def index(self, request):
+        return {}
+
+    def show(self, request, id:int):
+        return {}
+
+
+site = Site()
+site.controllers["tag"] = TagController
+
+
+class urls:
+    urlpatterns = [
+        path("app/", include(site.urls[0])),
+    ]
+
+
+class TestUrlTags(DUFTestCase):
+    def setUp(self):
+        self.urlconf = override_settings(ROOT_URLCONF=urls)
+        self.urlconf.enable()
+        self.engine = Engine(libraries={"url_framework": "django_url_framework.templatetags.url_framework"})
+        self.controller = TagController(site, RequestFactory().get("/"), None, {})
+
+    def tearDown(self):
+        self.urlconf.disable()
+
+    def _render(self, source, **context):
+        context["controller_helper"] = self.controller._helper
+        return self.engine.from_string("{% load url_framework %}" + source).render(Context(context))
+
+    def test_literal_urls_are_built_once(self):
+        template = "{% for i in items %}{% go_action show 3 %} {% url_for tag/index %} {% endfor %}"
+        with mock.patch.object(ApplicationHelper, "url_for", autospec=True, side_effect=ApplicationHelper.url_for) as url_for:
+            self.assertEqual(self._render(template, items=range(3)), "/app/tag/show/3/ /app/tag/ " * 3)
+            self.assertEqual(url_for.call_count, 2)
+
+    def test_variables(self):
+        template = "{% for i in items %}{% go_action show i %},{% endfor %}"
+        self.assertEqual(self._render(template, items=range(2)), "/app/tag/show/0/,/app/tag/show/1/,")
+
+    def test_urlconf_change(self):
+        node_template = self.engine.from_string("{% load url_framework %}{% go_action show 3 %}")
+        context = Context({"controller_helper": self.controller._helper})
+        self.assertEqual(node_template.render(context), "/app/tag/show/3/")
+        urls.urlpatterns = [path("moved/", include(site.urls[0]))]
+        try:
+            clear_url_caches()
+            self.assertEqual(node_template.render(context), "/moved/tag/show/3/")
+        finally:
+            urls.urlpatterns = [path("app/", include(site.urls[0]))]
+            clear_url_caches()